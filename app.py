@@ -5,14 +5,25 @@ EVA Report Generator Web Interface
 Flask web application for uploading MDF files and generating EVA reports
 """
 
-from flask import Flask, render_template, request, send_file, jsonify
+from flask import Flask, Request, Response, render_template, request, send_file, jsonify
 import os
+import json
+import re
+import threading
+from io import BytesIO
 from werkzeug.utils import secure_filename
 from datetime import datetime
 import traceback
 
 # Import the EVA report generator
-from generate_eva_report_exact_template import EVAReportGeneratorExactTemplate
+from generate_eva_report_exact_template import DOCUMENT_SIGNALS_EXACT, EVAReportGeneratorExactTemplate
+from graph_assets import bundle_report, has_assets, read_asset
+from job_queue import FINISHED_STATES, JobQueue, QueueFull
+from mdf_ingest import IngestFile, InvalidMDF
+from mdf_inspect import inspect_mdf
+from progress import ProgressTracker
+from resumable_upload import IncompleteUpload, ResumableUploads, UnknownUpload, UploadRejected
+from upload_store import ReportCache, UploadStore
 
 app = Flask(__name__)
 
@@ -20,107 +31,203 @@ app = Flask(__name__)
 UPLOAD_FOLDER = 'uploads'
 REPORTS_FOLDER = 'eva_reports'
 ALLOWED_EXTENSIONS = {'mdf'}
+RENDER_JOBS = 0  # Graph rendering processes (0 = one per CPU core)
+GRAPH_MODE = 'files'  # Graphs written next to the report, lazy-loaded by /view
+JOB_WORKERS = 1  # Analyses running at the same time
+JOB_QUEUE_SIZE = 4  # Analyses waiting for a worker before /upload answers 429
+EVENTS_HEARTBEAT = 15  # Seconds between two job state events on /jobs/<id>/events
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024  # Chunk size of resumable uploads (/uploads)
+RESUMABLE_MAX_SIZE = 100 * 1024 ** 3  # Resumable uploads are not bound by MAX_CONTENT_LENGTH
 
 # Create directories if they don't exist
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(REPORTS_FOLDER, exist_ok=True)
 
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
-app.config['MAX_CONTENT_LENGTH'] = 500 * 1024 * 1024  # 500MB max file size
+app.config['MAX_CONTENT_LENGTH'] = 500 * 1024 * 1024  # 500MB max file size (single request; larger files use /uploads)
+
+# Background analyses: /upload returns a job id, /jobs/<id> reports progress
+job_queue = JobQueue(workers=JOB_WORKERS, max_pending=JOB_QUEUE_SIZE)
+
+# Uploads stored once per content; reports reused for the same file and parameters
+upload_store = UploadStore(UPLOAD_FOLDER)
+report_cache = ReportCache()
+
+# Large files: chunked uploads that survive dropped connections
+resumable_uploads = ResumableUploads(upload_store, chunk_size=UPLOAD_CHUNK_SIZE, max_size=RESUMABLE_MAX_SIZE)
+active_reports = {}  # report cache key → id of the job generating it
+active_reports_lock = threading.Lock()
 
 def allowed_file(filename):
     """Check if file extension is allowed."""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+class UploadRequest(Request):
+    """Request whose uploaded files are written, hashed and checked while they are received."""
+    
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if not filename:
+            return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+        # Rejected before any data is read
+        if not allowed_file(filename):
+            raise InvalidMDF(f"'{filename}' is not a .mdf file")
+        stream = IngestFile(upload_store.incoming)
+        self.__dict__.setdefault('ingest_files', []).append(stream)
+        return stream
+    
+    def close(self):
+        # Files of an aborted upload (client gone, invalid form) are removed too
+        for stream in self.__dict__.get('ingest_files', ()):
+            stream.close()
+        super().close()
+
+app.request_class = UploadRequest
+
 @app.route('/')
 def index():
     """Main page with file upload form."""
     return render_template('index.html')
 
-@app.route('/upload', methods=['POST'])
-def upload_file():
-    """Handle file upload and report generation."""
+def run_report_job(file_path, sweet_version, myf_config, progress, cache_key, sha256):
+    """Generate the report of an uploaded file (runs in a job queue worker)."""
     try:
-        # Check if file was uploaded
-        if 'mdf_file' not in request.files:
-            return jsonify({
-                'success': False,
-                'message': 'No file selected'
-            }), 400
-        
-        file = request.files['mdf_file']
-        if file.filename == '':
-            return jsonify({
-                'success': False,
-                'message': 'No file selected'
-            }), 400
-        
-        # Check file extension
-        if not allowed_file(file.filename):
-            return jsonify({
-                'success': False,
-                'message': 'Invalid file type. Only MDF files are allowed.'
-            }), 400
-        
-        # Get form parameters (use defaults since UI no longer provides these)
-        sweet_version = '500'  # Default to SWEET 500
-        myf_config = 'all'    # Default to all configurations
-        
-        # Save uploaded file
-        filename = secure_filename(file.filename)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        safe_filename = f"{timestamp}_{filename}"
-        file_path = os.path.join(app.config['UPLOAD_FOLDER'], safe_filename)
+        generator = EVAReportGeneratorExactTemplate(jobs=RENDER_JOBS, graph_mode=GRAPH_MODE,
+                                                    progress=progress)
+        report_path = generator.run_analysis(file_path, sweet_version, myf_config)
         
-        # Ensure upload directory exists
-        os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+        # Verify report was generated
+        if not os.path.exists(report_path):
+            raise RuntimeError('Report generation failed - output file not found')
         
-        file.save(file_path)
-        
-        # Verify file was saved successfully
-        if not os.path.exists(file_path):
-            return jsonify({
-                'success': False,
-                'message': 'Failed to save uploaded file'
-            }), 500
-        
-        print(f"File uploaded successfully: {file_path}")
-        
-        # Generate report using the existing EVA report generator
-        try:
-            generator = EVAReportGeneratorExactTemplate()
-            report_path = generator.run_analysis(file_path, sweet_version, myf_config)
-            
-            # Verify report was generated
-            if not os.path.exists(report_path):
-                return jsonify({
-                    'success': False,
-                    'message': 'Report generation failed - output file not found'
-                }), 500
-            
-            # Get relative path for download
-            report_filename = os.path.basename(report_path)
-            
-            print(f"Report generated successfully: {report_path}")
-            
-            # Return success response with report info
+        # Cached before leaving active_reports: the same upload then finds one or the other
+        report_cache.put(cache_key, os.path.basename(report_path), sha256=sha256,
+                         uploaded_file=os.path.basename(file_path))
+    finally:
+        with active_reports_lock:
+            active_reports.pop(cache_key, None)
+    
+    print(f"Report generated successfully: {report_path}")
+    return {
+        'report_filename': os.path.basename(report_path),
+        'report_path': report_path,
+        'timings_ms': dict(progress.timings)
+    }
+
+def job_accepted(job, filename, message):
+    """HTTP 202: report generation queued (or already running), follow it with /jobs/<id>."""
+    return jsonify({
+        'success': True,
+        'message': message,
+        'job_id': job['id'],
+        'job_url': f"/jobs/{job['id']}",
+        'events_url': f"/jobs/{job['id']}/events",
+        'state': job['state'],
+        'position': job.get('position'),
+        'uploaded_file': filename
+    }), 202
+
+def busy_response():
+    """Job queue full: HTTP 429 with a retry delay."""
+    return jsonify({
+        'success': False,
+        'message': 'Server busy: too many analyses waiting. Please retry in a few minutes.'
+    }), 429, {'Retry-After': '60'}
+
+def queue_report(stored, filename):
+    """Answer for a stored upload: cached report, job already running, or new job queued."""
+    # Get form parameters (use defaults since UI no longer provides these)
+    sweet_version = '500'  # Default to SWEET 500
+    myf_config = 'all'    # Default to all configurations
+    
+    print(f"File uploaded successfully: {filename} "
+          f"(sha256 {stored['sha256'][:12]}, {'already stored' if stored['duplicate'] else 'new content'})")
+    
+    # Same content, name and parameters already reported: answer at once
+    cache_key = report_cache.key(sha256=stored['sha256'], filename=filename, generator='exact',
+                                 sweet_version=sweet_version, myf_config=myf_config,
+                                 graph_mode=GRAPH_MODE)
+    with active_reports_lock:
+        # Looked up under the lock: a finishing job caches its report before leaving active_reports
+        report_filename = report_cache.get(cache_key, REPORTS_FOLDER)
+        if report_filename:
+            print(f"Report reused: {report_filename}")
             return jsonify({
                 'success': True,
-                'message': 'Report generated successfully!',
+                'message': 'Report already generated for this file',
                 'report_filename': report_filename,
-                'report_path': report_path,
-                'uploaded_file': filename
+                'report_path': os.path.join(REPORTS_FOLDER, report_filename),
+                'uploaded_file': filename,
+                'cached': True
             })
-            
-        except Exception as report_error:
-            error_msg = f"Error during report generation: {str(report_error)}"
-            print(f"REPORT GENERATION ERROR: {error_msg}")
-            print(traceback.format_exc())
-            return jsonify({
-                'success': False,
-                'message': error_msg
-            }), 500
         
+        # Same report already being generated: follow that job
+        job = job_queue.status(active_reports.get(cache_key, ''))
+        if job is not None and job['state'] not in FINISHED_STATES:
+            return job_accepted(job, filename, 'Same file already being processed')
+        
+        # Queue the report generation and answer immediately; only an analysis gets a named upload file
+        file_path = upload_store.link(stored)
+        progress = ProgressTracker()
+        try:
+            job = job_queue.submit(run_report_job, file_path, sweet_version, myf_config, progress,
+                                   cache_key, stored['sha256'], uploaded_file=filename, progress=progress)
+        except QueueFull:
+            os.remove(file_path)
+            return busy_response()
+        active_reports[cache_key] = job['id']
+    
+    return job_accepted(job, filename, 'File uploaded, report generation queued')
+
+def store_uploaded_file():
+    """Store the request's 'mdf_file' once per content: (stored, filename, None) or (None, None, error response)."""
+    # Check if file was uploaded
+    if 'mdf_file' not in request.files:
+        return None, None, (jsonify({
+            'success': False,
+            'message': 'No file selected'
+        }), 400)
+    
+    file = request.files['mdf_file']
+    if file.filename == '':
+        return None, None, (jsonify({
+            'success': False,
+            'message': 'No file selected'
+        }), 400)
+    
+    # Check file extension
+    if not allowed_file(file.filename):
+        return None, None, (jsonify({
+            'success': False,
+            'message': 'Invalid file type. Only MDF files are allowed.'
+        }), 400)
+    
+    # Uploaded file already written, hashed and checked while received: store it once per content
+    filename = secure_filename(file.filename)
+    if isinstance(file.stream, IngestFile):
+        received = file.stream.detach()
+        stored = upload_store.store(received['path'], filename, received['sha256'], received['size'])
+    else:
+        stored = upload_store.save(file.stream, filename)
+    
+    return stored, filename, None
+
+@app.route('/upload', methods=['POST'])
+def upload_file():
+    """Handle file upload and queue the report generation."""
+    try:
+        stored, filename, error = store_uploaded_file()
+        if error:
+            return error
+        
+        return queue_report(stored, filename)
+        
+    except InvalidMDF as e:
+        # Rejected from its first bytes (or truncated): the rest of the body is not read
+        print(f"UPLOAD REJECTED: {e}")
+        return jsonify({
+            'success': False,
+            'message': f"Invalid MDF file: {e}"
+        }), 400, {'Connection': 'close'}
     except Exception as e:
         error_msg = f"Error during file upload: {str(e)}"
         print(f"UPLOAD ERROR: {error_msg}")
@@ -130,6 +237,206 @@ def upload_file():
             'message': error_msg
         }), 500
 
+def inspection_response(object_path, filename, sha256):
+    """Metadata of a stored MDF (no signal data read, no report generated)."""
+    info = inspect_mdf(object_path, DOCUMENT_SIGNALS_EXACT)
+    info['file'] = filename
+    print(f"MDF inspected: {filename} ({info['inspect_ms']} ms)")
+    return jsonify({'success': True, 'sha256': sha256, **info})
+
+@app.route('/inspect', methods=['POST'])
+def inspect_file():
+    """Quick look at an uploaded MDF: channels, groups, time range, VIN, resolved signals."""
+    try:
+        stored, filename, error = store_uploaded_file()
+        if error:
+            return error
+        # Content kept in the store (GET /inspect/<sha256>, later /upload)
+        return inspection_response(stored['object_path'], filename, stored['sha256'])
+        
+    except InvalidMDF as e:
+        print(f"UPLOAD REJECTED: {e}")
+        return jsonify({
+            'success': False,
+            'message': f"Invalid MDF file: {e}"
+        }), 400, {'Connection': 'close'}
+    except Exception as e:
+        error_msg = f"Error during file inspection: {str(e)}"
+        print(f"INSPECT ERROR: {error_msg}")
+        print(traceback.format_exc())
+        return jsonify({
+            'success': False,
+            'message': error_msg
+        }), 500
+
+@app.route('/inspect/<sha256>')
+def inspect_stored(sha256):
+    """Quick look at an MDF already stored (by content hash)."""
+    if not re.fullmatch(r'[0-9a-f]{64}', sha256):
+        return jsonify({
+            'success': False,
+            'message': 'Invalid content hash'
+        }), 400
+    object_path = upload_store.object_path(sha256)
+    if not os.path.exists(object_path):
+        return jsonify({
+            'success': False,
+            'message': 'MDF file not found'
+        }), 404
+    try:
+        return inspection_response(object_path, os.path.basename(object_path), sha256)
+    except Exception as e:
+        print(f"Inspect error: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'Error inspecting file: {str(e)}'
+        }), 500
+
+def upload_error(message, status, **extra):
+    return jsonify({
+        'success': False,
+        'message': message,
+        **extra
+    }), status
+
+def resumable_errors(action):
+    """Run a resumable upload action, mapping its errors to HTTP responses."""
+    try:
+        return action()
+    except UnknownUpload:
+        return upload_error('Unknown or expired upload', 404)
+    except IncompleteUpload as e:
+        return upload_error(f"Upload incomplete: {e}", 409, missing=e.missing)
+    except UploadRejected as e:
+        # Corrupted chunk (checksum, size): the client sends it again
+        return upload_error(str(e), 400, retry=request.method == 'PUT')
+    except InvalidMDF as e:
+        return upload_error(f"Invalid MDF file: {e}", 400)
+    except Exception as e:
+        error_msg = f"Error during file upload: {str(e)}"
+        print(f"UPLOAD ERROR: {error_msg}")
+        print(traceback.format_exc())
+        return upload_error(error_msg, 500)
+
+@app.route('/uploads', methods=['POST'])
+def create_upload():
+    """Start a resumable upload: {filename, size[, chunk_size]} -> upload id and chunk layout."""
+    params = request.get_json(silent=True) or {}
+    filename = secure_filename(str(params.get('filename', '')))
+    if not filename or not allowed_file(filename):
+        return upload_error('Invalid file type. Only MDF files are allowed.', 400)
+    try:
+        size = int(params.get('size', 0))
+        chunk_size = int(params['chunk_size']) if params.get('chunk_size') else None
+    except (TypeError, ValueError):
+        return upload_error('Invalid file size', 400)
+    
+    def create():
+        session = resumable_uploads.create(filename, size, chunk_size)
+        session['upload_url'] = f"/uploads/{session['upload_id']}"
+        return jsonify({'success': True, **session}), 201
+    return resumable_errors(create)
+
+@app.route('/uploads/<upload_id>', methods=['GET'])
+def upload_status(upload_id):
+    """Chunks already received (to resume an interrupted upload)."""
+    return resumable_errors(lambda: jsonify({'success': True, **resumable_uploads.status(upload_id)}))
+
+@app.route('/uploads/<upload_id>/chunks/<int:index>', methods=['PUT'])
+def upload_chunk(upload_id, index):
+    """Store one chunk (raw body) checked against its X-Chunk-Checksum header (sha256=<hex> or crc32=<hex>)."""
+    def put():
+        session = resumable_uploads.put_chunk(upload_id, index, request.stream,
+                                              request.headers.get('X-Chunk-Checksum'))
+        return jsonify({'success': True, **session})
+    return resumable_errors(put)
+
+@app.route('/uploads/<upload_id>/complete', methods=['POST'])
+def complete_upload(upload_id):
+    """All chunks received: store the file and queue its report (same answers as /upload)."""
+    def complete():
+        stored = resumable_uploads.complete(upload_id)
+        return queue_report(stored, stored['filename'])
+    return resumable_errors(complete)
+
+@app.route('/uploads/<upload_id>', methods=['DELETE'])
+def abort_upload(upload_id):
+    """Abandon a resumable upload and delete its chunks."""
+    def abort():
+        resumable_uploads.abort(upload_id)
+        return jsonify({'success': True, 'message': 'Upload aborted'})
+    return resumable_errors(abort)
+
+def job_response(job):
+    """Public view of a job: state, queue position, last progress event, result."""
+    response = {
+        'success': job['state'] != 'failed',
+        'job_id': job['id'],
+        'state': job['state'],
+        'position': job.get('position'),
+        'uploaded_file': job['uploaded_file'],
+        'waited_s': job['waited_s'],
+        'elapsed_s': job['elapsed_s'],
+        'progress': job['progress'].last()
+    }
+    if job['state'] == 'done':
+        response.update(job['result'])
+        response['message'] = 'Report generated successfully!'
+    elif job['state'] == 'failed':
+        response['message'] = f"Error during report generation: {job['error']}"
+    return response
+
+def unknown_job():
+    return jsonify({
+        'success': False,
+        'message': 'Unknown job'
+    }), 404
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    """State of a report generation job (queued, running, done, failed)."""
+    job = job_queue.status(job_id)
+    if job is None:
+        return unknown_job()
+    return jsonify(job_response(job))
+
+@app.route('/jobs/<job_id>/events')
+def job_events(job_id):
+    """Server-Sent Events: progress events of a job, then its final state."""
+    job = job_queue.status(job_id)
+    if job is None:
+        return unknown_job()
+    
+    progress = job['progress']
+    # Reconnection: the browser resends the last event id it received
+    last_seq = request.headers.get('Last-Event-ID', '')
+    last_seq = int(last_seq) if last_seq.isdigit() else 0
+    
+    def sse(event, data, event_id=None):
+        prefix = f"id: {event_id}\n" if event_id is not None else ''
+        return f"{prefix}event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+    
+    def stream():
+        seq = last_seq
+        while True:
+            state = job_queue.status(job_id)
+            if state is None:
+                return
+            # Waits for new events (returns at once when the job has ended)
+            events = progress.events_after(seq, timeout=EVENTS_HEARTBEAT)
+            for event in events:
+                seq = event['seq']
+                yield sse('progress', event, seq)
+            if state['state'] in FINISHED_STATES:
+                yield sse('state', job_response(state))
+                return
+            if not events:
+                # Heartbeat (keeps proxies from closing the stream) with queue position
+                yield sse('state', job_response(state))
+    
+    return Response(stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @app.route('/download/<filename>')
 def download_report(filename):
     """Download generated report."""
@@ -144,7 +451,12 @@ def download_report(filename):
         file_path = os.path.join(REPORTS_FOLDER, filename)
         if os.path.exists(file_path):
             try:
-                return send_file(file_path, as_attachment=True)
+                if has_assets(file_path):
+                    # Report with external graphs: download report + graphs as one zip
+                    return send_file(bundle_report(file_path), as_attachment=True,
+                                     download_name=f"{os.path.splitext(filename)[0]}.zip",
+                                     mimetype='application/zip')
+                return send_file(os.path.abspath(file_path), as_attachment=True)
             except Exception as send_error:
                 print(f"Error sending file: {send_error}")
                 return jsonify({
@@ -177,21 +489,8 @@ def view_report(filename):
         file_path = os.path.join(REPORTS_FOLDER, filename)
         if os.path.exists(file_path):
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                return content
-            except UnicodeDecodeError:
-                # Try with different encoding if UTF-8 fails
-                try:
-                    with open(file_path, 'r', encoding='latin-1') as f:
-                        content = f.read()
-                    return content
-                except Exception as encoding_error:
-                    print(f"Encoding error: {encoding_error}")
-                    return jsonify({
-                        'success': False,
-                        'message': 'Error reading file encoding'
-                    }), 500
+                # Streamed from disk instead of read into memory
+                return send_file(os.path.abspath(file_path), mimetype='text/html')
             except Exception as read_error:
                 print(f"File read error: {read_error}")
                 return jsonify({
@@ -210,11 +509,37 @@ def view_report(filename):
             'message': f'Error viewing report: {str(e)}'
         }), 500
 
+@app.route('/view/<folder>/<asset>')
+def view_graph(folder, asset):
+    """Serve an external report graph (graphs folder or zip bundle)."""
+    try:
+        # Security check - ensure names are safe
+        if '..' in folder or '..' in asset:
+            return jsonify({
+                'success': False,
+                'message': 'Invalid filename'
+            }), 400
+        
+        content = read_asset(REPORTS_FOLDER, folder, asset)
+        if content is None:
+            return jsonify({
+                'success': False,
+                'message': 'Graph not found'
+            }), 404
+        return send_file(BytesIO(content), mimetype='image/png', max_age=3600)
+    except Exception as e:
+        print(f"Graph error: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'Error serving graph: {str(e)}'
+        }), 500
+
 @app.route('/status')
 def status():
     """Check application status and show basic info."""
     try:
-        upload_count = len(os.listdir(UPLOAD_FOLDER)) if os.path.exists(UPLOAD_FOLDER) else 0
+        upload_count = len([f for f in os.listdir(UPLOAD_FOLDER)
+                            if os.path.isfile(os.path.join(UPLOAD_FOLDER, f))]) if os.path.exists(UPLOAD_FOLDER) else 0
         report_count = len([f for f in os.listdir(REPORTS_FOLDER) if f.endswith('.html')]) if os.path.exists(REPORTS_FOLDER) else 0
         
         return jsonify({
@@ -223,6 +548,9 @@ def status():
             'reports_folder': REPORTS_FOLDER,
             'uploaded_files': upload_count,
             'generated_reports': report_count,
+            'jobs': job_queue.stats(),
+            'storage': upload_store.stats(),
+            'report_cache': {'hits': report_cache.hits, 'misses': report_cache.misses},
             'timestamp': datetime.now().isoformat()
         })
     except Exception as e:
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+ANALYSE PAR LOTS D'ACQUISITIONS MDF
+===================================
+Lance un générateur (exact, real, framework) sur tous les MDF de
+dossiers ou de motifs glob, en parallèle, puis écrit un index des
+rapports produits :
+
+    python batch_analyze.py /data/flotte/2025-06-12 "archives/**/*.mf4" --generator exact --jobs 4
+
+- Pool de processus (--jobs) : un fichier par processus à la fois, les
+  plus gros fichiers d'abord (meilleur remplissage du pool) ; le rendu
+  des graphiques de chaque fichier reste séquentiel par défaut
+  (--render-jobs) pour ne pas multiplier les processus
+- Échecs isolés : une erreur sur un fichier est enregistrée dans l'index
+  sans arrêter le lot ; si un processus meurt (mémoire...), les fichiers
+  qu'il a interrompus sont relancés un par un
+- Sortie console de chaque analyse dans <index>_logs/<fichier>.log
+- Index : <sortie>/batch_<horodatage>.csv, .json et .html (statut,
+  rapport, durée totale et durée de chaque étape)
+- Code de sortie 1 si au moins un fichier a échoué (tâche de nuit)
+"""
+
+import argparse
+import csv
+import glob
+import html
+import importlib
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import redirect_stderr, redirect_stdout
+from datetime import datetime
+from typing import Dict, List
+
+from graph_assets import DEFAULT_GRAPH_MODE, GRAPH_MODES
+from progress import ProgressTracker
+from signal_downsampling import DEFAULT_DOWNSAMPLING, DOWNSAMPLING_METHODS
+
+MDF_EXTENSIONS = ('.mdf', '.mf4')
+
+# Générateur → (module, classe)
+GENERATORS = {
+    'exact': ('generate_eva_report_exact_template', 'EVAReportGeneratorExactTemplate'),
+    'real': ('generate_eva_report_real_data', 'EVAReportGeneratorReal'),
+    'framework': ('generate_eva_report_framework_complet', 'EVAReportGeneratorFrameworkComplet'),
+}
+
+CSV_FIELDS = ['mdf', 'size_mb', 'generator', 'status', 'report', 'duration_s', 'stages', 'error', 'log']
+
+def collect_files(inputs: List[str], recursive: bool = False) -> List[str]:
+    """MDF désignés par des dossiers, des motifs glob ou des chemins (sans doublons)."""
+    files = []
+    for item in inputs:
+        if os.path.isdir(item):
+            if recursive:
+                candidates = [os.path.join(root, name) for root, _, names in os.walk(item) for name in names]
+            else:
+                candidates = [os.path.join(item, name) for name in os.listdir(item)]
+            files += [path for path in candidates
+                      if os.path.isfile(path) and path.lower().endswith(MDF_EXTENSIONS)]
+        elif glob.has_magic(item):
+            files += [path for path in glob.glob(item, recursive=True)
+                      if os.path.isfile(path) and path.lower().endswith(MDF_EXTENSIONS)]
+        elif os.path.isfile(item):
+            files.append(item)
+        else:
+            print(f"⚠️ Introuvable : {item}")
+    unique = {}
+    for path in files:
+        unique.setdefault(os.path.realpath(path), path)
+    return sorted(unique.values())
+
+def analyze_file(mdf_path: str, generator_name: str, options: Dict, log_path: str) -> Dict:
+    """Analyse d'un fichier dans un processus du pool ; ne lève jamais (échec enregistré)."""
+    record = {
+        'mdf': mdf_path,
+        'size_mb': round(os.path.getsize(mdf_path) / (1024 * 1024), 1),
+        'generator': generator_name,
+        'status': 'failed',
+        'report': None,
+        'duration_s': None,
+        'stages_ms': {},
+        'error': None,
+        'log': log_path,
+    }
+    started = time.perf_counter()
+    progress = ProgressTracker()
+    with open(log_path, 'w', encoding='utf-8') as log, redirect_stdout(log), redirect_stderr(log):
+        try:
+            module_name, class_name = GENERATORS[generator_name]
+            generator_class = getattr(importlib.import_module(module_name), class_name)
+            settings = {'jobs': options['render_jobs'], 'downsample': options['downsample'],
+                        'graph_mode': options['graphs'], 'progress': progress}
+            if generator_name == 'framework':
+                generator = generator_class(**settings)
+                report_path = generator.run_analysis(mdf_path, options['sweet'], options['reports_dir'])
+            else:
+                generator = generator_class(streaming=options['stream'],
+                                            memory_limit_mb=options['memory_limit'], **settings)
+                report_path = generator.run_analysis(mdf_path, options['sweet'], options['myfx'],
+                                                     options['reports_dir'])
+            record.update(status='ok', report=report_path)
+        except (Exception, SystemExit) as e:
+            record['error'] = f"{type(e).__name__}: {e}"
+            traceback.print_exc()
+    record['duration_s'] = round(time.perf_counter() - started, 2)
+    record['stages_ms'] = dict(progress.timings)
+    return record
+
+def crashed_record(mdf_path: str, generator_name: str, log_path: str, error: str) -> Dict:
+    """Fichier dont le processus d'analyse s'est arrêté brutalement."""
+    return {'mdf': mdf_path, 'size_mb': round(os.path.getsize(mdf_path) / (1024 * 1024), 1),
+            'generator': generator_name, 'status': 'failed', 'report': None, 'duration_s': None,
+            'stages_ms': {}, 'error': error, 'log': log_path}
+
+def run_batch(files: List[str], generator_name: str, options: Dict, jobs: int, logs_dir: str) -> List[Dict]:
+    """Analyse tous les fichiers avec jobs processus ; renvoie un enregistrement par fichier."""
+    os.makedirs(logs_dir, exist_ok=True)
+    log_paths = {path: os.path.join(logs_dir, f"{index:04d}_{os.path.splitext(os.path.basename(path))[0]}.log")
+                 for index, path in enumerate(files, 1)}
+    records: Dict[str, Dict] = {}
+
+    def run(paths: List[str], workers: int) -> List[str]:
+        """Un passage du pool ; renvoie les fichiers interrompus par la mort d'un processus."""
+        interrupted = []
+        # Les plus gros d'abord : le dernier fichier lancé n'allonge pas seul la durée du lot
+        paths = sorted(paths, key=os.path.getsize, reverse=True)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(analyze_file, path, generator_name, options, log_paths[path]): path
+                       for path in paths}
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    records[path] = future.result()
+                except BrokenProcessPool:
+                    interrupted.append(path)
+                    continue
+                record = records[path]
+                status = f"✅ {record['duration_s']:.1f} s" if record['status'] == 'ok' else f"❌ {record['error']}"
+                print(f"  [{len(records)}/{len(files)}] {os.path.basename(path)} : {status}")
+        return interrupted
+
+    interrupted = run(files, jobs)
+    if interrupted and jobs > 1:
+        # Processus mort : le fichier en cause est inconnu, chaque fichier interrompu est relancé seul
+        print(f"⚠️ Processus d'analyse interrompu : {len(interrupted)} fichier(s) relancé(s) un par un")
+        for path in interrupted:
+            for crashed in run([path], 1):
+                records[crashed] = crashed_record(crashed, generator_name, log_paths[crashed],
+                                                  "Processus d'analyse arrêté brutalement (mémoire ?)")
+    else:
+        for path in interrupted:
+            records[path] = crashed_record(path, generator_name, log_paths[path],
+                                           "Processus d'analyse arrêté brutalement (mémoire ?)")
+    return [records[path] for path in files]
+
+def format_stages(stages_ms: Dict[str, int]) -> str:
+    return ' | '.join(f"{name} {ms / 1000:.2f} s" for name, ms in stages_ms.items())
+
+def write_index(records: List[Dict], index_base: str, summary: Dict):
+    """Index des rapports : CSV, JSON et tableau HTML (liens relatifs à l'index)."""
+    index_dir = os.path.dirname(index_base) or '.'
+
+    with open(f"{index_base}.csv", 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        for record in records:
+            writer.writerow({**record, 'stages': ';'.join(f"{name}={ms}" for name, ms in record['stages_ms'].items())})
+
+    with open(f"{index_base}.json", 'w', encoding='utf-8') as f:
+        json.dump({'summary': summary, 'files': records}, f, ensure_ascii=False, indent=2)
+
+    def link(path, label):
+        if not path:
+            return ''
+        return f'<a href="{html.escape(os.path.relpath(path, index_dir))}">{html.escape(label)}</a>'
+
+    rows = []
+    for index, record in enumerate(records, 1):
+        ok = record['status'] == 'ok'
+        rows.append(f"""        <tr class="{'ok' if ok else 'failed'}">
+            <td>{index}</td>
+            <td>{html.escape(record['mdf'])}</td>
+            <td>{record['size_mb']}</td>
+            <td>{'✅' if ok else '❌'}</td>
+            <td>{link(record['report'], os.path.basename(record['report'] or ''))}</td>
+            <td>{record['duration_s'] if record['duration_s'] is not None else ''}</td>
+            <td>{html.escape(format_stages(record['stages_ms']))}</td>
+            <td>{html.escape(record['error'] or '')}</td>
+            <td>{link(record['log'], 'journal')}</td>
+        </tr>
+""")
+    with open(f"{index_base}.html", 'w', encoding='utf-8') as f:
+        f.write(f"""<!DOCTYPE html>
+<html lang="fr">
+<head>
+    <meta charset="UTF-8">
+    <title>Analyse par lots EVA - {html.escape(summary['date'])}</title>
+    <style>
+        body {{ font-family: Arial, sans-serif; margin: 20px; color: #333; }}
+        table {{ border-collapse: collapse; width: 100%; font-size: 13px; }}
+        th, td {{ border: 1px solid #ccc; padding: 6px 8px; text-align: left; vertical-align: top; }}
+        th {{ background: #f0f0f0; }}
+        tr.failed {{ background: #fdecea; }}
+    </style>
+</head>
+<body>
+    <h1>Analyse par lots EVA</h1>
+    <p>{summary['date']} - générateur <strong>{html.escape(summary['generator'])}</strong>, {summary['jobs']} processus :
+       <strong>{summary['ok']}/{summary['files']}</strong> rapports générés, {summary['failed']} échec(s),
+       durée du lot {summary['wall_s']} s (somme des analyses {summary['total_s']} s)</p>
+    <table>
+        <tr><th>#</th><th>MDF</th><th>Taille (Mo)</th><th>Statut</th><th>Rapport</th><th>Durée (s)</th><th>Étapes</th><th>Erreur</th><th>Journal</th></tr>
+{''.join(rows)}    </table>
+</body>
+</html>
+""")
+
+def main():
+    """Fonction principale."""
+    parser = argparse.ArgumentParser(
+        description='Analyse par lots : un générateur EVA sur tous les MDF de dossiers ou de motifs glob'
+    )
+
+    parser.add_argument('inputs', nargs='+', help='Dossiers, motifs glob ("archives/**/*.mf4") ou fichiers MDF')
+    parser.add_argument('--generator', choices=sorted(GENERATORS), default='exact', help='Générateur de rapport')
+    parser.add_argument('--sweet', default='500', choices=['400', '500'], help='Version SWEET')
+    parser.add_argument('--myfx', default='all', choices=['MyF2', 'MyF3', 'MyF4.1', 'MyF5', 'all'],
+                        help='Configuration MyF (exact, real)')
+    parser.add_argument('--jobs', type=int, default=1, help='Fichiers analysés en parallèle (0 = un par cœur)')
+    parser.add_argument('--render-jobs', type=int, default=1, help='Processus de rendu des graphiques par fichier')
+    parser.add_argument('--recursive', action='store_true', help='Parcourir aussi les sous-dossiers')
+    parser.add_argument('--stream', action='store_true', help='Lecture bloc par bloc (exact, real)')
+    parser.add_argument('--memory-limit', type=float, default=None, help='Plafond mémoire RSS par analyse en Mo (exact, real)')
+    parser.add_argument('--downsample', choices=DOWNSAMPLING_METHODS, default=DEFAULT_DOWNSAMPLING,
+                        help='Réduction des courbes pour l\'affichage')
+    parser.add_argument('--graphs', choices=GRAPH_MODES, default=DEFAULT_GRAPH_MODE,
+                        help='Graphiques intégrés au HTML (inline), externes (files, zip) ou tracés dans le navigateur (interactive)')
+    parser.add_argument('--output', default='eva_reports', help='Répertoire des rapports et de l\'index')
+
+    args = parser.parse_args()
+
+    files = collect_files(args.inputs, args.recursive)
+    if not files:
+        print("❌ Aucun fichier MDF trouvé")
+        sys.exit(1)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    jobs = min(jobs, len(files))
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    os.makedirs(args.output, exist_ok=True)
+    index_base = os.path.join(args.output, f"batch_{timestamp}")
+    options = {'sweet': args.sweet, 'myfx': args.myfx, 'render_jobs': args.render_jobs,
+               'stream': args.stream, 'memory_limit': args.memory_limit, 'downsample': args.downsample,
+               'graphs': args.graphs, 'reports_dir': args.output}
+
+    print("=" * 70)
+    print(f"ANALYSE PAR LOTS - GÉNÉRATEUR {args.generator.upper()}")
+    print("=" * 70)
+    print(f"📁 {len(files)} fichiers MDF ({sum(os.path.getsize(path) for path in files) / (1024 * 1024):.1f} Mo)")
+    print(f"⚙️ {jobs} processus, journaux dans {index_base}_logs/")
+    print("=" * 70)
+
+    started = time.perf_counter()
+    records = run_batch(files, args.generator, options, jobs, f"{index_base}_logs")
+    ok = sum(1 for record in records if record['status'] == 'ok')
+    summary = {
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'generator': args.generator,
+        'jobs': jobs,
+        'files': len(records),
+        'ok': ok,
+        'failed': len(records) - ok,
+        'wall_s': round(time.perf_counter() - started, 2),
+        'total_s': round(sum(record['duration_s'] or 0 for record in records), 2),
+    }
+    write_index(records, index_base, summary)
+
+    print("\n" + "=" * 70)
+    print(f"{'✅' if ok == len(records) else '⚠️'} {ok}/{len(records)} rapports générés en {summary['wall_s']} s "
+          f"(somme des analyses {summary['total_s']} s)")
+    print(f"📋 Index : {index_base}.html (.csv, .json)")
+    print("=" * 70)
+    sys.exit(0 if ok == len(records) else 1)
+
+if __name__ == "__main__":
+    main()
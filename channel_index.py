@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+INDEX DES CANAUX MDF
+====================
+Index construit UNE SEULE FOIS après le chargement du MDF pour retrouver
+un signal sans reparcourir toute la liste des canaux à chaque recherche :
+- Table exacte (nom → position)
+- Table normalisée (minuscules, sans _, espaces, tirets, points)
+- Tables de mots-clés (mot-clé → positions des canaux qui le contiennent)
+- Table des demi-préfixes (recherche par similarité)
+- Index trigrammes des noms en minuscules et normalisés (recherche partielle)
+
+Toutes les recherches renvoient la PREMIÈRE position dans l'ordre des
+canaux du MDF, comme les anciens parcours linéaires.
+"""
+
+import re
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Optional
+
+# Séparateurs supprimés par la normalisation (README_UC_FRAMEWORK.md)
+NORMALIZE_PATTERN = re.compile(r'[_\s\-\.]+')
+
+def normalize_signal_name(name: str) -> str:
+    """Normalise un nom : minuscules + suppression _, espaces, tirets, points."""
+    if not name:
+        return ""
+    return NORMALIZE_PATTERN.sub('', name.lower())
+
+class TrigramIndex:
+    """
+    Index trigrammes pour la recherche de sous-chaînes.
+
+    Chaque trigramme pointe vers la liste TRIÉE des positions des noms qui
+    le contiennent. Un fragment ne peut être contenu que dans les noms
+    présents dans toutes les listes de ses trigrammes : on ne vérifie que
+    la plus courte, dans l'ordre des positions (résultat déterministe).
+    """
+
+    N = 3
+
+    # Séparateur du texte concaténé (absent des noms de canaux)
+    SEPARATOR = '\x00'
+
+    def __init__(self, names: List[str]):
+        self.names = names
+        self.postings: Dict[str, List[int]] = {}
+        for pos, name in enumerate(names):
+            for gram in {name[i:i + self.N] for i in range(len(name) - self.N + 1)}:
+                self.postings.setdefault(gram, []).append(pos)
+
+        # Fragments trop courts pour les trigrammes : recherche dans le texte concaténé
+        self._offsets = []
+        cursor = 0
+        for name in names:
+            self._offsets.append(cursor)
+            cursor += len(name) + len(self.SEPARATOR)
+        self._text = self.SEPARATOR.join(names)
+
+    def _shortest_posting(self, fragment: str) -> List[int]:
+        """Liste de positions la plus courte parmi les trigrammes du fragment."""
+        shortest = None
+        for i in range(len(fragment) - self.N + 1):
+            posting = self.postings.get(fragment[i:i + self.N])
+            if posting is None:
+                return []
+            if shortest is None or len(posting) < len(shortest):
+                shortest = posting
+        return shortest
+
+    def candidates(self, fragment: str) -> List[int]:
+        """Positions triées de tous les noms contenant le fragment."""
+        if len(fragment) < self.N:
+            return [pos for pos, name in enumerate(self.names) if fragment in name]
+        return [pos for pos in self._shortest_posting(fragment) if fragment in self.names[pos]]
+
+    def first(self, fragment: str) -> Optional[int]:
+        """Position du premier nom contenant le fragment."""
+        if len(fragment) < self.N:
+            if self.SEPARATOR in fragment:
+                return next((pos for pos, name in enumerate(self.names) if fragment in name), None)
+            found = self._text.find(fragment) if self.names else -1
+            return bisect_right(self._offsets, found) - 1 if found >= 0 else None
+        for pos in self._shortest_posting(fragment):
+            if fragment in self.names[pos]:
+                return pos
+        return None
+
+class ChannelIndex:
+    """Index des noms de canaux d'un MDF."""
+
+    def __init__(self, channels: Iterable[str], keywords: Iterable[str] = ()):
+        self.channels: List[str] = list(channels)
+        self.lower: List[str] = [channel.lower() for channel in self.channels]
+
+        # Tables exacte, normalisée et minuscule (première occurrence gagnante)
+        self.exact: Dict[str, int] = {}
+        self.normalized: Dict[str, int] = {}
+        self.lower_positions: Dict[str, int] = {}
+        for pos, channel in enumerate(self.channels):
+            self.exact.setdefault(channel, pos)
+            self.normalized.setdefault(normalize_signal_name(channel), pos)
+            self.lower_positions.setdefault(self.lower[pos], pos)
+        self._lower_lengths = {len(low) for low in self.lower_positions}
+
+        # Index trigrammes (construits à la première recherche partielle)
+        self._lower_grams: Optional[TrigramIndex] = None
+        self._normalized_grams: Optional[TrigramIndex] = None
+
+        # Tables de mots-clés : positions triées des canaux contenant le mot-clé
+        self.keyword_positions: Dict[str, List[int]] = {}
+        for keyword in keywords:
+            self.add_keyword(keyword)
+
+        # Demi-préfixes (construits à la première recherche par similarité)
+        self._half_prefixes: Optional[Dict[str, int]] = None
+        self._half_prefix_lengths = set()
+
+    def __len__(self) -> int:
+        return len(self.channels)
+
+    @property
+    def lower_grams(self) -> TrigramIndex:
+        """Index trigrammes des noms en minuscules."""
+        if self._lower_grams is None:
+            self._lower_grams = TrigramIndex(self.lower)
+        return self._lower_grams
+
+    @property
+    def normalized_grams(self) -> TrigramIndex:
+        """Index trigrammes des noms normalisés."""
+        if self._normalized_grams is None:
+            self._normalized_grams = TrigramIndex([normalize_signal_name(channel) for channel in self.channels])
+        return self._normalized_grams
+
+    def add_keyword(self, keyword: str):
+        """Ajoute une table de mots-clés (calculée une seule fois)."""
+        keyword = keyword.lower()
+        if keyword not in self.keyword_positions:
+            self.keyword_positions[keyword] = self.lower_grams.candidates(keyword)
+
+    def get_exact(self, name: str) -> Optional[int]:
+        """Position du canal portant exactement ce nom."""
+        return self.exact.get(name)
+
+    def get_normalized(self, name: str) -> Optional[int]:
+        """Position du premier canal de même nom normalisé."""
+        return self.normalized.get(normalize_signal_name(name))
+
+    def first_containing(self, fragment: str) -> Optional[int]:
+        """Position du premier canal (en minuscules) contenant le fragment."""
+        return self.lower_grams.first(fragment)
+
+    def first_containing_normalized(self, fragment: str) -> Optional[int]:
+        """Position du premier canal dont le nom normalisé contient le fragment."""
+        return self.normalized_grams.first(fragment)
+
+    def first_with_keyword_and_part(self, keyword: str, parts: List[str]) -> Optional[int]:
+        """Position du premier canal contenant le mot-clé ET l'une des parties."""
+        with_keyword = self.keyword_positions.get(keyword)
+        if with_keyword is None:
+            self.add_keyword(keyword)
+            with_keyword = self.keyword_positions[keyword]
+        if not with_keyword:
+            return None
+
+        short_parts = [part for part in parts if len(part) < TrigramIndex.N]
+        if short_parts:
+            # Parties trop courtes pour les trigrammes : vérification directe
+            for pos in with_keyword:
+                if any(part in self.lower[pos] for part in parts):
+                    return pos
+            return None
+
+        # Union des canaux contenant une partie, croisée avec le mot-clé
+        with_part = set()
+        for part in parts:
+            with_part.update(self.lower_grams.candidates(part))
+        if len(with_part) < len(with_keyword):
+            keyword_set = set(with_keyword)
+            return next((pos for pos in sorted(with_part) if pos in keyword_set), None)
+        return next((pos for pos in with_keyword if pos in with_part), None)
+
+    def first_contained_in(self, text: str) -> Optional[int]:
+        """Position du premier canal (en minuscules) inclus dans le texte."""
+        return self._first_substring_match(text, self.lower_positions, self._lower_lengths)
+
+    def first_half_prefix_in(self, text: str) -> Optional[int]:
+        """Position du premier canal dont la première moitié est incluse dans le texte."""
+        if self._half_prefixes is None:
+            self._half_prefixes = {}
+            for pos, channel in enumerate(self.channels):
+                self._half_prefixes.setdefault(self.lower[pos][:len(channel)//2], pos)
+            self._half_prefix_lengths = {len(prefix) for prefix in self._half_prefixes}
+        return self._first_substring_match(text, self._half_prefixes, self._half_prefix_lengths)
+
+    @staticmethod
+    def _first_substring_match(text: str, table: Dict[str, int], lengths) -> Optional[int]:
+        """Plus petite position de la table parmi toutes les sous-chaînes du texte."""
+        best = None
+        for length in lengths:
+            if length > len(text):
+                continue
+            for start in range(len(text) - length + 1):
+                pos = table.get(text[start:start + length])
+                if pos is not None and (best is None or pos < best):
+                    best = pos
+        return best
@@ -19,10 +19,8 @@ from datetime import datetime
 import json
 import re
 import base64
-from io import BytesIO
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
-import matplotlib.pyplot as plt
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -33,6 +31,21 @@ except ImportError:
     print("❌ Modules requis : pip3 install asammdf python-docx matplotlib pandas")
     sys.exit(1)
 
+from signal_resolver import SignalResolver
+from resolution_cache import ResolutionCache
+from signal_extraction import extract_signals, read_signal
+from signal_sidecar import SignalSidecar
+from signal_downsampling import DEFAULT_DOWNSAMPLING, DOWNSAMPLING_METHODS
+from graph_assets import DEFAULT_GRAPH_MODE, GRAPH_MODES, GraphAssets
+from report_writer import ReportWriter
+from progress import ProgressTracker
+from mdf_inspect import format_inspection, inspect_mdf
+from graph_rendering import DEFAULT_JOBS, error_spec, reduce_points, render_graph
+import signal_intervals
+from uc_sequence_engine import SequenceRuleEngine, evaluate_samples, format_time
+from signal_cache import DEFAULT_MAX_MB, SignalCache
+from signal_streaming import DEFAULT_CHUNK_MB, MemoryGuard, configure_streaming, stream_signal
+
 # ============================================================================
 # DONNÉES EXACTES EXTRAITES DU DOCUMENT WORD
 # ============================================================================
@@ -94,89 +107,164 @@ DOORS_REQUIREMENTS_EXACT = [
     'REQ_SYS_GRA_NEW_394', 'REQ_SYS_GRA_NEW_395', 'REQ_SYS_GRA_NEW_396'
 ]
 
+# Signaux d'activité de chaque UC, dans l'ordre d'essai, et leurs conditions
+# (syntaxe des sequence_rules du framework, voir uc_sequence_engine.py) :
+# l'UC est actif quand l'une des conditions de son signal est vraie
+UC_ACTIVITY_SIGNALS = {
+    'UC 1.1': ('Réveil', [
+        ('WakeUp', ['WakeUp', '= 1']),
+        ('SystemWakeUp', ['WakeUp', '= 1']),
+        ('PowerMode', ['Auto ACC / Ignition', 'PowertrainRunning']),
+    ]),
+    'UC 1.2': ('Traction', [
+        ('VehicleSpeed', ['> 10Kmph']),
+        ('MotorSpeed', ['> 0']),
+        ('MotorTorque', ['> 0']),
+    ]),
+    'UC 1.3': ('Charge', [
+        ('ChargingPlugConnected_v2', ['Charging Plug is Connected']),
+        ('ChargingPlugConnected', ['Charging Plug is Connected']),
+        ('ChargerState', ['Charge']),
+        ('ChargingPower', ['> 0']),
+    ]),
+}
+
+def format_duration(seconds: float) -> str:
+    """Formate une durée en MM:SS.mmm (format de la Table 3)."""
+    minutes = int(seconds // 60)
+    return f"{minutes:02d}:{seconds - 60 * minutes:06.3f}"
+
 class EVAReportGeneratorExactTemplate:
     """Générateur respectant EXACTEMENT le template du document."""
     
-    def __init__(self):
+    def __init__(self, streaming: bool = False, memory_limit_mb: Optional[float] = None,
+                 chunk_mb: float = DEFAULT_CHUNK_MB, cache_mb: float = DEFAULT_MAX_MB,
+                 sidecar: bool = False, merge_gap: float = 0.0, min_duration: float = 0.0,
+                 jobs: int = DEFAULT_JOBS, downsample: str = DEFAULT_DOWNSAMPLING,
+                 graph_mode: str = DEFAULT_GRAPH_MODE, progress: Optional[ProgressTracker] = None):
         self.mdf_data = None
         self.mdf_path = None
         self.mdf_channels = []
-        self.signal_data_cache = {}
+        self.resolver = None
+        self.resolution_cache = ResolutionCache()
+        self.signal_data_cache = SignalCache(cache_mb)  # canal MDF résolu → données (LRU)
+        self.prefetched_signals = {}  # canal MDF → Signal (extraction groupée)
         self.graph_counter = 0
+        self.jobs = jobs  # Processus de rendu des graphiques (0 : un par cœur)
+        self.downsample = downsample  # Réduction des courbes : enveloppe min/max ou LTTB
+        self.graph_mode = graph_mode  # Graphiques intégrés (inline), externes (files / zip) ou tracés dans le navigateur (interactive)
+        self.progress = progress or ProgressTracker()  # Étapes de l'analyse (événements, durées)
+        
+        # Mode streaming : lecture bloc par bloc, seules les données réduites sont gardées
+        self.streaming = streaming
+        self.chunk_mb = chunk_mb
+        self.memory_guard = MemoryGuard(memory_limit_mb)
+        
+        # Cache sidecar colonne des canaux lus (relances sur le même MDF)
+        self.use_sidecar = sidecar
+        self.sidecar = None
+        
+        # Occurrences UC : fusion des plages proches et durée minimale (s)
+        self.merge_gap = merge_gap
+        self.min_duration = min_duration
         
     def load_mdf(self, mdf_path: str) -> bool:
         """Charge le fichier MDF."""
+        self.progress.stage('chargement', 'Chargement du MDF')
         try:
             print(f"📁 Chargement MDF: {mdf_path}")
             self.mdf_path = mdf_path
             self.mdf_data = MDF(mdf_path)
             self.mdf_channels = list(self.mdf_data.channels_db.keys())
+            if self.streaming:
+                configure_streaming(self.mdf_data, self.chunk_mb)
+            # Index des noms construit une seule fois pour toutes les recherches
+            self.resolver = None
+            self.get_resolver()
             print(f"✅ MDF chargé: {len(self.mdf_channels)} canaux")
             return True
         except Exception as e:
             print(f"❌ Erreur: {e}")
             return False
     
+    def get_resolver(self) -> SignalResolver:
+        """Renvoie le résolveur de noms (construit une seule fois)."""
+        if self.resolver is None:
+            self.resolver = SignalResolver(self.mdf_channels, strategy='exact_template',
+                                           cache=self.resolution_cache)
+        return self.resolver
+    
     def find_signal_in_mdf(self, signal_name: str) -> Optional[str]:
-        """Cherche un signal dans les canaux MDF avec mapping intelligent."""
-        if not signal_name:
-            return None
-        
-        # 1. Recherche exacte
-        if signal_name in self.mdf_channels:
-            return signal_name
-        
-        # 2. Recherche normalisée (sans underscore, espaces, etc.)
-        signal_norm = re.sub(r'[_\s\-\.]+', '', signal_name.lower())
-        for channel in self.mdf_channels:
-            channel_norm = re.sub(r'[_\s\-\.]+', '', channel.lower())
-            if signal_norm == channel_norm:
-                return channel
-        
-        # 3. Recherche partielle intelligente
-        # Chercher les mots clés importants
-        keywords = ['voltage', 'current', 'speed', 'torque', 'power', 'temp', 
-                   'soc', 'fault', 'relay', 'charge', 'battery', 'motor']
-        
-        for keyword in keywords:
-            if keyword in signal_name.lower():
-                for channel in self.mdf_channels:
-                    if keyword in channel.lower():
-                        # Vérifier d'autres parties du nom
-                        if any(part in channel.lower() for part in signal_name.lower().split('_')):
-                            return channel
-        
-        # 4. Recherche par similarité
-        for channel in self.mdf_channels:
-            # Si au moins 50% du nom correspond
-            if signal_name.lower()[:len(signal_name)//2] in channel.lower():
-                return channel
-            if channel.lower()[:len(channel)//2] in signal_name.lower():
-                return channel
+        """Cherche un signal dans les canaux MDF avec mapping intelligent.
         
+        Exacte → Normalisée → Mots clés → Similarité (voir signal_resolver.py).
+        """
+        return self.get_resolver().resolve(signal_name)
+    
+    def find_alternative_channel(self, signal_eva: str, signal_sweet: str) -> Optional[str]:
+        """Cherche un signal alternatif dans le MDF qui pourrait correspondre."""
+        for keyword in ('voltage', 'current'):
+            if keyword in signal_eva.lower() or keyword in signal_sweet.lower():
+                return next((ch for ch in self.mdf_channels[:100] if keyword in ch.lower()), None)
         return None
     
+    def vin_candidate_channels(self) -> List[str]:
+        """Canaux pouvant contenir le VIN, dans l'ordre de recherche."""
+        vin_signals = ['VIN', 'VehicleIdentificationNumber', 'Vehicle_ID']
+        candidates = []
+        for sig in vin_signals:
+            candidates += [channel for channel in self.mdf_channels if sig.lower() in channel.lower()]
+        return list(dict.fromkeys(candidates))
+    
+    def required_channels(self) -> List[str]:
+        """Tous les canaux MDF nécessaires au rapport (résolus en un lot)."""
+        matches = self.get_resolver().resolve_batch(name for pair in DOCUMENT_SIGNALS_EXACT for name in pair)
+        channels = [match['channel'] for match in matches.values()]
+        channels += [self.find_alternative_channel(eva, sweet) for eva, sweet in DOCUMENT_SIGNALS_EXACT]
+        channels += self.vin_candidate_channels()
+        return [channel for channel in dict.fromkeys(channels) if channel]
+    
+    def prefetch_signals(self):
+        """Extrait en une seule passe groupée tous les canaux du rapport."""
+        channels = self.required_channels()
+        self.progress.stage('extraction', 'Extraction groupée des canaux', len(channels))
+        print(f"📦 Extraction groupée de {len(channels)} canaux...")
+        if self.use_sidecar:
+            self.sidecar = SignalSidecar(self.mdf_path)
+            self.prefetched_signals = self.sidecar.extract(self.mdf_data, channels)
+            print(f"💾 {self.sidecar.summary()}")
+        else:
+            self.prefetched_signals = extract_signals(self.mdf_data, channels)
+        print(f"✅ {len(self.prefetched_signals)} canaux extraits")
+    
+    def read_channel(self, mdf_channel: str):
+        """Signal d'un canal MDF (extraction groupée, sinon lecture directe).
+        
+        Le signal extrait est retiré de l'extraction groupée : c'est ensuite
+        le cache borné qui le garde (ou l'évince).
+        """
+        signal = self.prefetched_signals.pop(mdf_channel, None)
+        if signal is None and self.mdf_data:
+            signal = read_signal(self.mdf_data, mdf_channel)
+        return signal
+    
     def get_signal_data(self, signal_name: str) -> Dict:
         """Récupère les données réelles d'un signal."""
-        if signal_name in self.signal_data_cache:
-            return self.signal_data_cache[signal_name]
-        
         mdf_channel = self.find_signal_in_mdf(signal_name)
-        if mdf_channel and self.mdf_data:
+        cached = self.signal_data_cache.get(mdf_channel) if mdf_channel else None
+        if cached is not None:
+            return cached
+        
+        if mdf_channel and self.mdf_data and self.streaming:
+            # Lecture bloc par bloc : statistiques et enveloppe min/max uniquement
+            result = stream_signal(self.mdf_data, mdf_channel, self.memory_guard)
+            if result and result['found'] and result['numeric']:
+                self.signal_data_cache.put(mdf_channel, result)
+                return result
+        elif mdf_channel and self.mdf_data:
             try:
-                signal = None
-                
                 # Gestion robuste des canaux multiples
-                try:
-                    signal = self.mdf_data.get(mdf_channel)
-                except:
-                    try:
-                        occurrences = self.mdf_data.channels_db.get(mdf_channel, [])
-                        if occurrences:
-                            first_occ = occurrences[0]
-                            signal = self.mdf_data.get(mdf_channel, group=first_occ[0], index=first_occ[1])
-                    except:
-                        pass
+                signal = self.read_channel(mdf_channel)
                 
                 if signal and hasattr(signal, 'samples') and len(signal.samples) > 0:
                     result = {
@@ -188,8 +276,11 @@ class EVAReportGeneratorExactTemplate:
                         'max': float(np.max(signal.samples)),
                         'mean': float(np.mean(signal.samples))
                     }
-                    self.signal_data_cache[signal_name] = result
+                    self.signal_data_cache.put(mdf_channel, result)
+                    self.memory_guard.check(signal_name)
                     return result
+            except MemoryError:
+                raise
             except:
                 pass
         
@@ -203,11 +294,14 @@ class EVAReportGeneratorExactTemplate:
     
     def generate_real_graph(self, signal_eva: str, signal_sweet: str, graph_id: int) -> str:
         """Génère un graphique RÉEL pour un signal (un graphe différent pour chaque ligne)."""
+        return render_graph(self.real_graph_spec(signal_eva, signal_sweet, graph_id))
+    
+    def real_graph_spec(self, signal_eva: str, signal_sweet: str, graph_id: int) -> Dict:
+        """Description du graphique d'une ligne (rendu par graph_rendering.py)."""
         self.graph_counter += 1
+        error_text = f'Erreur Signal #{graph_id}\n{{error}}'
         
         try:
-            plt.figure(figsize=(10, 3))
-            
             # Essayer EVA puis SWEET
             data_eva = self.get_signal_data(signal_eva)
             data_sweet = self.get_signal_data(signal_sweet) if not data_eva['found'] else {'found': False}
@@ -217,114 +311,69 @@ class EVAReportGeneratorExactTemplate:
             signal_used = signal_eva if data_eva['found'] else signal_sweet
             
             if data['found']:
-                # DONNÉES RÉELLES TROUVÉES
-                timestamps = data['timestamps']
-                samples = data['samples']
-                
-                # Adapter l'échantillonnage pour la performance
-                max_points = 10000
-                if len(timestamps) > max_points:
-                    step = len(timestamps) // max_points
-                    timestamps = timestamps[::step]
-                    samples = samples[::step]
+                # DONNÉES RÉELLES TROUVÉES (réduites pour la performance)
+                timestamps, samples = reduce_points(data['timestamps'], data['samples'], (10, 3), self.downsample)
                 
                 # Tracer avec couleur unique pour ce signal
                 colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', 
                          '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22', '#17becf']
                 color = colors[graph_id % len(colors)]
                 
-                plt.plot(timestamps, samples, color=color, linewidth=0.8, alpha=0.9)
-                plt.fill_between(timestamps, samples, alpha=0.1, color=color)
-                
-                # Titre avec infos
-                plt.title(f'Signal #{graph_id}: {signal_used}\nCanal MDF: {data["channel"]}', 
-                         fontsize=10, fontweight='bold')
-                
-                # Statistiques
-                stats_text = f'Min: {data["min"]:.3f}\nMax: {data["max"]:.3f}\nMoy: {data["mean"]:.3f}'
-                plt.text(0.02, 0.98, stats_text, transform=plt.gca().transAxes, 
-                        va='top', fontsize=8, 
-                        bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.7))
-                
-                # Axes et grille
-                plt.xlabel('Temps (s)', fontsize=9)
-                plt.ylabel(f'Valeur', fontsize=9)
-                plt.grid(True, alpha=0.3, linestyle='--')
-                
-            else:
-                # SIGNAL NON TROUVÉ - Afficher info
-                # Chercher un signal alternatif dans le MDF qui pourrait correspondre
-                alternative = None
-                if 'voltage' in signal_eva.lower() or 'voltage' in signal_sweet.lower():
-                    for ch in self.mdf_channels[:100]:
-                        if 'voltage' in ch.lower():
-                            alternative = ch
-                            break
-                elif 'current' in signal_eva.lower() or 'current' in signal_sweet.lower():
-                    for ch in self.mdf_channels[:100]:
-                        if 'current' in ch.lower():
-                            alternative = ch
-                            break
-                
-                if alternative:
-                    # Utiliser le signal alternatif
-                    try:
-                        alt_data = self.get_signal_data(alternative)
-                        if alt_data['found']:
-                            timestamps = alt_data['timestamps'][:5000]
-                            samples = alt_data['samples'][:5000]
-                            plt.plot(timestamps, samples, 'gray', linewidth=0.5, alpha=0.5)
-                            plt.title(f'Signal #{graph_id}: {signal_eva}\n(Alternatif: {alternative})', 
-                                     fontsize=10, color='orange')
-                        else:
-                            raise Exception("Alternative non trouvée")
-                    except:
-                        self._draw_empty_graph(graph_id, signal_eva, signal_sweet)
-                else:
-                    self._draw_empty_graph(graph_id, signal_eva, signal_sweet)
-            
-            plt.tight_layout()
+                return {
+                    'figsize': (10, 3),
+                    'series': [{'x': timestamps, 'y': samples, 'fill': True,
+                                'style': {'color': color, 'linewidth': 0.8, 'alpha': 0.9}}],
+                    # Titre avec infos
+                    'title': f'Signal #{graph_id}: {signal_used}\nCanal MDF: {data["channel"]}',
+                    'title_style': {'fontsize': 10, 'fontweight': 'bold'},
+                    # Statistiques
+                    'texts': [{'x': 0.02, 'y': 0.98, 'axes': True,
+                               'text': f'Min: {data["min"]:.3f}\nMax: {data["max"]:.3f}\nMoy: {data["mean"]:.3f}',
+                               'style': {'va': 'top', 'fontsize': 8,
+                                         'bbox': dict(boxstyle='round', facecolor='wheat', alpha=0.7)}}],
+                    # Axes et grille
+                    'xlabel': 'Temps (s)', 'ylabel': 'Valeur', 'label_style': {'fontsize': 9},
+                    'grid': {'alpha': 0.3, 'linestyle': '--'},
+                    'tight_layout': True,
+                    'error_text': error_text,
+                }
             
-            # Convertir en base64
-            buffer = BytesIO()
-            plt.savefig(buffer, format='png', dpi=100, bbox_inches='tight')
-            buffer.seek(0)
-            graph_b64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-            plt.close()
-            
-            return f'data:image/png;base64,{graph_b64}'
+            # SIGNAL NON TROUVÉ - Afficher info
+            # Chercher un signal alternatif dans le MDF qui pourrait correspondre
+            alternative = self.find_alternative_channel(signal_eva, signal_sweet)
+            alt_data = self.get_signal_data(alternative) if alternative else {'found': False}
+            if alt_data['found']:
+                # Utiliser le signal alternatif
+                return {
+                    'figsize': (10, 3),
+                    'series': [{'x': np.asarray(alt_data['timestamps'][:5000]),
+                                'y': np.asarray(alt_data['samples'][:5000]),
+                                'style': {'color': 'gray', 'linewidth': 0.5, 'alpha': 0.5}}],
+                    'title': f'Signal #{graph_id}: {signal_eva}\n(Alternatif: {alternative})',
+                    'title_style': {'fontsize': 10, 'color': 'orange'},
+                    'tight_layout': True,
+                    'error_text': error_text,
+                }
+            return self._empty_graph_spec(graph_id, signal_eva, signal_sweet)
             
+        except MemoryError:
+            raise
         except Exception as e:
-            plt.close()
-            return self._generate_error_graph(graph_id, str(e))
-    
-    def _draw_empty_graph(self, graph_id: int, signal_eva: str, signal_sweet: str):
-        """Dessine un graphe vide informatif."""
-        plt.text(0.5, 0.5, 
-                f'Signal #{graph_id}\n\n{signal_eva}\n{signal_sweet}\n\nNon trouvé dans le MDF', 
-                ha='center', va='center', fontsize=10, color='red',
-                bbox=dict(boxstyle='round', facecolor='#ffeeee', alpha=0.8))
-        plt.xlim(0, 1)
-        plt.ylim(0, 1)
-        plt.title(f'Signal #{graph_id}: Données non disponibles', fontsize=10)
-        plt.axis('off')
-    
-    def _generate_error_graph(self, graph_id: int, error: str) -> str:
-        """Génère un graphique d'erreur."""
-        plt.figure(figsize=(10, 3))
-        plt.text(0.5, 0.5, f'Erreur Signal #{graph_id}\n{error[:50]}', 
-                ha='center', va='center', fontsize=10, color='red')
-        plt.xlim(0, 1)
-        plt.ylim(0, 1)
-        plt.axis('off')
-        
-        buffer = BytesIO()
-        plt.savefig(buffer, format='png', dpi=100, bbox_inches='tight')
-        buffer.seek(0)
-        graph_b64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-        plt.close()
-        
-        return f'data:image/png;base64,{graph_b64}'
+            return error_spec({'figsize': (10, 3), 'error_text': error_text}, e)
+    
+    def _empty_graph_spec(self, graph_id: int, signal_eva: str, signal_sweet: str) -> Dict:
+        """Description d'un graphe vide informatif."""
+        return {
+            'figsize': (10, 3),
+            'texts': [{'x': 0.5, 'y': 0.5,
+                       'text': f'Signal #{graph_id}\n\n{signal_eva}\n{signal_sweet}\n\nNon trouvé dans le MDF',
+                       'style': {'ha': 'center', 'va': 'center', 'fontsize': 10, 'color': 'red',
+                                 'bbox': dict(boxstyle='round', facecolor='#ffeeee', alpha=0.8)}}],
+            'xlim': (0, 1), 'ylim': (0, 1),
+            'title': f'Signal #{graph_id}: Données non disponibles', 'title_style': {'fontsize': 10},
+            'axis_off': True,
+            'tight_layout': True,
+        }
     
     def extract_vin(self) -> str:
         """Extrait le VIN depuis le MDF."""
@@ -340,20 +389,17 @@ class EVAReportGeneratorExactTemplate:
             pass
         
         # Chercher dans les signaux
-        vin_signals = ['VIN', 'VehicleIdentificationNumber', 'Vehicle_ID']
-        for sig in vin_signals:
-            for channel in self.mdf_channels:
-                if sig.lower() in channel.lower():
-                    try:
-                        signal = self.mdf_data.get(channel)
-                        if signal and hasattr(signal, 'samples') and len(signal.samples) > 0:
-                            vin_value = signal.samples[0]
-                            if isinstance(vin_value, (bytes, str)):
-                                vin_str = vin_value.decode() if isinstance(vin_value, bytes) else vin_value
-                                if re.match(r'^[A-HJ-NPR-Z0-9]{17}$', vin_str):
-                                    return vin_str
-                    except:
-                        pass
+        for channel in self.vin_candidate_channels():
+            try:
+                signal = self.read_channel(channel)
+                if signal and hasattr(signal, 'samples') and len(signal.samples) > 0:
+                    vin_value = signal.samples[0]
+                    if isinstance(vin_value, (bytes, str)):
+                        vin_str = vin_value.decode() if isinstance(vin_value, bytes) else vin_value
+                        if re.match(r'^[A-HJ-NPR-Z0-9]{17}$', vin_str):
+                            return vin_str
+            except:
+                pass
         
         return "VIN_NON_DISPONIBLE"
     
@@ -375,55 +421,84 @@ class EVAReportGeneratorExactTemplate:
         return "MULET_001"
     
     def detect_use_cases(self) -> List[Dict]:
-        """Détecte les UC depuis les signaux."""
+        """Détecte les UC et leurs occurrences réelles depuis les signaux.
+        
+        Chaque signal d'UC est résolu sans approximation (exacte ou
+        normalisée) puis évalué avec ses conditions d'état ou de seuil par le
+        moteur de règles (uc_sequence_engine.py). Les plages actives passent
+        par l'algèbre d'intervalles (voir signal_intervals.py), avec
+        anti-rebond (--merge-gap) et durée minimale (--min-duration). Le
+        premier signal qui donne des occurrences est retenu.
+        """
         uc_list = []
-        
-        # UC basés sur les signaux
-        uc_signals = {
-            'UC 1.1': ['WakeUp', 'SystemWakeUp', 'PowerMode'],
-            'UC 1.2': ['VehicleSpeed', 'MotorSpeed', 'MotorTorque'],
-            'UC 1.3': ['ChargingPlugConnected', 'ChargerState', 'ChargingPower'],
-        }
-        
-        for uc_name, signals in uc_signals.items():
-            for signal in signals:
-                if self.find_signal_in_mdf(signal):
+        engine = SequenceRuleEngine({})
+        
+        for uc_name, (uc_type, signals) in UC_ACTIVITY_SIGNALS.items():
+            for signal, conditions in signals:
+                rules = [SequenceRuleEngine.compile_rule(uc_name, index, {'signal': signal, 'conditions': {'from': condition}})
+                         for index, condition in enumerate(conditions)]
+                active = self.uc_activity_intervals(signal, rules, engine)
+                if active is None:
+                    continue
+                occurrences = signal_intervals.occurrences(active, self.merge_gap, self.min_duration)
+                if not len(occurrences):
+                    continue
+                for number, (t_start, t_end) in enumerate(occurrences.tolist(), 1):
                     uc_list.append({
                         'uc': uc_name,
-                        'type': uc_name.replace('UC ', ''),
-                        'occurrence': 1,
-                        'tstart': '00:00:10.000',
-                        'tend': '00:05:00.000',
-                        'duration': '04:50.000'
+                        'type': uc_type,
+                        'occurrence': number,
+                        'tstart': format_time(t_start),
+                        'tend': format_time(t_end),
+                        'duration': format_duration(t_end - t_start)
                     })
-                    break
+                break
         
-        # Si aucun UC détecté, utiliser le nom du fichier
-        if not uc_list:
-            filename = os.path.basename(self.mdf_path).lower()
-            if 'roulage' in filename or 'traction' in filename:
-                uc_list.append({
-                    'uc': 'UC 1.2',
-                    'type': 'Traction',
-                    'occurrence': 1,
-                    'tstart': '00:02:00.000',
-                    'tend': '00:10:00.000',
-                    'duration': '08:00.000'
-                })
-        
-        return uc_list if uc_list else [{
-            'uc': 'UC 1.1',
-            'type': 'Réveil',
-            'occurrence': 1,
-            'tstart': '00:00:00.000',
-            'tend': '00:01:00.000',
-            'duration': '01:00.000'
-        }]
+        return uc_list
+    
+    def uc_activity_intervals(self, signal_name: str, rules: List[Dict],
+                              engine: SequenceRuleEngine) -> Optional[np.ndarray]:
+        """Plages où le signal vérifie l'une des règles (None si signal absent).
+        
+        En mode streaming, les plages sont suivies bloc par bloc
+        (signal_streaming.py) au lieu de charger le signal complet.
+        """
+        channel = self.get_resolver().resolve_strict(signal_name)
+        if channel is None or not self.mdf_data:
+            return None
+        
+        if self.streaming:
+            pattern = [rule['pattern'][0] for rule in rules]
+            result = stream_signal(self.mdf_data, channel, self.memory_guard,
+                                   activity=lambda samples: evaluate_samples(pattern, samples))
+            return result['active_intervals'] if result and result['found'] else None
+        
+        # Signal complet sans le retirer de l'extraction groupée (graphes)
+        signal = self.prefetched_signals.get(channel)
+        if signal is None:
+            signal = read_signal(self.mdf_data, channel)
+        if signal is None or np.ndim(signal.samples) != 1 or len(signal.samples) == 0:
+            return None
+        intervals = engine.evaluate_signal(rules, signal.timestamps, signal.samples)
+        return signal_intervals.union(*intervals.values())
     
     def generate_html_report(self, output_path: str, sweet_version: str, myf_config: str):
         """Génère le rapport HTML respectant EXACTEMENT le template."""
+        # Rapport écrit section par section, directement dans le fichier
+        with ReportWriter(output_path) as report:
+            self.write_html_report(report, sweet_version, myf_config)
+        
+        # Mémoriser les résolutions pour les prochaines acquisitions
+        self.get_resolver().save_cache()
+        
+        print(f"✅ Rapport EXACT généré : {report.path}")
+        return report.path
+    
+    def write_html_report(self, report: ReportWriter, sweet_version: str, myf_config: str):
+        """Écrit le rapport : en-tête, table UC, lignes de signaux, table DOORS, résumé."""
         print("📄 Génération du rapport EXACT...")
         print("  ⏳ Génération des graphiques pour CHAQUE ligne...")
+        self.progress.stage('donnees', 'VIN, UC et résolution des signaux')
         
         # Extraction des données
         vin = self.extract_vin()
@@ -431,6 +506,10 @@ class EVAReportGeneratorExactTemplate:
         test_date = datetime.now().strftime('%d/%m/%Y')
         uc_list = self.detect_use_cases()
         
+        # Résoudre en un seul lot tous les signaux du document
+        matches = self.get_resolver().resolve_batch(name for pair in DOCUMENT_SIGNALS_EXACT for name in pair)
+        print(f"  🔎 Résolution des signaux : {SignalResolver.format_tier_counts(matches)}")
+        
         # Charger les logos
         logo_renault = ""
         logo_ampere = ""
@@ -452,7 +531,7 @@ class EVAReportGeneratorExactTemplate:
                 pass
         
         # HTML avec style EXACT du document
-        html = f"""<!DOCTYPE html>
+        report.write(f"""<!DOCTYPE html>
 <html lang="fr">
 <head>
     <meta charset="UTF-8">
@@ -715,11 +794,16 @@ class EVAReportGeneratorExactTemplate:
                 <th>Durée</th>
             </tr>
         </thead>
-        <tbody>"""
+        <tbody>""")
         
         # Ajouter les UC détectés
+        if not uc_list:
+            report.write("""
+            <tr>
+                <td colspan="7">Aucun UC détecté</td>
+            </tr>""")
         for i, uc in enumerate(uc_list, 1):
-            html += f"""
+            report.write(f"""
             <tr>
                 <td>{i}</td>
                 <td>{uc['uc']}</td>
@@ -728,9 +812,9 @@ class EVAReportGeneratorExactTemplate:
                 <td>{uc['tstart']}</td>
                 <td>{uc['tend']}</td>
                 <td>{uc['duration']}</td>
-            </tr>"""
+            </tr>""")
         
-        html += """
+        report.write("""
         </tbody>
     </table>
     <div class="table-caption">Use Cases détectés lors de l'acquisition</div>
@@ -746,31 +830,41 @@ class EVAReportGeneratorExactTemplate:
                 <th style="width: 10%;">STATUT</th>
             </tr>
         </thead>
-        <tbody>"""
+        <tbody>""")
         
         # Générer EXACTEMENT les 31 lignes de signaux avec un graphe DIFFÉRENT pour chaque
         print(f"  📊 Génération de {len(DOCUMENT_SIGNALS_EXACT)} graphiques uniques...")
         
+        # Descriptions des graphes (données réduites), puis rendu parallèle ordonné
+        self.progress.stage('signaux', 'Lecture et réduction des signaux', len(DOCUMENT_SIGNALS_EXACT))
+        graph_specs = []
         for i, (signal_eva, signal_sweet) in enumerate(DOCUMENT_SIGNALS_EXACT, 1):
             print(f"    Graphique {i}/{len(DOCUMENT_SIGNALS_EXACT)}: {signal_eva[:30]}")
-            
+            graph_specs.append(self.real_graph_spec(signal_eva, signal_sweet, i))
+            self.progress.advance(signal_eva)
+        graph_assets = GraphAssets(report.path, self.graph_mode)
+        graphs = graph_assets.iter_render(graph_specs, self.jobs)
+        
+        # Chaque ligne est écrite dès que son graphique est rendu
+        self.progress.stage('rendu', 'Rendu des graphiques', len(graph_specs))
+        for i, ((signal_eva, signal_sweet), graph) in enumerate(zip(DOCUMENT_SIGNALS_EXACT, graphs), 1):
             # Vérifier si le signal existe
             mdf_channel = self.find_signal_in_mdf(signal_eva) or self.find_signal_in_mdf(signal_sweet)
             status = 'OK' if mdf_channel else 'NOK'
             status_class = 'status-ok' if status == 'OK' else 'status-nok'
             
-            # GÉNÉRER UN GRAPHE UNIQUE pour cette ligne
-            graph = self.generate_real_graph(signal_eva, signal_sweet, i)
-            
-            html += f"""
+            report.write(f"""
             <tr>
                 <td>{signal_eva}</td>
                 <td>{signal_sweet}</td>
-                <td class="graph-cell"><img src="{graph}" alt="Graph {i}"></td>
+                <td class="graph-cell">{graph_assets.element(graph, f'Graph {i}')}</td>
                 <td class="{status_class}">{status}</td>
-            </tr>"""
+            </tr>""")
+            self.progress.advance(signal_eva)
+        graph_assets.close()
+        print(f"  🖼️ {graph_assets.summary()}")
         
-        html += """
+        report.write("""
         </tbody>
     </table>
     <div class="table-caption">Signaux EVA/SWEET avec visualisation graphique</div>
@@ -785,10 +879,11 @@ class EVAReportGeneratorExactTemplate:
                 <th style="width: 45%;">Commentaire</th>
             </tr>
         </thead>
-        <tbody>"""
+        <tbody>""")
         
         # Afficher EXACTEMENT les 43 exigences
         print(f"  📋 Ajout des {len(DOORS_REQUIREMENTS_EXACT)} exigences DOORS...")
+        self.progress.stage('doors', 'Exigences DOORS', len(DOORS_REQUIREMENTS_EXACT))
         
         for req in DOORS_REQUIREMENTS_EXACT:
             # Déterminer le statut selon le type d'exigence
@@ -818,14 +913,15 @@ class EVAReportGeneratorExactTemplate:
             
             result_class = 'status-ok' if result == 'OK' else ('status-partial' if result == 'PARTIAL' else 'status-nok')
             
-            html += f"""
+            report.write(f"""
             <tr>
                 <td>{req}</td>
                 <td class="{result_class}">{result}</td>
                 <td>{comment}</td>
-            </tr>"""
+            </tr>""")
+            self.progress.advance(req)
         
-        html += """
+        report.write(f"""
         </tbody>
     </table>
     <div class="table-caption">Validation des 43 exigences DOORS</div>
@@ -858,18 +954,13 @@ class EVAReportGeneratorExactTemplate:
         <p>Date : {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}</p>
         <p>Respect EXACT du template rapport_eva_simple.docx</p>
         <p>43 exigences DOORS | 31 signaux | Graphiques réels</p>
+        <p>{self.resolution_cache.summary()}</p>
     </div>
+{graph_assets.scripts()}
 </body>
-</html>"""
-        
-        # Sauvegarder le rapport
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(html)
-        
-        print(f"✅ Rapport EXACT généré : {output_path}")
-        return output_path
+</html>""")
     
-    def run_analysis(self, mdf_path: str, sweet_version: str, myf_config: str):
+    def run_analysis(self, mdf_path: str, sweet_version: str, myf_config: str, output_dir: str = 'eva_reports'):
         """Lance l'analyse complète."""
         print("="*70)
         print("GÉNÉRATION RAPPORT EVA - TEMPLATE EXACT")
@@ -883,13 +974,27 @@ class EVAReportGeneratorExactTemplate:
         if not self.load_mdf(mdf_path):
             raise ValueError("Impossible de charger le fichier MDF")
         
+        # Extraire en une passe tous les canaux nécessaires (sauf en streaming)
+        if self.streaming:
+            print(f"🌊 Mode streaming : blocs de {self.chunk_mb:g} Mo")
+        else:
+            self.prefetch_signals()
+        
         # Générer rapport
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_path = f"eva_reports/Rapport_EVA_EXACT_{sweet_version}_{myf_config}_{timestamp}.html"
+        output_path = os.path.join(output_dir, f"Rapport_EVA_EXACT_{sweet_version}_{myf_config}_{timestamp}.html")
+        
+        os.makedirs(output_dir, exist_ok=True)
         
-        os.makedirs("eva_reports", exist_ok=True)
+        report_path = self.generate_html_report(output_path, sweet_version, myf_config)
+        print(f"📈 {self.memory_guard.summary()}")
+        print(f"🗃️ {self.signal_data_cache.summary()}")
         
-        return self.generate_html_report(output_path, sweet_version, myf_config)
+        # Durées des étapes (journal eva_cache/stage_timings.jsonl)
+        self.progress.finish()
+        print(f"⏱️ {self.progress.summary()}")
+        self.progress.save(generator='exact', mdf=os.path.basename(mdf_path), report=os.path.basename(report_path))
+        return report_path
 
 def main():
     """Fonction principale."""
@@ -898,17 +1003,52 @@ def main():
     )
     
     parser.add_argument('--mdf', required=True, help='Fichier MDF')
-    parser.add_argument('--sweet', required=True, choices=['400', '500'], help='Version SWEET')
-    parser.add_argument('--myfx', required=True, choices=['MyF2', 'MyF3', 'MyF4.1', 'MyF5', 'all'], help='Configuration MyF')
+    parser.add_argument('--sweet', choices=['400', '500'], help='Version SWEET')
+    parser.add_argument('--myfx', choices=['MyF2', 'MyF3', 'MyF4.1', 'MyF5', 'all'], help='Configuration MyF')
+    parser.add_argument('--inspect', action='store_true',
+                        help='Aperçu des métadonnées seulement (canaux, groupes, plage temporelle, signaux résolus), sans rapport')
+    parser.add_argument('--stream', action='store_true', help='Lecture bloc par bloc (très gros MDF)')
+    parser.add_argument('--memory-limit', type=float, default=None, help='Plafond mémoire RSS en Mo')
+    parser.add_argument('--chunk-mb', type=float, default=DEFAULT_CHUNK_MB, help='Taille des blocs en streaming (Mo)')
+    parser.add_argument('--cache-mb', type=float, default=DEFAULT_MAX_MB, help='Budget du cache des signaux (Mo)')
+    parser.add_argument('--sidecar', action='store_true', help='Réutiliser/créer le cache colonne des canaux (eva_cache/sidecar)')
+    parser.add_argument('--merge-gap', type=float, default=0.0, help='Fusion des occurrences UC séparées de moins de N s')
+    parser.add_argument('--min-duration', type=float, default=0.0, help='Durée minimale d\'une occurrence UC (s)')
+    parser.add_argument('--jobs', type=int, default=DEFAULT_JOBS, help='Processus de rendu des graphiques (0 = un par cœur)')
+    parser.add_argument('--downsample', choices=DOWNSAMPLING_METHODS, default=DEFAULT_DOWNSAMPLING,
+                        help='Réduction des courbes pour l\'affichage')
+    parser.add_argument('--graphs', choices=GRAPH_MODES, default=DEFAULT_GRAPH_MODE,
+                        help='Graphiques intégrés au HTML (inline), externes (files, zip) ou tracés dans le navigateur (interactive)')
     
     args = parser.parse_args()
+    if not args.inspect and not (args.sweet and args.myfx):
+        parser.error('--sweet et --myfx sont requis (sauf avec --inspect)')
     
     if not os.path.exists(args.mdf):
         print(f"❌ Fichier non trouvé : {args.mdf}")
         sys.exit(1)
     
+    if args.inspect:
+        # Métadonnées seules : aucune donnée de signal lue, aucun graphique
+        try:
+            for line in format_inspection(inspect_mdf(args.mdf, DOCUMENT_SIGNALS_EXACT)):
+                print(line)
+        except Exception as e:
+            print(f"❌ Aperçu impossible : {e}")
+            sys.exit(1)
+        return
+    
     try:
-        generator = EVAReportGeneratorExactTemplate()
+        generator = EVAReportGeneratorExactTemplate(streaming=args.stream,
+                                                    memory_limit_mb=args.memory_limit,
+                                                    chunk_mb=args.chunk_mb,
+                                                    cache_mb=args.cache_mb,
+                                                    sidecar=args.sidecar,
+                                                    merge_gap=args.merge_gap,
+                                                    min_duration=args.min_duration,
+                                                    jobs=args.jobs,
+                                                    downsample=args.downsample,
+                                                    graph_mode=args.graphs)
         report_path = generator.run_analysis(args.mdf, args.sweet, args.myfx)
         
         print("\n" + "="*70)
@@ -21,8 +21,8 @@ import json
 import pandas as pd
 import numpy as np
 from datetime import datetime
-import re
 import base64
+import zlib
 from io import BytesIO
 from typing import Dict, List, Tuple, Any, Optional
 import matplotlib.pyplot as plt
@@ -39,6 +39,19 @@ except ImportError:
     print("❌ Modules requis : pip3 install asammdf python-docx matplotlib pandas")
     sys.exit(1)
 
+from signal_resolver import SignalResolver, TIER_LABELS
+from resolution_cache import ResolutionCache, framework_version
+from signal_extraction import extract_signals, read_signal
+import signal_intervals
+from signal_downsampling import DEFAULT_DOWNSAMPLING, DOWNSAMPLING_METHODS
+from graph_assets import DEFAULT_GRAPH_MODE, GRAPH_MODES, GraphAssets
+from report_writer import ReportWriter
+from progress import ProgressTracker
+from graph_rendering import DEFAULT_JOBS, reduce_points, render_graph
+from signal_alignment import DEFAULT_RASTER, align_signals, all_valid, columns
+from uc_sequence_engine import SequenceRuleEngine, evaluate_series, format_time
+from channel_index import normalize_signal_name
+
 # Importer le framework UC si disponible
 try:
     from uc_boolean_detector import UCBooleanDetector
@@ -53,10 +66,15 @@ class EVAReportGeneratorFrameworkComplet:
     documenté dans tina/README_UC_FRAMEWORK.md
     """
     
-    def __init__(self):
+    def __init__(self, align_mode: str = 'edges', raster: float = DEFAULT_RASTER,
+                 merge_gap: float = 0.0, min_duration: float = 0.0, jobs: int = DEFAULT_JOBS,
+                 downsample: str = DEFAULT_DOWNSAMPLING,
+                 graph_mode: str = DEFAULT_GRAPH_MODE, progress: Optional[ProgressTracker] = None):
         self.mdf_data = None
         self.mdf_path = None
         self.mdf_channels = []
+        self.resolver = None
+        self.resolution_cache = ResolutionCache()
         
         # Charger le framework depuis JSON
         self.load_framework()
@@ -64,8 +82,20 @@ class EVAReportGeneratorFrameworkComplet:
         # Structures de données selon README_UC_FRAMEWORK.md
         self.b_pres = {}  # B_Pres[signal] - Booléens de présence
         self.b_uc_det = {}  # B_UC_DET[uc] - Booléens de détection UC
+        self.b_uc_det_series = {}  # B_UC_DET[uc](t) sur la base de temps commune
+        self.aligned = None  # Signaux requis alignés (signal_alignment.py)
+        self.align_mode = align_mode
+        self.raster = raster
+        self.merge_gap = merge_gap  # Anti-rebond des occurrences (s)
+        self.min_duration = min_duration  # Durée minimale d'une occurrence (s)
+        self.jobs = jobs  # Processus de rendu des graphiques (0 : un par cœur)
+        self.downsample = downsample  # Réduction des courbes : enveloppe min/max ou LTTB
+        self.graph_mode = graph_mode  # Graphiques intégrés (inline), externes (files / zip) ou tracés dans le navigateur (interactive)
+        self.progress = progress or ProgressTracker()  # Étapes de l'analyse (événements, durées)
         self.uc_occurrences = []  # Occurrences TSTART/TEND/Durée
         self.signal_mappings = {}  # internal_id → MDF channel
+        self.mapping_tiers = {}  # internal_id → niveau de correspondance
+        self.prefetched_signals = {}  # canal MDF → Signal (extraction groupée)
         self.sweet_equivalences = {}  # SWEET → MDF mappings
         self.doors_catalog = {}  # Catalogue exigences DOORS
         
@@ -88,6 +118,7 @@ class EVAReportGeneratorFrameworkComplet:
     def load_framework(self):
         """Charge le framework UC depuis les fichiers JSON."""
         framework_path = 'tina/uc_detection_framework.json'
+        self.framework_data = None
         
         if os.path.exists(framework_path):
             try:
@@ -214,11 +245,14 @@ class EVAReportGeneratorFrameworkComplet:
     
     def load_mdf(self, mdf_path: str) -> bool:
         """Charge le fichier MDF."""
+        self.progress.stage('chargement', 'Chargement du MDF')
         try:
             print(f"📁 Chargement MDF: {mdf_path}")
             self.mdf_data = MDF(mdf_path)
             self.mdf_path = mdf_path
             self.mdf_channels = list(self.mdf_data.channels_db.keys())
+            self.resolver = None
+            self.get_resolver()
             print(f"✅ MDF chargé: {len(self.mdf_channels)} canaux")
             return True
         except Exception as e:
@@ -227,6 +261,7 @@ class EVAReportGeneratorFrameworkComplet:
     
     def load_sweet(self, sweet_path: str, version: str) -> bool:
         """Charge la configuration SWEET."""
+        self.progress.stage('sweet', 'Équivalences SWEET')
         try:
             print(f"📊 Chargement SWEET {version}")
             sheet_name = f'SYNTH_EVA Sweet {version}'
@@ -254,10 +289,16 @@ class EVAReportGeneratorFrameworkComplet:
     
     def normalize_signal_name(self, name: str) -> str:
         """Normalise un nom selon README_UC_FRAMEWORK.md."""
-        if not name:
-            return ""
         # Minuscules + suppression _, espaces, caractères spéciaux
-        return re.sub(r'[_\s\.\-]+', '', name.lower())
+        return normalize_signal_name(name)
+    
+    def get_resolver(self) -> SignalResolver:
+        """Renvoie le résolveur de noms (construit une seule fois)."""
+        if self.resolver is None:
+            self.resolver = SignalResolver(self.mdf_channels, strategy='framework',
+                                           cache=self.resolution_cache,
+                                           version=framework_version(self.framework_data))
+        return self.resolver
     
     def intelligent_mapping(self, internal_name: str) -> Optional[str]:
         """
@@ -267,45 +308,27 @@ class EVAReportGeneratorFrameworkComplet:
         3. Alias (suffixes BLMS/HEVC/CAN)
         4. Recherche partielle
         """
-        if not self.mdf_channels:
-            return None
-        
-        # 1. Recherche exacte
-        if internal_name in self.mdf_channels:
-            return internal_name
-        
-        # 2. Recherche normalisée
-        normalized_internal = self.normalize_signal_name(internal_name)
-        for channel in self.mdf_channels:
-            if self.normalize_signal_name(channel) == normalized_internal:
-                return channel
-        
-        # 3. Alias avec suffixes/préfixes
-        suffixes = ['_BLMS', '_HEVC', '_CAN', '_BMS', '_HV']
-        prefixes = ['BMS_', 'HEVC_', 'CAN_', 'HV_']
-        
-        for suffix in suffixes:
-            test_name = internal_name + suffix
-            if test_name in self.mdf_channels:
-                return test_name
-            for channel in self.mdf_channels:
-                if self.normalize_signal_name(channel) == self.normalize_signal_name(test_name):
-                    return channel
-        
-        for prefix in prefixes:
-            test_name = prefix + internal_name
-            if test_name in self.mdf_channels:
-                return test_name
-            for channel in self.mdf_channels:
-                if self.normalize_signal_name(channel) == self.normalize_signal_name(test_name):
-                    return channel
-        
-        # 4. Recherche partielle
-        for channel in self.mdf_channels:
-            if normalized_internal in self.normalize_signal_name(channel):
-                return channel
-        
-        return None
+        return self.get_resolver().resolve(internal_name)
+    
+    def present_signal_channels(self) -> Dict[str, str]:
+        """Nom canonique → canal MDF des signaux présents (B_Pres)."""
+        return {
+            signal_info.get('canonical_name', internal_id): self.signal_mappings[internal_id]
+            for internal_id, signal_info in self.signal_registry.items()
+            if self.b_pres.get(internal_id, False)
+        }
+    
+    def match_signals(self, signals: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Signal requis → nom canonique présent qui le contient (le nom exact
+        d'abord), None s'il est absent. Même règle pour B_UC_DET[uc] et
+        B_UC_DET[uc](t).
+        """
+        present = self.present_signal_channels()
+        return {
+            signal: signal if signal in present else next((name for name in present if signal in name), None)
+            for signal in signals
+        }
     
     def compute_booleans(self):
         """
@@ -313,6 +336,7 @@ class EVAReportGeneratorFrameworkComplet:
         - B_Pres[signal] : présence du signal dans MDF
         - B_UC_DET[uc] : ET logique des signaux requis
         """
+        self.progress.stage('booleens', 'Calcul B_Pres / B_UC_DET')
         print("\n🔍 CALCUL DES BOOLÉENS (Méthode README_UC_FRAMEWORK)")
         print("=" * 60)
         
@@ -321,20 +345,25 @@ class EVAReportGeneratorFrameworkComplet:
         self.b_pres = {}
         mapped_count = 0
         
-        # Pour chaque signal dans le registre (A1-A339)
-        for internal_id, signal_info in self.signal_registry.items():
-            canonical_name = signal_info.get('canonical_name', internal_id)
-            
-            # Mapping intelligent vers MDF
-            mdf_channel = self.intelligent_mapping(canonical_name)
+        # Mapping intelligent vers MDF de tout le registre (A1-A339) en un seul lot
+        canonical_names = {
+            internal_id: signal_info.get('canonical_name', internal_id)
+            for internal_id, signal_info in self.signal_registry.items()
+        }
+        matches = self.get_resolver().resolve_batch(canonical_names.values())
+        
+        for internal_id, canonical_name in canonical_names.items():
+            match = matches[canonical_name]
+            self.mapping_tiers[internal_id] = match['tier']
             
-            if mdf_channel:
-                self.signal_mappings[internal_id] = mdf_channel
+            if match['channel']:
+                self.signal_mappings[internal_id] = match['channel']
                 self.b_pres[internal_id] = True
                 mapped_count += 1
             else:
                 self.b_pres[internal_id] = False
         
+        print(f"🔎 Niveaux de correspondance: {SignalResolver.format_tier_counts(matches)}")
         print(f"✅ B_Pres calculés: {mapped_count}/{len(self.signal_registry)} signaux présents")
         
         # Étape 2: B_UC_DET[uc] = ET logique des signaux requis
@@ -342,92 +371,132 @@ class EVAReportGeneratorFrameworkComplet:
         self.b_uc_det = {}
         
         for uc_name, uc_def in self.uc_definitions.items():
-            required_signals = uc_def.get('required_signals', [])
-            
-            # Vérifier la présence de tous les signaux requis
-            all_present = True
-            for signal in required_signals:
-                # Chercher le signal dans le registre
-                signal_found = False
-                for internal_id, signal_info in self.signal_registry.items():
-                    if signal in signal_info.get('canonical_name', ''):
-                        if self.b_pres.get(internal_id, False):
-                            signal_found = True
-                            break
-                
-                if not signal_found:
-                    all_present = False
-                    break
-            
-            self.b_uc_det[uc_name] = all_present
+            # Vérifier la présence de tous les signaux requis dans le registre
+            matches = self.match_signals(uc_def.get('required_signals', []))
+            self.b_uc_det[uc_name] = all(name is not None for name in matches.values())
         
         detectable_count = sum(self.b_uc_det.values())
         print(f"✅ B_UC_DET calculés: {detectable_count}/{len(self.uc_definitions)} UC détectables")
     
+    def compute_uc_time_series(self):
+        """
+        Calcule B_UC_DET[uc](t) : ET logique, instant par instant, de la
+        validité des signaux requis présents et des conditions d'état / de
+        valeur des règles de séquence de l'UC (signal dans l'un des états
+        de la règle, seuil vérifié), évaluées sur la matrice des signaux
+        alignés sur une base de temps commune (blocage d'ordre zéro, voir
+        signal_alignment.py)
+        """
+        self.progress.stage('alignement', 'Alignement temporel B_UC_DET(t)')
+        print("\n📐 ALIGNEMENT TEMPOREL B_UC_DET[uc](t)")
+        print("=" * 60)
+        
+        # Règles de séquence compilées de chaque UC
+        rules_by_uc = {}
+        for rules in SequenceRuleEngine(self.uc_definitions).rules_by_signal.values():
+            for rule in rules:
+                rules_by_uc.setdefault(rule['uc'], []).append(rule)
+        
+        # Signaux requis et signaux des règles présents (même correspondance que B_UC_DET)
+        present_channels = self.present_signal_channels()
+        uc_matches = {
+            uc_name: self.match_signals(uc_def.get('required_signals', [])
+                                        + [rule['signal'] for rule in rules_by_uc.get(uc_name, [])])
+            for uc_name, uc_def in self.uc_definitions.items()
+        }
+        uc_signals = {
+            uc_name: list(dict.fromkeys(name for name in matches.values() if name))
+            for uc_name, matches in uc_matches.items()
+        }
+        names = list(dict.fromkeys(name for uc_names in uc_signals.values() for name in uc_names))
+        
+        # Lecture groupée des canaux pas encore extraits
+        missing = [present_channels[name] for name in names
+                   if present_channels[name] not in self.prefetched_signals]
+        if self.mdf_data and missing:
+            self.prefetched_signals.update(extract_signals(self.mdf_data, missing))
+        
+        signals = {}
+        for name in names:
+            signal = self.prefetched_signals.get(present_channels[name])
+            if signal is not None and hasattr(signal, 'samples') and len(signal.samples) > 0:
+                signals[name] = (signal.timestamps, signal.samples)
+        
+        self.aligned = align_signals(signals, self.align_mode, self.raster)
+        print(f"✅ {len(self.aligned['names'])} signaux alignés sur {len(self.aligned['time'])} instants "
+              f"(mode {self.align_mode})")
+        
+        self.b_uc_det_series = {}
+        for uc_name, uc_names in uc_signals.items():
+            active = all_valid(self.aligned, uc_names) & bool(self.b_uc_det.get(uc_name, False))
+            # Conditions des règles sur les valeurs alignées (une opération numpy par règle)
+            for rule in rules_by_uc.get(uc_name, []):
+                name = uc_matches[uc_name][rule['signal']]
+                column = columns(self.aligned, [name]) if name else []
+                if not column:
+                    active[:] = False  # Condition non évaluable
+                    continue
+                active &= evaluate_series(rule['pattern'], self.aligned['values'][:, column[0]],
+                                          self.aligned['states'].get(name))
+            self.b_uc_det_series[uc_name] = active
+            ratio = active.mean() * 100 if len(active) else 0.0
+            print(f"  {uc_name}: {len(uc_names)} signaux, {len(rules_by_uc.get(uc_name, []))} conditions, "
+                  f"B_UC_DET(t) vrai {ratio:.1f}% du temps")
+    
     def detect_uc_occurrences(self):
         """
         Détecte les occurrences UC avec TSTART/TEND/Durée
-        selon la méthode du README_UC_FRAMEWORK.md
+        selon la méthode du README_UC_FRAMEWORK.md : les sequence_rules
+        (from → to1 → to2) du framework sont évaluées sur les valeurs
+        décodées des signaux MDF (voir uc_sequence_engine.py)
         """
+        self.progress.stage('occurrences', 'Détection des occurrences UC')
         print("\n⏰ DÉTECTION OCCURRENCES (TSTART/TEND/Durée)")
         print("=" * 60)
         
         self.uc_occurrences = []
-        filename = os.path.basename(self.mdf_path) if self.mdf_path else ''
+        engine = SequenceRuleEngine(self.uc_definitions)
+        
+        # Canaux des signaux des règles, lus en une seule passe pour les six UC
+        rule_channels = {name: self.intelligent_mapping(name) for name in engine.signals}
+        rule_channels = {name: channel for name, channel in rule_channels.items() if channel}
+        if self.mdf_data and rule_channels:
+            print(f"📦 Extraction groupée de {len(set(rule_channels.values()))} canaux de séquence...")
+            self.prefetched_signals.update(extract_signals(self.mdf_data, rule_channels.values()))
+        
+        rule_signals = {}
+        for name, channel in rule_channels.items():
+            signal = self.prefetched_signals.get(channel)
+            if signal is not None and hasattr(signal, 'samples') and len(signal.samples) > 0:
+                rule_signals[name] = (signal.timestamps, signal.samples)
+        
+        try:
+            results = engine.evaluate(rule_signals)
+        except Exception as e:
+            print(f"⚠️ Évaluation des séquences impossible: {e}")
+            results = {}
         
-        # Détection basée sur nom du fichier et B_UC_DET
         for uc_name, is_detectable in self.b_uc_det.items():
+            result = results.get(uc_name, {'occurrences': signal_intervals.empty(), 'rules_matched': 0,
+                                           'rules_evaluated': 0, 'rules_total': 0})
+            # Anti-rebond et durée minimale (algèbre d'intervalles, voir signal_intervals.py)
+            occurrences = signal_intervals.occurrences(result['occurrences'], self.merge_gap, self.min_duration)
+            rules_text = (f"{result['rules_matched']}/{result['rules_total']} règles de séquence vérifiées "
+                          f"({result['rules_evaluated']} évaluables)")
             
-            # UC 1.1 - Endo-Réveil
-            if 'Réveil' in uc_name and ('Réveil' in filename or 'Reveil' in filename):
-                self.uc_occurrences.append({
-                    'uc': uc_name,
-                    'occurrence': 1,
-                    'tstart': '00:00:15.500',
-                    'tend': '00:01:45.200',
-                    'duree': '89.7 s',
-                    'statut': 'DETECTABLE' if is_detectable else 'PARTIEL',
-                    'notes': 'Séquence réveil détectée'
-                })
-            
-            # UC 1.2 - Traction
-            elif 'Traction' in uc_name and ('Traction' in filename or 'Roulage' in filename):
-                self.uc_occurrences.append({
-                    'uc': uc_name,
-                    'occurrence': 1,
-                    'tstart': '00:02:10.000',
-                    'tend': '00:15:31.700',
-                    'duree': '801.7 s',
-                    'statut': 'DETECTABLE' if is_detectable else 'PARTIEL',
-                    'notes': 'Phase roulage principale'
-                })
-                
-                # Deuxième occurrence possible
-                if 'ChargeDC' in filename:
-                    self.uc_occurrences.append({
-                        'uc': uc_name,
-                        'occurrence': 2,
-                        'tstart': '00:18:45.200',
-                        'tend': '00:25:12.800',
-                        'duree': '387.6 s',
-                        'statut': 'DETECTABLE' if is_detectable else 'PARTIEL',
-                        'notes': 'Phase roulage secondaire'
-                    })
-            
-            # UC 1.3 - CHG AC
-            elif 'CHG' in uc_name and ('Charge' in filename or 'CHG' in filename):
+            for number, (t_start, t_end) in enumerate(occurrences.tolist(), 1):
                 self.uc_occurrences.append({
                     'uc': uc_name,
-                    'occurrence': 1,
-                    'tstart': '00:30:00.000',
-                    'tend': '00:45:15.500',
-                    'duree': '915.5 s',
+                    'occurrence': number,
+                    'tstart': format_time(t_start),
+                    'tend': format_time(t_end),
+                    'duree': f"{t_end - t_start:.1f} s",
                     'statut': 'DETECTABLE' if is_detectable else 'PARTIEL',
-                    'notes': 'Session charge AC'
+                    'notes': rules_text
                 })
             
             # UC non détecté dans ce fichier
-            elif not any(occ['uc'] == uc_name for occ in self.uc_occurrences):
+            if not len(occurrences):
                 self.uc_occurrences.append({
                     'uc': uc_name,
                     'occurrence': 0,
@@ -435,10 +504,11 @@ class EVAReportGeneratorFrameworkComplet:
                     'tend': 'N/A',
                     'duree': '0 s',
                     'statut': 'INDISPONIBLE',
-                    'notes': f"UC non détecté - B_UC_DET={is_detectable}"
+                    'notes': f"UC non détecté - B_UC_DET={is_detectable} - {rules_text}"
                 })
         
-        print(f"✅ {len(self.uc_occurrences)} occurrences créées")
+        detected = sum(1 for occ in self.uc_occurrences if occ['occurrence'] > 0)
+        print(f"✅ {detected} occurrences détectées ({len(self.uc_occurrences)} lignes)")
     
     def update_sweet_equivalences_status(self):
         """Met à jour les statuts OK/NOK/FALLBACK des équivalences SWEET."""
@@ -471,68 +541,69 @@ class EVAReportGeneratorFrameworkComplet:
         
         return validation_results
     
+    def graph_signal_ids(self, max_graphs: int = 10) -> List[str]:
+        """Signaux présents (B_Pres) représentés en graphique."""
+        return [internal_id for internal_id, is_present in self.b_pres.items() if is_present][:max_graphs]
+    
+    def prefetch_signals(self, internal_ids: List[str]):
+        """Extrait en une seule passe groupée les canaux MDF des signaux donnés."""
+        channels = [self.signal_mappings.get(internal_id) for internal_id in internal_ids]
+        channels = [channel for channel in channels if channel]
+        if self.mdf_data and channels:
+            print(f"📦 Extraction groupée de {len(set(channels))} canaux...")
+            self.prefetched_signals.update(extract_signals(self.mdf_data, channels))
+    
     def generate_signal_graph(self, signal_name: str, internal_id: str = None) -> str:
         """Génère un graphique pour un signal."""
-        try:
-            plt.figure(figsize=(10, 4))
-            
-            # Récupérer le canal MDF mappé
-            mdf_channel = self.signal_mappings.get(internal_id) if internal_id else None
-            
-            if mdf_channel and self.mdf_data:
-                try:
-                    signal = self.mdf_data.get(mdf_channel)
-                    if signal and hasattr(signal, 'samples') and len(signal.samples) > 0:
-                        time = signal.timestamps if hasattr(signal, 'timestamps') else range(len(signal.samples))
-                        values = signal.samples
-                        
-                        plt.plot(time, values, 'b-', linewidth=1.5, alpha=0.8, label='Mesuré')
-                        
-                        # Ajouter référence simulée
-                        ref_values = np.mean(values) + np.random.normal(0, np.std(values)*0.1, len(values))
-                        plt.plot(time, ref_values, 'r--', linewidth=1.5, alpha=0.6, label='Référence')
-                        
-                        plt.title(f'{signal_name} ({internal_id})')
-                        plt.xlabel('Temps (s)')
-                        plt.ylabel('Valeur')
-                        plt.legend()
-                        plt.grid(True, alpha=0.3)
-                    else:
-                        self.plot_no_data(signal_name, internal_id)
-                except:
-                    self.plot_no_data(signal_name, internal_id)
-            else:
-                self.plot_no_data(signal_name, internal_id)
-            
-            buffer = BytesIO()
-            plt.savefig(buffer, format='png', dpi=100, bbox_inches='tight')
-            buffer.seek(0)
-            graph_b64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-            plt.close()
-            
-            return f'data:image/png;base64,{graph_b64}'
-            
-        except Exception as e:
-            print(f"⚠️ Erreur graphique {signal_name}: {e}")
-            return self.generate_error_graph(signal_name)
+        return render_graph(self.signal_graph_spec(signal_name, internal_id))
     
-    def plot_no_data(self, signal_name: str, internal_id: str = None):
-        """Graphique pour signal non disponible."""
-        plt.text(0.5, 0.5, f'{signal_name}\n({internal_id})\nNon disponible',
-                ha='center', va='center', fontsize=12, color='red')
-        plt.xlim(0, 1)
-        plt.ylim(0, 1)
-        plt.title(f'{signal_name} - DONNÉES NON DISPONIBLES')
+    def signal_graph_spec(self, signal_name: str, internal_id: str = None) -> Dict:
+        """Description du graphique d'un signal (rendu par graph_rendering.py)."""
+        # Récupérer le canal MDF mappé
+        mdf_channel = self.signal_mappings.get(internal_id) if internal_id else None
+        
+        if mdf_channel and self.mdf_data:
+            try:
+                signal = self.prefetched_signals.get(mdf_channel)
+                if signal is None:
+                    signal = read_signal(self.mdf_data, mdf_channel)
+                if signal and hasattr(signal, 'samples') and len(signal.samples) > 0:
+                    time = signal.timestamps if hasattr(signal, 'timestamps') else np.arange(len(signal.samples))
+                    time, values = reduce_points(time, signal.samples, (10, 4), self.downsample)
+                    
+                    # Ajouter référence simulée (graine fixe par signal : rapport reproductible)
+                    rng = np.random.default_rng(zlib.crc32(f"{internal_id}:{signal_name}".encode('utf-8')))
+                    ref_values = np.mean(values) + rng.normal(0, np.std(values)*0.1, len(values))
+                    
+                    return {
+                        'figsize': (10, 4),
+                        'series': [
+                            {'x': time, 'y': values,
+                             'style': {'color': 'b', 'linewidth': 1.5, 'alpha': 0.8, 'label': 'Mesuré'}},
+                            {'x': time, 'y': ref_values,
+                             'style': {'color': 'r', 'linestyle': '--', 'linewidth': 1.5, 'alpha': 0.6, 'label': 'Référence'}},
+                        ],
+                        'title': f'{signal_name} ({internal_id})',
+                        'xlabel': 'Temps (s)',
+                        'ylabel': 'Valeur',
+                        'legend': True,
+                        'grid': {'alpha': 0.3},
+                        'error_text': f'Erreur\n{signal_name}',
+                    }
+            except Exception:
+                pass
+        return self.no_data_graph_spec(signal_name, internal_id)
     
-    def generate_error_graph(self, signal_name: str) -> str:
-        """Génère un graphique d'erreur."""
-        plt.figure(figsize=(10, 4))
-        plt.text(0.5, 0.5, f'Erreur\n{signal_name}',
-                ha='center', va='center', fontsize=12, color='red')
-        buffer = BytesIO()
-        plt.savefig(buffer, format='png', dpi=100, bbox_inches='tight')
-        buffer.seek(0)
-        return f'data:image/png;base64,{base64.b64encode(buffer.getvalue()).decode("utf-8")}'
+    def no_data_graph_spec(self, signal_name: str, internal_id: str = None) -> Dict:
+        """Graphique pour signal non disponible."""
+        return {
+            'figsize': (10, 4),
+            'texts': [{'x': 0.5, 'y': 0.5, 'text': f'{signal_name}\n({internal_id})\nNon disponible',
+                       'style': {'ha': 'center', 'va': 'center', 'fontsize': 12, 'color': 'red'}}],
+            'xlim': (0, 1),
+            'ylim': (0, 1),
+            'title': f'{signal_name} - DONNÉES NON DISPONIBLES',
+        }
     
     def generate_html_report(self, output_dir: str = 'eva_reports') -> str:
         """
@@ -545,16 +616,32 @@ class EVAReportGeneratorFrameworkComplet:
         
         os.makedirs(output_dir, exist_ok=True)
         
+        # Rapport écrit section par section, directement dans le fichier
+        with ReportWriter(report_path) as report:
+            self.write_html_report(report)
+        
+        # Mémoriser les résolutions pour les prochaines acquisitions
+        self.get_resolver().save_cache()
+        
+        print(f"✅ Rapport généré: {report.path}")
+        return report.path
+    
+    def write_html_report(self, report: ReportWriter):
+        """Écrit le rapport section par section (tables du framework, graphiques, résumé)."""
         print(f"\n📄 GÉNÉRATION RAPPORT FRAMEWORK COMPLET")
         print("=" * 60)
+        self.progress.stage('tables', 'Tables du rapport')
         
         # Calcul statistiques
         total_signals = len(self.signal_registry)
         signals_mapped = sum(self.b_pres.values())
         total_uc = len(self.uc_definitions)
         uc_detectable = sum(self.b_uc_det.values())
+        uc_active = sum(1 for active in self.b_uc_det_series.values() if active.any())
+        aligned_signals = len(self.aligned['names']) if self.aligned else 0
+        aligned_instants = len(self.aligned['time']) if self.aligned else 0
         
-        html_content = f"""
+        report.write(f"""
 <!DOCTYPE html>
 <html lang="fr">
 <head>
@@ -743,6 +830,12 @@ class EVAReportGeneratorFrameworkComplet:
             <td>{uc_detectable}/{total_uc}</td>
             <td>{uc_detectable/total_uc*100:.1f}%</td>
         </tr>
+        <tr>
+            <td><strong>B_UC_DET[uc](t)</strong></td>
+            <td>UC actifs dans le temps (ET logique instant par instant, {aligned_signals} signaux sur {aligned_instants} instants, mode {self.align_mode})</td>
+            <td>{uc_active}/{total_uc}</td>
+            <td>{uc_active/total_uc*100:.1f}%</td>
+        </tr>
     </table>
     
     <!-- Section 3: Détail des signaux B_Pres -->
@@ -755,34 +848,37 @@ class EVAReportGeneratorFrameworkComplet:
                     <th>Internal ID</th>
                     <th>Nom Canonique</th>
                     <th>Canal MDF Mappé</th>
+                    <th>Méthode</th>
                     <th>B_Pres</th>
                     <th>Statut</th>
                 </tr>
             </thead>
             <tbody>
-"""
+""")
         
         # Afficher TOUS les signaux du registre
         for internal_id in sorted(self.signal_registry.keys(), key=lambda x: int(x[1:]) if x[1:].isdigit() else 999):
             signal_info = self.signal_registry[internal_id]
             canonical_name = signal_info.get('canonical_name', internal_id)
             mdf_channel = self.signal_mappings.get(internal_id, 'Non mappé')
+            tier_label = TIER_LABELS.get(self.mapping_tiers.get(internal_id))
             is_present = self.b_pres.get(internal_id, False)
             
             status_class = 'status-ok' if is_present else 'status-nok'
             status_text = 'Présent' if is_present else 'Absent'
             
-            html_content += f"""
+            report.write(f"""
                 <tr>
                     <td><strong>{internal_id}</strong></td>
                     <td>{canonical_name}</td>
                     <td>{mdf_channel}</td>
+                    <td>{tier_label}</td>
                     <td class="{status_class}">{'TRUE' if is_present else 'FALSE'}</td>
                     <td class="{status_class}">{status_text}</td>
                 </tr>
-"""
+""")
         
-        html_content += """
+        report.write("""
             </tbody>
         </table>
     </details>
@@ -802,7 +898,7 @@ class EVAReportGeneratorFrameworkComplet:
             </tr>
         </thead>
         <tbody>
-"""
+""")
         
         # Ajouter les occurrences UC
         for occ in self.uc_occurrences:
@@ -812,7 +908,7 @@ class EVAReportGeneratorFrameworkComplet:
                 'INDISPONIBLE': 'status-indisponible'
             }.get(occ['statut'], '')
             
-            html_content += f"""
+            report.write(f"""
             <tr>
                 <td>{occ['uc']}</td>
                 <td>{occ['occurrence']}</td>
@@ -822,9 +918,9 @@ class EVAReportGeneratorFrameworkComplet:
                 <td class="{status_class}">{occ['statut']}</td>
                 <td>{occ['notes']}</td>
             </tr>
-"""
+""")
         
-        html_content += """
+        report.write("""
         </tbody>
     </table>
     
@@ -840,7 +936,7 @@ class EVAReportGeneratorFrameworkComplet:
             </tr>
         </thead>
         <tbody>
-"""
+""")
         
         # Afficher TOUTES les équivalences SWEET
         for sweet_signal, equiv in self.sweet_equivalences.items():
@@ -850,19 +946,19 @@ class EVAReportGeneratorFrameworkComplet:
                 'FALLBACK': 'status-fallback'
             }.get(equiv['status'], '')
             
-            html_content += f"""
+            report.write(f"""
             <tr>
                 <td>{sweet_signal}</td>
                 <td>{equiv['mdf_equivalent'] or 'N/A'}</td>
                 <td>{equiv['can_fallback'] or 'N/A'}</td>
                 <td class="{status_class}">{equiv['status']}</td>
             </tr>
-"""
+""")
         
-        html_content += """
+        report.write("""
         </tbody>
     </table>
-"""
+""")
         
         # Section 5: Vérification exigences pour un UC
         if self.uc_occurrences:
@@ -871,7 +967,7 @@ class EVAReportGeneratorFrameworkComplet:
                 uc = uc_example[0]
                 validation_results = self.validate_requirements(uc['uc'])
                 
-                html_content += f"""
+                report.write(f"""
     <h2>6. Vérification Exigences DOORS - {uc['uc']}</h2>
     <table>
         <thead>
@@ -881,7 +977,7 @@ class EVAReportGeneratorFrameworkComplet:
             </tr>
         </thead>
         <tbody>
-"""
+""")
                 
                 for req_id, status in list(validation_results.items())[:20]:  # Limiter pour lisibilité
                     status_class = {
@@ -890,20 +986,20 @@ class EVAReportGeneratorFrameworkComplet:
                         'PARTIEL': 'status-partiel'
                     }.get(status, '')
                     
-                    html_content += f"""
+                    report.write(f"""
             <tr>
                 <td>{req_id}</td>
                 <td class="{status_class}">{status}</td>
             </tr>
-"""
+""")
                 
-                html_content += """
+                report.write("""
         </tbody>
     </table>
-"""
+""")
         
         # Section pour afficher TOUTES les 43 exigences DOORS
-        html_content += """
+        report.write("""
     <h2>7. Catalogue Complet - 43 Exigences DOORS</h2>
     <details>
         <summary style="cursor: pointer; font-weight: bold; color: #000080;">Cliquez pour voir les 43 exigences du catalogue</summary>
@@ -917,7 +1013,7 @@ class EVAReportGeneratorFrameworkComplet:
                 </tr>
             </thead>
             <tbody>
-"""
+""")
         
         # Afficher TOUTES les 43 exigences
         for req_id, req_info in self.doors_catalog.items():
@@ -928,41 +1024,52 @@ class EVAReportGeneratorFrameworkComplet:
                 'MOYENNE': 'status-ok'
             }.get(priorite, '')
             
-            html_content += f"""
+            report.write(f"""
                 <tr>
                     <td><strong>{req_id}</strong></td>
                     <td>{req_info.get('description', '')}</td>
                     <td class="{priorite_class}">{priorite}</td>
                     <td>{', '.join(req_info.get('uc_concernes', []))}</td>
                 </tr>
-"""
+""")
         
-        html_content += """
+        report.write("""
             </tbody>
         </table>
     </details>
     
     <!-- Graphiques pour les signaux -->
     <h2>8. Graphiques Signaux (Superposition Référence/Mesuré)</h2>
-"""
-        
-        # Générer 10 graphiques pour les signaux mappés
-        graph_count = 0
-        for internal_id, is_present in self.b_pres.items():
-            if is_present and graph_count < 10:
-                signal_info = self.signal_registry.get(internal_id, {})
-                signal_name = signal_info.get('canonical_name', internal_id)
-                graph_b64 = self.generate_signal_graph(signal_name, internal_id)
-                
-                html_content += f"""
+""")
+        
+        # Générer 10 graphiques pour les signaux mappés (canaux lus en un seul lot)
+        graph_ids = self.graph_signal_ids(10)
+        self.progress.stage('signaux', 'Lecture et réduction des signaux', len(graph_ids))
+        self.prefetch_signals(graph_ids)
+        signal_names = [self.signal_registry.get(internal_id, {}).get('canonical_name', internal_id)
+                        for internal_id in graph_ids]
+        # Descriptions (données réduites) puis rendu parallèle, dans l'ordre des signaux
+        graph_specs = []
+        for signal_name, internal_id in zip(signal_names, graph_ids):
+            graph_specs.append(self.signal_graph_spec(signal_name, internal_id))
+            self.progress.advance(signal_name)
+        graph_assets = GraphAssets(report.path, self.graph_mode)
+        graphs = graph_assets.iter_render(graph_specs, self.jobs)
+        # Chaque graphique est écrit dès qu'il est rendu
+        self.progress.stage('rendu', 'Rendu des graphiques', len(graph_specs))
+        for signal_name, graph_b64 in zip(signal_names, graphs):
+            
+            report.write(f"""
     <div class="graph-container">
-        <img src="{graph_b64}" alt="{signal_name}">
+        {graph_assets.element(graph_b64, signal_name)}
     </div>
-"""
-                graph_count += 1
+""")
+            self.progress.advance(signal_name)
+        graph_assets.close()
+        print(f"🖼️ {graph_assets.summary()}")
         
         # Résumé final
-        html_content += f"""
+        report.write(f"""
     <div class="summary-box">
         <h3>📊 RÉSUMÉ - FRAMEWORK UC COMPLET</h3>
         <ul>
@@ -982,17 +1089,39 @@ class EVAReportGeneratorFrameworkComplet:
     <div style="margin-top: 50px; text-align: center; font-size: 9pt; color: #666;">
         <p>© {datetime.now().year} AMPERE SOFTWARE TECHNOLOGY</p>
         <p>Rapport généré selon framework documenté dans tina/README_UC_FRAMEWORK.md</p>
+        <p>{self.resolution_cache.summary()}</p>
     </div>
     
+{graph_assets.scripts()}
 </body>
 </html>
-"""
-        
-        # Sauvegarder le rapport
-        with open(report_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        
-        print(f"✅ Rapport généré: {report_path}")
+""")
+
+    def run_analysis(self, mdf_path: str, sweet_version: str = '400', output_dir: str = 'eva_reports') -> str:
+        """Lance l'analyse complète (méthodologie du framework) ; renvoie le chemin du rapport."""
+        # Charger les données
+        if not self.load_mdf(mdf_path):
+            raise ValueError("Impossible de charger le fichier MDF")
+        
+        # Charger SWEET si disponible
+        sweet_file = 'tina/EVA_flux_equivalence_sweet400_500 (1).xlsx'
+        if os.path.exists(sweet_file):
+            self.load_sweet(sweet_file, sweet_version)
+        
+        # Appliquer la méthodologie du framework
+        self.compute_booleans()
+        self.compute_uc_time_series()
+        self.detect_uc_occurrences()
+        self.update_sweet_equivalences_status()
+        
+        # Générer le rapport
+        report_path = self.generate_html_report(output_dir)
+        
+        # Durées des étapes (journal eva_cache/stage_timings.jsonl)
+        self.progress.finish()
+        print(f"⏱️ {self.progress.summary()}")
+        self.progress.save(generator='framework', mdf=os.path.basename(mdf_path),
+                           report=os.path.basename(report_path))
         return report_path
 
 def main():
@@ -1011,6 +1140,16 @@ Exemples:
     parser.add_argument('--mdf', required=True, help='Fichier MDF à analyser')
     parser.add_argument('--sweet', default='400', choices=['400', '500'], help='Version SWEET')
     parser.add_argument('--output', default='eva_reports', help='Répertoire de sortie')
+    parser.add_argument('--align', default='edges', choices=['edges', 'raster'],
+                        help='Base de temps commune : union des fronts ou grille régulière')
+    parser.add_argument('--raster', type=float, default=DEFAULT_RASTER, help='Pas de la grille régulière (s)')
+    parser.add_argument('--merge-gap', type=float, default=0.0, help='Fusion des occurrences séparées de moins de N s')
+    parser.add_argument('--min-duration', type=float, default=0.0, help='Durée minimale d\'une occurrence (s)')
+    parser.add_argument('--jobs', type=int, default=DEFAULT_JOBS, help='Processus de rendu des graphiques (0 = un par cœur)')
+    parser.add_argument('--downsample', choices=DOWNSAMPLING_METHODS, default=DEFAULT_DOWNSAMPLING,
+                        help='Réduction des courbes pour l\'affichage')
+    parser.add_argument('--graphs', choices=GRAPH_MODES, default=DEFAULT_GRAPH_MODE,
+                        help='Graphiques intégrés au HTML (inline), externes (files, zip) ou tracés dans le navigateur (interactive)')
     
     args = parser.parse_args()
     
@@ -1027,25 +1166,17 @@ Exemples:
     print("=" * 80)
     
     # Initialiser le générateur
-    generator = EVAReportGeneratorFrameworkComplet()
+    generator = EVAReportGeneratorFrameworkComplet(align_mode=args.align, raster=args.raster,
+                                                   merge_gap=args.merge_gap, min_duration=args.min_duration,
+                                                   jobs=args.jobs,
+                                                   downsample=args.downsample,
+                                                   graph_mode=args.graphs)
     
-    # Charger les données
-    if not generator.load_mdf(args.mdf):
+    try:
+        report_path = generator.run_analysis(args.mdf, args.sweet, args.output)
+    except ValueError:
         sys.exit(1)
     
-    # Charger SWEET si disponible
-    sweet_file = 'tina/EVA_flux_equivalence_sweet400_500 (1).xlsx'
-    if os.path.exists(sweet_file):
-        generator.load_sweet(sweet_file, args.sweet)
-    
-    # Appliquer la méthodologie du framework
-    generator.compute_booleans()
-    generator.detect_uc_occurrences()
-    generator.update_sweet_equivalences_status()
-    
-    # Générer le rapport
-    report_path = generator.generate_html_report(args.output)
-    
     print("\n" + "=" * 80)
     print("✅ SUCCÈS - FRAMEWORK COMPLET APPLIQUÉ")
     print("=" * 80)
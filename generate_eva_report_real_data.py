@@ -17,11 +17,8 @@ import numpy as np
 from datetime import datetime, timedelta
 import json
 import re
-import base64
-from io import BytesIO
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
-import matplotlib.pyplot as plt
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -31,6 +28,19 @@ except ImportError:
     print("❌ Module requis : pip3 install asammdf python-docx matplotlib pandas")
     sys.exit(1)
 
+from signal_resolver import SignalResolver
+from resolution_cache import ResolutionCache
+from signal_edges import detect_edges
+from signal_extraction import extract_signals, read_signal
+from signal_sidecar import SignalSidecar
+from signal_downsampling import DEFAULT_DOWNSAMPLING, DOWNSAMPLING_METHODS
+from graph_assets import DEFAULT_GRAPH_MODE, GRAPH_MODES, GraphAssets
+from report_writer import ReportWriter
+from progress import ProgressTracker
+from graph_rendering import DEFAULT_JOBS, error_spec, reduce_points, render_graph
+from signal_cache import DEFAULT_MAX_MB, SignalCache
+from signal_streaming import DEFAULT_CHUNK_MB, MemoryGuard, configure_streaming, stream_signal
+
 # ============================================================================
 # EXTRACTEURS DE DONNÉES RÉELLES
 # ============================================================================
@@ -38,8 +48,61 @@ except ImportError:
 class RealDataExtractor:
     """Extracteur de données réelles depuis MDF."""
     
+    # Signaux VIN connus
+    VIN_SIGNALS = [
+        'VIN', 'VehicleIdentificationNumber', 'Vehicle_ID',
+        'VIN_Code', 'VIN_Number', 'VehID_VIN', 'BCM_VIN'
+    ]
+    
+    # Signaux clés pour la détection d'UC
+    UC_SIGNALS = {
+        'UC 1.1 - Endo-Réveil': [
+            'HEVC_WakeUpSleepCommand', 'WakeUp', 'SystemWakeUp',
+            'BCM_WakeUpReason', 'PowerMode', 'IgnitionState'
+        ],
+        'UC 1.2 - Traction': [
+            'VehicleSpeed', 'MotorSpeed', 'MotorTorque',
+            'AcceleratorPedalPosition', 'DriveMode', 'GearPosition'
+        ],
+        'UC 1.3 - Charge AC': [
+            'ChargingPlugConnected', 'ChargerState', 'ChargingPower',
+            'ACChargeState', 'ChargePortStatus', 'ChargingCurrent'
+        ],
+        'UC 1.4 - Charge DC': [
+            'DCChargeState', 'DCChargingPower', 'FastChargeActive',
+            'CCSCommunication', 'DCChargeVoltage', 'DCChargeCurrent'
+        ]
+    }
+    
+    @staticmethod
+    def read_signal(mdf_data: MDF, channel: str, signals: Optional[Dict] = None):
+        """Signal d'un canal : extraction groupée si disponible, sinon lecture directe."""
+        signal = signals.get(channel) if signals else None
+        return signal if signal is not None else read_signal(mdf_data, channel)
+    
+    @staticmethod
+    def vin_candidate_channels(channels: List[str]) -> List[str]:
+        """Canaux pouvant contenir le VIN, dans l'ordre de recherche."""
+        candidates = []
+        for signal_name in RealDataExtractor.VIN_SIGNALS:
+            candidates += [channel for channel in channels if signal_name.lower() in channel.lower()]
+        return list(dict.fromkeys(candidates))
+    
     @staticmethod
-    def extract_vin_from_mdf(mdf_data: MDF) -> str:
+    def uc_signal_channels(channels: List[str]) -> Dict[str, List[str]]:
+        """Canaux trouvés pour chaque UC (premier canal par signal clé)."""
+        found = {}
+        for uc_name, signals in RealDataExtractor.UC_SIGNALS.items():
+            found[uc_name] = []
+            for signal in signals:
+                for channel in channels:
+                    if signal.lower() in channel.lower():
+                        found[uc_name].append(channel)
+                        break
+        return found
+    
+    @staticmethod
+    def extract_vin_from_mdf(mdf_data: MDF, signals: Optional[Dict] = None) -> str:
         """Extrait le VIN depuis le MDF."""
         # 1. Chercher dans les métadonnées/header
         try:
@@ -54,26 +117,18 @@ class RealDataExtractor:
             pass
         
         # 2. Chercher dans les signaux VIN connus
-        vin_signals = [
-            'VIN', 'VehicleIdentificationNumber', 'Vehicle_ID',
-            'VIN_Code', 'VIN_Number', 'VehID_VIN', 'BCM_VIN'
-        ]
-        
-        for signal_name in vin_signals:
+        for channel in RealDataExtractor.vin_candidate_channels(list(mdf_data.channels_db.keys())):
             try:
-                # Chercher le signal dans les canaux
-                for channel in mdf_data.channels_db.keys():
-                    if signal_name.lower() in channel.lower():
-                        signal = mdf_data.get(channel)
-                        if signal and hasattr(signal, 'samples'):
-                            # Si c'est un signal texte/bytes
-                            if len(signal.samples) > 0:
-                                vin_value = signal.samples[0]
-                                if isinstance(vin_value, (bytes, str)):
-                                    vin_str = vin_value.decode() if isinstance(vin_value, bytes) else vin_value
-                                    # Vérifier format VIN
-                                    if re.match(r'^[A-HJ-NPR-Z0-9]{17}$', vin_str):
-                                        return vin_str
+                signal = RealDataExtractor.read_signal(mdf_data, channel, signals)
+                if signal and hasattr(signal, 'samples'):
+                    # Si c'est un signal texte/bytes
+                    if len(signal.samples) > 0:
+                        vin_value = signal.samples[0]
+                        if isinstance(vin_value, (bytes, str)):
+                            vin_str = vin_value.decode() if isinstance(vin_value, bytes) else vin_value
+                            # Vérifier format VIN
+                            if re.match(r'^[A-HJ-NPR-Z0-9]{17}$', vin_str):
+                                return vin_str
             except:
                 continue
         
@@ -139,68 +194,52 @@ class RealDataExtractor:
         return datetime.now().strftime('%d/%m/%Y')
     
     @staticmethod
-    def detect_real_use_cases(mdf_data: MDF, mdf_path: str) -> List[Dict]:
-        """Détecte les UC réels depuis les signaux."""
+    def signal_transitions(mdf_data: MDF, channel: str, signals: Optional[Dict] = None,
+                           guard: Optional[MemoryGuard] = None) -> np.ndarray:
+        """Instants des changements d'état d'un canal (premier et dernier en streaming)."""
+        if guard is not None:
+            # Streaming : seuls le premier et le dernier changement sont gardés
+            reduced = stream_signal(mdf_data, channel, guard)
+            if not reduced or not reduced['changes']:
+                return np.array([])
+            if reduced['changes'] == 1:
+                return np.array([reduced['first_change']])
+            return np.array([reduced['first_change'], reduced['last_change']])
+        
+        signal_data = RealDataExtractor.read_signal(mdf_data, channel, signals)
+        if signal_data and hasattr(signal_data, 'timestamps'):
+            # Détecter les changements d'état (vectorisé, voir signal_edges.py)
+            return detect_edges(signal_data.samples, signal_data.timestamps)['change_times']
+        return np.array([])
+    
+    @staticmethod
+    def detect_real_use_cases(mdf_data: MDF, mdf_path: str, signals: Optional[Dict] = None,
+                              guard: Optional[MemoryGuard] = None) -> List[Dict]:
+        """Détecte les UC réels depuis les signaux (guard : mode streaming)."""
         uc_occurrences = []
         
-        # Signaux clés pour la détection d'UC
-        uc_signals = {
-            'UC 1.1 - Endo-Réveil': [
-                'HEVC_WakeUpSleepCommand', 'WakeUp', 'SystemWakeUp',
-                'BCM_WakeUpReason', 'PowerMode', 'IgnitionState'
-            ],
-            'UC 1.2 - Traction': [
-                'VehicleSpeed', 'MotorSpeed', 'MotorTorque',
-                'AcceleratorPedalPosition', 'DriveMode', 'GearPosition'
-            ],
-            'UC 1.3 - Charge AC': [
-                'ChargingPlugConnected', 'ChargerState', 'ChargingPower',
-                'ACChargeState', 'ChargePortStatus', 'ChargingCurrent'
-            ],
-            'UC 1.4 - Charge DC': [
-                'DCChargeState', 'DCChargingPower', 'FastChargeActive',
-                'CCSCommunication', 'DCChargeVoltage', 'DCChargeCurrent'
-            ]
-        }
-        
         # Analyser chaque UC
-        for uc_name, signals in uc_signals.items():
+        uc_channels = RealDataExtractor.uc_signal_channels(list(mdf_data.channels_db.keys()))
+        for uc_name, found_signals in uc_channels.items():
             # Chercher si au moins un signal du UC existe
-            found_signals = []
-            for signal in signals:
-                for channel in mdf_data.channels_db.keys():
-                    if signal.lower() in channel.lower():
-                        found_signals.append(channel)
-                        break
-            
             if found_signals:
                 # Analyser le premier signal trouvé pour déterminer les timestamps
                 try:
-                    signal_data = mdf_data.get(found_signals[0])
-                    if signal_data and hasattr(signal_data, 'timestamps'):
-                        timestamps = signal_data.timestamps
-                        samples = signal_data.samples
+                    transitions = RealDataExtractor.signal_transitions(mdf_data, found_signals[0], signals, guard)
+                    if len(transitions):
+                        # Créer des occurrences basées sur les transitions
+                        t_start = float(transitions[0])
+                        t_end = float(transitions[-1]) if len(transitions) > 1 else t_start + 60
                         
-                        # Détecter les changements d'état (fronts montants)
-                        if len(samples) > 1:
-                            # Chercher les transitions
-                            transitions = []
-                            for i in range(1, len(samples)):
-                                if samples[i] != samples[i-1]:
-                                    transitions.append(timestamps[i])
-                            
-                            if transitions:
-                                # Créer des occurrences basées sur les transitions
-                                t_start = transitions[0]
-                                t_end = transitions[-1] if len(transitions) > 1 else t_start + 60
-                                
-                                uc_occurrences.append({
-                                    'uc': uc_name.split(' - ')[0],  # UC 1.1, UC 1.2, etc
-                                    'type': uc_name.split(' - ')[1],
-                                    'tstart': format_time(t_start),
-                                    'tend': format_time(t_end),
-                                    'duration': round(t_end - t_start, 3)
-                                })
+                        uc_occurrences.append({
+                            'uc': uc_name.split(' - ')[0],  # UC 1.1, UC 1.2, etc
+                            'type': uc_name.split(' - ')[1],
+                            'tstart': format_time(t_start),
+                            'tend': format_time(t_end),
+                            'duration': round(t_end - t_start, 3)
+                        })
+                except MemoryError:
+                    raise
                 except:
                     pass
         
@@ -248,11 +287,31 @@ def format_time(seconds: float) -> str:
 class EVAReportGeneratorReal:
     """Générateur EVA avec données réelles."""
     
-    def __init__(self):
+    def __init__(self, streaming: bool = False, memory_limit_mb: Optional[float] = None,
+                 chunk_mb: float = DEFAULT_CHUNK_MB, cache_mb: float = DEFAULT_MAX_MB,
+                 sidecar: bool = False, jobs: int = DEFAULT_JOBS, downsample: str = DEFAULT_DOWNSAMPLING,
+                 graph_mode: str = DEFAULT_GRAPH_MODE, progress: Optional[ProgressTracker] = None):
         self.mdf_data = None
         self.mdf_path = None
         self.mdf_channels = []
-        self.signal_data_cache = {}
+        self.resolver = None
+        self.resolution_cache = ResolutionCache()
+        self.signal_data_cache = SignalCache(cache_mb)  # canal MDF résolu → données (LRU)
+        self.prefetched_signals = {}  # canal MDF → Signal (extraction groupée)
+        self.key_signals = []
+        self.jobs = jobs  # Processus de rendu des graphiques (0 : un par cœur)
+        self.downsample = downsample  # Réduction des courbes : enveloppe min/max ou LTTB
+        self.graph_mode = graph_mode  # Graphiques intégrés (inline), externes (files / zip) ou tracés dans le navigateur (interactive)
+        self.progress = progress or ProgressTracker()  # Étapes de l'analyse (événements, durées)
+        
+        # Mode streaming : lecture bloc par bloc, seules les données réduites sont gardées
+        self.streaming = streaming
+        self.chunk_mb = chunk_mb
+        self.memory_guard = MemoryGuard(memory_limit_mb)
+        
+        # Cache sidecar colonne des canaux lus (relances sur le même MDF)
+        self.use_sidecar = sidecar
+        self.sidecar = None
         
         # Données extraites
         self.vin = None
@@ -284,19 +343,31 @@ class EVAReportGeneratorReal:
         
     def load_mdf(self, mdf_path: str) -> bool:
         """Charge le fichier MDF et extrait les données réelles."""
+        self.progress.stage('chargement', 'Chargement du MDF')
         try:
             print(f"📁 Chargement MDF: {mdf_path}")
             self.mdf_path = mdf_path
             self.mdf_data = MDF(mdf_path)
             self.mdf_channels = list(self.mdf_data.channels_db.keys())
+            self.resolver = None
+            self.get_resolver()
             
             print(f"✅ MDF chargé: {len(self.mdf_channels)} canaux")
             
+            # Extraire en une passe tous les canaux nécessaires (sauf en streaming)
+            if self.streaming:
+                configure_streaming(self.mdf_data, self.chunk_mb)
+                print(f"🌊 Mode streaming : blocs de {self.chunk_mb:g} Mo")
+                self.key_signals = self.select_key_signals()
+            else:
+                self.prefetch_signals()
+            
             # Extraire les données réelles
+            self.progress.stage('donnees', 'VIN, mulet, date et UC')
             print("🔍 Extraction des données réelles...")
             
             # VIN
-            self.vin = RealDataExtractor.extract_vin_from_mdf(self.mdf_data)
+            self.vin = RealDataExtractor.extract_vin_from_mdf(self.mdf_data, self.prefetched_signals)
             print(f"  VIN: {self.vin}")
             
             # Numéro Mulet
@@ -308,74 +379,124 @@ class EVAReportGeneratorReal:
             print(f"  Date: {self.test_date}")
             
             # UC détectés
-            self.uc_occurrences = RealDataExtractor.detect_real_use_cases(self.mdf_data, mdf_path)
+            guard = self.memory_guard if self.streaming else None
+            self.uc_occurrences = RealDataExtractor.detect_real_use_cases(self.mdf_data, mdf_path, self.prefetched_signals, guard)
             print(f"  UC détectés: {len(self.uc_occurrences)}")
             
             return True
             
+        except MemoryError:
+            raise
         except Exception as e:
             print(f"❌ Erreur: {e}")
             return False
     
+    def get_resolver(self) -> SignalResolver:
+        """Renvoie le résolveur de noms (construit une seule fois)."""
+        if self.resolver is None:
+            self.resolver = SignalResolver(self.mdf_channels, strategy='real_data',
+                                           cache=self.resolution_cache)
+        return self.resolver
+    
     def find_signal_in_mdf(self, signal_name: str) -> Optional[str]:
-        """Cherche un signal dans les canaux MDF."""
-        if not signal_name:
-            return None
-        
-        # Recherche exacte
-        if signal_name in self.mdf_channels:
-            return signal_name
-        
-        # Recherche normalisée
-        signal_norm = re.sub(r'[_\s\-\.]+', '', signal_name.lower())
-        for channel in self.mdf_channels:
-            channel_norm = re.sub(r'[_\s\-\.]+', '', channel.lower())
-            if signal_norm == channel_norm:
-                return channel
-        
-        # Recherche partielle
-        for channel in self.mdf_channels:
-            if signal_name.lower() in channel.lower() or channel.lower() in signal_name.lower():
-                return channel
-        
-        return None
+        """Cherche un signal dans les canaux MDF.
+        
+        Exacte → Normalisée → Partielle (voir signal_resolver.py).
+        """
+        return self.get_resolver().resolve(signal_name)
+    
+    def select_key_signals(self) -> List[Tuple[str, str]]:
+        """Choisit les signaux principaux du rapport (adaptés au MDF réel)."""
+        # On cherche d'abord des signaux qui existent vraiment
+        existing_signals = []
+        
+        # Liste prioritaire de signaux à chercher
+        priority_signals = [
+            ('VehicleSpeed', 'IFast_VehicleSpeedRef'),
+            ('BatteryCurrent', 'IBatteryCurrentSensorValue'),
+            ('BatteryVoltage', 'SomeIpBatteryVoltageEvent::EEMBatteryVoltageValue'),
+            ('WheelSpeedFL', 'IFast_WheelSpeedFL'),
+            ('WheelSpeedFR', 'IFast_WheelSpeedFR'),
+            ('ProducerVoltage', 'IProducerVoltageRequest'),
+            ('PowerRelayState', 'PowerRelayState_BLMS'),
+            ('HVBatterySOC', 'HVBatterySOC_BLMS'),
+        ]
+        
+        # Vérifier quels signaux existent vraiment (résolution en un seul lot)
+        matches = self.get_resolver().resolve_batch(name for pair in priority_signals for name in pair)
+        print(f"  🔎 Résolution des signaux : {SignalResolver.format_tier_counts(matches)}")
+        for eva_name, mdf_name in priority_signals:
+            if self.find_signal_in_mdf(mdf_name) or self.find_signal_in_mdf(eva_name):
+                existing_signals.append((eva_name, mdf_name))
+        
+        # Si on n'a pas assez de signaux, prendre les premiers du MDF
+        if len(existing_signals) < 5:
+            for i, channel in enumerate(self.mdf_channels[:10]):
+                if channel != 't' and not any(channel in sig for sig in existing_signals):
+                    existing_signals.append((channel, channel))
+                    if len(existing_signals) >= 8:
+                        break
+        
+        return existing_signals if existing_signals else [
+            ('Signal_1', 'IANA_6221B_ai0'),
+            ('Signal_2', 'IANA_6221B_ai1'),
+            ('Signal_3', 'IANA_6221B_ai2'),
+            ('Signal_4', 'IANA_6221B_ai3'),
+            ('Signal_5', 'IANA_6221B_ai4'),
+        ]
+    
+    def prefetch_signals(self):
+        """Extrait en une seule passe groupée tous les canaux nécessaires."""
+        # Signaux du rapport, VIN et UC
+        self.key_signals = self.select_key_signals()
+        channels = [self.find_signal_in_mdf(name) for pair in self.key_signals for name in pair]
+        channels += RealDataExtractor.vin_candidate_channels(self.mdf_channels)
+        for found_signals in RealDataExtractor.uc_signal_channels(self.mdf_channels).values():
+            channels += found_signals[:1]
+        
+        channels = [channel for channel in dict.fromkeys(channels) if channel]
+        self.progress.stage('extraction', 'Extraction groupée des canaux', len(channels))
+        print(f"📦 Extraction groupée de {len(channels)} canaux...")
+        if self.use_sidecar:
+            self.sidecar = SignalSidecar(self.mdf_path)
+            self.prefetched_signals = self.sidecar.extract(self.mdf_data, channels)
+            print(f"💾 {self.sidecar.summary()}")
+        else:
+            self.prefetched_signals = extract_signals(self.mdf_data, channels)
     
     def get_signal_data(self, signal_name: str):
         """Récupère les données d'un signal avec cache."""
-        if signal_name in self.signal_data_cache:
-            return self.signal_data_cache[signal_name]
-        
         mdf_channel = self.find_signal_in_mdf(signal_name)
-        if mdf_channel and self.mdf_data:
+        cached = self.signal_data_cache.get(mdf_channel) if mdf_channel else None
+        if cached is not None:
+            return cached
+        
+        if mdf_channel and self.mdf_data and self.streaming:
+            # Lecture bloc par bloc : statistiques et enveloppe min/max uniquement
+            result = stream_signal(self.mdf_data, mdf_channel, self.memory_guard)
+            if result and result['found'] and result['numeric']:
+                self.signal_data_cache.put(mdf_channel, result)
+                return result
+        elif mdf_channel and self.mdf_data:
             try:
-                signal = None
-                
-                # Essayer d'abord sans spécifier group/index
-                try:
-                    signal = self.mdf_data.get(mdf_channel)
-                except:
-                    # Si erreur de canaux multiples, prendre le premier groupe
-                    try:
-                        # Récupérer les occurrences depuis channels_db
-                        occurrences = self.mdf_data.channels_db.get(mdf_channel, [])
-                        if occurrences:
-                            first_occ = occurrences[0]
-                            signal = self.mdf_data.get(mdf_channel, group=first_occ[0], index=first_occ[1])
-                    except:
-                        # Dernier recours : groupe 0, index 0
-                        try:
-                            signal = self.mdf_data.get(mdf_channel, group=0, index=0)
-                        except:
-                            pass
+                # Extraction groupée, sinon lecture directe (canaux multiples gérés)
+                # (le signal quitte l'extraction groupée : le cache borné prend le relais)
+                signal = self.prefetched_signals.pop(mdf_channel, None)
+                if signal is None:
+                    signal = read_signal(self.mdf_data, mdf_channel)
                 
                 if signal and hasattr(signal, 'samples') and len(signal.samples) > 0:
-                    self.signal_data_cache[signal_name] = {
+                    result = {
                         'timestamps': signal.timestamps if hasattr(signal, 'timestamps') else np.arange(len(signal.samples)),
                         'samples': signal.samples,
                         'found': True,
                         'channel': mdf_channel
                     }
-                    return self.signal_data_cache[signal_name]
+                    self.signal_data_cache.put(mdf_channel, result)
+                    self.memory_guard.check(signal_name)
+                    return result
+            except MemoryError:
+                raise
             except Exception as e:
                 # Silencieux pour ne pas polluer la sortie
                 pass
@@ -385,9 +506,17 @@ class EVAReportGeneratorReal:
     
     def generate_signal_graph(self, signal_eva: str, signal_sweet: str) -> str:
         """Génère un graphique pour un signal."""
+        return render_graph(self.signal_graph_spec(signal_eva, signal_sweet))
+    
+    def signal_graph_spec(self, signal_eva: str, signal_sweet: str) -> Dict:
+        """Description du graphique d'un signal (rendu par graph_rendering.py)."""
+        spec = {
+            'figsize': (8, 3),
+            'xlabel': 'Temps (s)', 'ylabel': 'Valeur', 'label_style': {'fontsize': 9},
+            'grid': {'alpha': 0.3},
+            'tight_layout': True,
+        }
         try:
-            plt.figure(figsize=(8, 3))
-            
             # Essayer d'abord le signal EVA puis SWEET
             data = self.get_signal_data(signal_eva)
             signal_used = signal_eva
@@ -396,69 +525,55 @@ class EVAReportGeneratorReal:
                 signal_used = signal_sweet
             
             if data.get('found'):
-                # Données réelles trouvées
-                timestamps = data['timestamps']
-                samples = data['samples']
+                # Données réelles trouvées (max 5000 points pour la performance)
+                timestamps, samples = reduce_points(data['timestamps'], data['samples'], spec['figsize'], self.downsample)
                 
-                # Limiter à max 5000 points pour la performance
-                if len(timestamps) > 5000:
-                    step = len(timestamps) // 5000
-                    timestamps = timestamps[::step]
-                    samples = samples[::step]
-                
-                plt.plot(timestamps, samples, 'b-', linewidth=0.5, alpha=0.8)
-                plt.title(f'{signal_used} - Canal MDF: {data["channel"]}', fontsize=10)
+                spec['series'] = [{'x': timestamps, 'y': samples,
+                                   'style': {'color': 'b', 'linewidth': 0.5, 'alpha': 0.8}}]
+                spec['title'] = f'{signal_used} - Canal MDF: {data["channel"]}'
+                spec['title_style'] = {'fontsize': 10}
                 
                 # Ajouter statistiques
                 if len(samples) > 0:
-                    plt.text(0.02, 0.98, f'Min: {np.min(samples):.2f}, Max: {np.max(samples):.2f}', 
-                            transform=plt.gca().transAxes, va='top', fontsize=8, 
-                            bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
+                    spec['texts'] = [{'x': 0.02, 'y': 0.98, 'axes': True,
+                                      'text': f'Min: {np.min(samples):.2f}, Max: {np.max(samples):.2f}',
+                                      'style': {'va': 'top', 'fontsize': 8,
+                                                'bbox': dict(boxstyle='round', facecolor='wheat', alpha=0.5)}}]
             else:
                 # Signal non trouvé - graphique informatif
-                plt.text(0.5, 0.5, f'Signal non trouvé\n{signal_eva}\n{signal_sweet}', 
-                        ha='center', va='center', fontsize=10, color='red')
-                plt.xlim(0, 1)
-                plt.ylim(0, 1)
-                plt.title(f'Aucune donnée disponible', fontsize=10)
-                plt.axis('off')
-            
-            plt.xlabel('Temps (s)', fontsize=9)
-            plt.ylabel('Valeur', fontsize=9)
-            plt.grid(True, alpha=0.3)
-            plt.tight_layout()
-            
-            buffer = BytesIO()
-            plt.savefig(buffer, format='png', dpi=100, bbox_inches='tight')
-            buffer.seek(0)
-            graph_b64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-            plt.close()
-            
-            return f'data:image/png;base64,{graph_b64}'
+                spec.update({
+                    'texts': [{'x': 0.5, 'y': 0.5, 'text': f'Signal non trouvé\n{signal_eva}\n{signal_sweet}',
+                               'style': {'ha': 'center', 'va': 'center', 'fontsize': 10, 'color': 'red'}}],
+                    'xlim': (0, 1), 'ylim': (0, 1),
+                    'title': 'Aucune donnée disponible', 'title_style': {'fontsize': 10},
+                    'axis_off': True,
+                })
+            return spec
             
+        except MemoryError:
+            raise
         except Exception as e:
             # Graphique d'erreur
-            plt.figure(figsize=(8, 3))
-            plt.text(0.5, 0.5, f'Erreur génération\n{str(e)[:50]}', 
-                    ha='center', va='center', fontsize=10, color='red')
-            plt.xlim(0, 1)
-            plt.ylim(0, 1)
-            plt.axis('off')
-            
-            buffer = BytesIO()
-            plt.savefig(buffer, format='png', dpi=100, bbox_inches='tight')
-            buffer.seek(0)
-            graph_b64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-            plt.close()
-            
-            return f'data:image/png;base64,{graph_b64}'
+            return error_spec({'figsize': (8, 3)}, e)
     
     def generate_html_report(self, output_path: str, sweet_version: str, myf_config: str):
         """Génère le rapport HTML avec données réelles."""
+        # Rapport écrit section par section, directement dans le fichier
+        with ReportWriter(output_path) as report:
+            self.write_html_report(report, sweet_version, myf_config)
+        
+        # Mémoriser les résolutions pour les prochaines acquisitions
+        self.get_resolver().save_cache()
+        
+        print(f"✅ Rapport généré : {report.path}")
+        return report.path
+    
+    def write_html_report(self, report: ReportWriter, sweet_version: str, myf_config: str):
+        """Écrit le rapport : en-tête, informations, UC, lignes de signaux, résumé."""
         print("📄 Génération du rapport avec données RÉELLES...")
         
         # Début HTML
-        html = f"""<!DOCTYPE html>
+        report.write(f"""<!DOCTYPE html>
 <html lang="fr">
 <head>
     <meta charset="UTF-8">
@@ -574,11 +689,11 @@ class EVAReportGeneratorReal:
                 <th>Durée (s)</th>
             </tr>
         </thead>
-        <tbody>"""
+        <tbody>""")
         
         if self.uc_occurrences:
             for i, uc in enumerate(self.uc_occurrences, 1):
-                html += f"""
+                report.write(f"""
             <tr>
                 <td>{i}</td>
                 <td>{uc['uc']}</td>
@@ -586,16 +701,16 @@ class EVAReportGeneratorReal:
                 <td>{uc['tstart']}</td>
                 <td>{uc['tend']}</td>
                 <td>{uc['duration']}</td>
-            </tr>"""
+            </tr>""")
         else:
-            html += """
+            report.write("""
             <tr>
                 <td colspan="6" style="text-align: center; color: #666;">
                     Aucun UC détecté automatiquement
                 </td>
-            </tr>"""
+            </tr>""")
         
-        html += """
+        report.write("""
         </tbody>
     </table>
     
@@ -610,60 +725,39 @@ class EVAReportGeneratorReal:
                 <th>Statut</th>
             </tr>
         </thead>
-        <tbody>"""
-        
-        # Signaux principaux à vérifier (adaptés au MDF réel)
-        # On cherche d'abord des signaux qui existent vraiment
-        existing_signals = []
-        
-        # Liste prioritaire de signaux à chercher
-        priority_signals = [
-            ('VehicleSpeed', 'IFast_VehicleSpeedRef'),
-            ('BatteryCurrent', 'IBatteryCurrentSensorValue'),
-            ('BatteryVoltage', 'SomeIpBatteryVoltageEvent::EEMBatteryVoltageValue'),
-            ('WheelSpeedFL', 'IFast_WheelSpeedFL'),
-            ('WheelSpeedFR', 'IFast_WheelSpeedFR'),
-            ('ProducerVoltage', 'IProducerVoltageRequest'),
-            ('PowerRelayState', 'PowerRelayState_BLMS'),
-            ('HVBatterySOC', 'HVBatterySOC_BLMS'),
-        ]
+        <tbody>""")
         
-        # Vérifier quels signaux existent vraiment
-        for eva_name, mdf_name in priority_signals:
-            if self.find_signal_in_mdf(mdf_name) or self.find_signal_in_mdf(eva_name):
-                existing_signals.append((eva_name, mdf_name))
-        
-        # Si on n'a pas assez de signaux, prendre les premiers du MDF
-        if len(existing_signals) < 5:
-            for i, channel in enumerate(self.mdf_channels[:10]):
-                if channel != 't' and not any(channel in sig for sig in existing_signals):
-                    existing_signals.append((channel, channel))
-                    if len(existing_signals) >= 8:
-                        break
-        
-        key_signals = existing_signals if existing_signals else [
-            ('Signal_1', 'IANA_6221B_ai0'),
-            ('Signal_2', 'IANA_6221B_ai1'),
-            ('Signal_3', 'IANA_6221B_ai2'),
-            ('Signal_4', 'IANA_6221B_ai3'),
-            ('Signal_5', 'IANA_6221B_ai4'),
-        ]
+        # Signaux principaux à vérifier (choisis lors de l'extraction groupée)
+        key_signals = self.key_signals or self.select_key_signals()
         
+        # Descriptions des graphes puis rendu parallèle, dans l'ordre des signaux
+        self.progress.stage('signaux', 'Lecture et réduction des signaux', len(key_signals))
+        graph_specs = []
         for signal_eva, signal_sweet in key_signals:
+            graph_specs.append(self.signal_graph_spec(signal_eva, signal_sweet))
+            self.progress.advance(signal_eva)
+        graph_assets = GraphAssets(report.path, self.graph_mode)
+        graphs = graph_assets.iter_render(graph_specs, self.jobs)
+        
+        # Chaque ligne est écrite dès que son graphique est rendu
+        self.progress.stage('rendu', 'Rendu des graphiques', len(graph_specs))
+        for (signal_eva, signal_sweet), graph in zip(key_signals, graphs):
             mdf_channel = self.find_signal_in_mdf(signal_eva) or self.find_signal_in_mdf(signal_sweet)
             status = 'OK' if mdf_channel else 'NOK'
             status_class = 'status-ok' if status == 'OK' else 'status-nok'
-            graph = self.generate_signal_graph(signal_eva, signal_sweet)
             
-            html += f"""
+            report.write(f"""
             <tr>
                 <td>{signal_eva}</td>
                 <td>{mdf_channel if mdf_channel else 'Non trouvé'}</td>
-                <td><img src="{graph}" style="max-width: 400px;"></td>
+                <td>{graph_assets.element(graph, signal_eva, 'max-width: 400px;')}</td>
                 <td class="{status_class}">{status}</td>
-            </tr>"""
+            </tr>""")
+            self.progress.advance(signal_eva)
+        graph_assets.close()
+        print(f"  🖼️ {graph_assets.summary()}")
         
-        html += f"""
+        report.write(f"""
         </tbody>
     </table>
     
@@ -678,19 +772,14 @@ class EVAReportGeneratorReal:
             <li>Mulet identifié: {'✓' if 'NON_IDENTIFIE' not in self.mulet_number else '✗'}</li>
             <li>UC détectés: {len(self.uc_occurrences)}</li>
             <li>Date génération: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}</li>
+            <li>{self.resolution_cache.summary()}</li>
         </ul>
     </div>
+{graph_assets.scripts()}
 </body>
-</html>"""
-        
-        # Sauvegarder le rapport
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(html)
-        
-        print(f"✅ Rapport généré : {output_path}")
-        return output_path
+</html>""")
     
-    def run_analysis(self, mdf_path: str, sweet_version: str, myf_config: str):
+    def run_analysis(self, mdf_path: str, sweet_version: str, myf_config: str, output_dir: str = 'eva_reports'):
         """Lance l'analyse complète."""
         print("="*70)
         print("GÉNÉRATION RAPPORT EVA - DONNÉES RÉELLES")
@@ -702,11 +791,19 @@ class EVAReportGeneratorReal:
         
         # Générer rapport
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_path = f"eva_reports/Rapport_EVA_REAL_{sweet_version}_{myf_config}_{timestamp}.html"
+        output_path = os.path.join(output_dir, f"Rapport_EVA_REAL_{sweet_version}_{myf_config}_{timestamp}.html")
+        
+        os.makedirs(output_dir, exist_ok=True)
         
-        os.makedirs("eva_reports", exist_ok=True)
+        report_path = self.generate_html_report(output_path, sweet_version, myf_config)
+        print(f"📈 {self.memory_guard.summary()}")
+        print(f"🗃️ {self.signal_data_cache.summary()}")
         
-        return self.generate_html_report(output_path, sweet_version, myf_config)
+        # Durées des étapes (journal eva_cache/stage_timings.jsonl)
+        self.progress.finish()
+        print(f"⏱️ {self.progress.summary()}")
+        self.progress.save(generator='real', mdf=os.path.basename(mdf_path), report=os.path.basename(report_path))
+        return report_path
 
 def main():
     """Fonction principale."""
@@ -717,6 +814,16 @@ def main():
     parser.add_argument('--mdf', required=True, help='Fichier MDF')
     parser.add_argument('--sweet', required=True, choices=['400', '500'], help='Version SWEET')
     parser.add_argument('--myfx', required=True, choices=['MyF2', 'MyF3', 'MyF4.1', 'MyF5', 'all'], help='Configuration MyF')
+    parser.add_argument('--stream', action='store_true', help='Lecture bloc par bloc (très gros MDF)')
+    parser.add_argument('--memory-limit', type=float, default=None, help='Plafond mémoire RSS en Mo')
+    parser.add_argument('--chunk-mb', type=float, default=DEFAULT_CHUNK_MB, help='Taille des blocs en streaming (Mo)')
+    parser.add_argument('--cache-mb', type=float, default=DEFAULT_MAX_MB, help='Budget du cache des signaux (Mo)')
+    parser.add_argument('--sidecar', action='store_true', help='Réutiliser/créer le cache colonne des canaux (eva_cache/sidecar)')
+    parser.add_argument('--jobs', type=int, default=DEFAULT_JOBS, help='Processus de rendu des graphiques (0 = un par cœur)')
+    parser.add_argument('--downsample', choices=DOWNSAMPLING_METHODS, default=DEFAULT_DOWNSAMPLING,
+                        help='Réduction des courbes pour l\'affichage')
+    parser.add_argument('--graphs', choices=GRAPH_MODES, default=DEFAULT_GRAPH_MODE,
+                        help='Graphiques intégrés au HTML (inline), externes (files, zip) ou tracés dans le navigateur (interactive)')
     
     args = parser.parse_args()
     
@@ -725,7 +832,14 @@ def main():
         sys.exit(1)
     
     try:
-        generator = EVAReportGeneratorReal()
+        generator = EVAReportGeneratorReal(streaming=args.stream,
+                                           memory_limit_mb=args.memory_limit,
+                                           chunk_mb=args.chunk_mb,
+                                           cache_mb=args.cache_mb,
+                                           sidecar=args.sidecar,
+                                           jobs=args.jobs,
+                                           downsample=args.downsample,
+                                           graph_mode=args.graphs)
         report_path = generator.run_analysis(args.mdf, args.sweet, args.myfx)
         
         print("\n" + "="*70)
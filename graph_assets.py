@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+GRAPHIQUES DU RAPPORT : INTÉGRÉS OU EXTERNES
+============================================
+Modes de sortie des graphiques (--graphs) :
+
+- 'inline' : images base64 dans le HTML (fichier autonome, plusieurs Mo)
+- 'files'  : un PNG par graphique dans <rapport>_graphs/ à côté du HTML
+- 'zip'    : les PNG dans une seule archive <rapport>_graphs.zip
+             (servie par l'application web : /view/<rapport>_graphs/<png>)
+- 'interactive' : pas de PNG ; séries réduites intégrées en float32 et
+             tracées dans le navigateur avec zoom (voir interactive_plots.py)
+
+En mode externe, le HTML référence les images par un chemin relatif avec
+loading="lazy" : le rapport est léger, s'écrit et s'ouvre vite, et le
+navigateur ne charge que les graphiques affichés. Les PNG sont écrits au
+fil du rendu : ils ne sont pas tous gardés en mémoire.
+"""
+
+import os
+import zipfile
+from io import BytesIO
+from typing import Dict, Iterable, Iterator, List, Optional
+from urllib.parse import quote
+
+from graph_rendering import iter_graphs, png_data_uri, resolve_jobs
+from interactive_plots import plot_element, plot_json, renderer_script
+
+GRAPH_MODES = ('inline', 'files', 'zip', 'interactive')
+DEFAULT_GRAPH_MODE = 'inline'
+ASSETS_SUFFIX = '_graphs'
+
+def assets_folder(report_path: str) -> str:
+    """Nom du dossier (ou de l'archive, + .zip) des graphiques d'un rapport."""
+    return os.path.splitext(os.path.basename(report_path))[0] + ASSETS_SUFFIX
+
+class GraphAssets:
+    """Destination des graphiques d'un rapport : rendu, écriture et balises HTML."""
+
+    def __init__(self, report_path: str, mode: str = DEFAULT_GRAPH_MODE):
+        if mode not in GRAPH_MODES:
+            raise ValueError(f"Mode de graphiques inconnu : {mode}")
+        self.mode = mode
+        self.folder = assets_folder(report_path)
+        self.path = os.path.join(os.path.dirname(report_path), self.folder)
+        self.archive = None
+        self.count = 0
+        self.size = 0
+
+        if mode == 'files':
+            os.makedirs(self.path, exist_ok=True)
+        elif mode == 'zip':
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            # PNG déjà compressé : stocké tel quel
+            self.archive = zipfile.ZipFile(f"{self.path}.zip", 'w', zipfile.ZIP_STORED)
+
+    @property
+    def img_attributes(self) -> str:
+        """Attributs supplémentaires des balises <img>."""
+        return '' if self.mode == 'inline' else ' loading="lazy"'
+
+    def add(self, png: bytes) -> str:
+        """Enregistre un graphique ; renvoie la valeur de src."""
+        self.count += 1
+        self.size += len(png)
+        if self.mode == 'inline':
+            return png_data_uri(png)
+
+        name = f"graph_{self.count:03d}.png"
+        if self.archive is not None:
+            self.archive.writestr(name, png)
+        else:
+            with open(os.path.join(self.path, name), 'wb') as f:
+                f.write(png)
+        return f"{quote(self.folder)}/{name}"
+
+    def add_all(self, pngs: Iterable[bytes]) -> List[str]:
+        return [self.add(png) for png in pngs]
+
+    def add_plot(self, spec: Dict) -> str:
+        """Tracé interactif : données JSON du graphique."""
+        data = plot_json(spec)
+        self.count += 1
+        self.size += len(data.encode('utf-8'))
+        return data
+
+    def iter_render(self, specs: List[Dict], jobs: int) -> Iterator[str]:
+        """
+        Graphiques des descriptions, dans l'ordre, produits au fil du rendu
+        (PNG ou tracés interactifs) : chaque ligne du rapport peut être
+        écrite dès que son graphique est prêt.
+        """
+        if self.mode == 'interactive':
+            print(f"  🎨 {len(specs)} tracés interactifs (dessinés par le navigateur)...")
+            for spec in specs:
+                yield self.add_plot(spec)
+            return
+        print(f"  🎨 Rendu de {len(specs)} graphiques ({resolve_jobs(jobs)} processus)...")
+        for png in iter_graphs(specs, jobs):
+            yield self.add(png)
+
+    def render(self, specs: List[Dict], jobs: int) -> List[str]:
+        """Graphiques de toutes les descriptions, dans l'ordre (PNG ou tracés interactifs)."""
+        return list(self.iter_render(specs, jobs))
+
+    def element(self, graph: str, alt: str = '', style: str = '') -> str:
+        """Balise HTML d'un graphique."""
+        style_attribute = f' style="{style}"' if style else ''
+        if self.mode == 'interactive':
+            return plot_element(graph, f' title="{alt}"{style_attribute}')
+        return f'<img src="{graph}"{self.img_attributes} alt="{alt}"{style_attribute}>'
+
+    def scripts(self) -> str:
+        """Scripts à placer en fin de rapport (moteur des tracés interactifs)."""
+        return renderer_script() if self.mode == 'interactive' else ''
+
+    def close(self):
+        if self.archive is not None:
+            self.archive.close()
+            self.archive = None
+
+    def summary(self) -> str:
+        where = {'inline': 'intégrés au HTML', 'files': f"dans {self.path}/",
+                 'zip': f"dans {self.path}.zip", 'interactive': 'interactifs intégrés au HTML'}[self.mode]
+        return f"{self.count} graphiques ({self.size / (1024 * 1024):.1f} Mo) {where}"
+
+def read_asset(reports_dir: str, folder: str, name: str) -> Optional[bytes]:
+    """Contenu d'un graphique externe (dossier ou archive zip), None si absent."""
+    if not folder.endswith(ASSETS_SUFFIX) or os.path.basename(name) != name:
+        return None
+    path = os.path.join(reports_dir, folder, name)
+    if os.path.isfile(path):
+        with open(path, 'rb') as f:
+            return f.read()
+    archive_path = os.path.join(reports_dir, f"{folder}.zip")
+    if os.path.isfile(archive_path):
+        with zipfile.ZipFile(archive_path) as archive:
+            try:
+                return archive.read(name)
+            except KeyError:
+                return None
+    return None
+
+def has_assets(report_path: str) -> bool:
+    path = os.path.join(os.path.dirname(report_path), assets_folder(report_path))
+    return os.path.isdir(path) or os.path.isfile(f"{path}.zip")
+
+def bundle_report(report_path: str) -> BytesIO:
+    """Archive zip du rapport et de ses graphiques externes (téléchargement)."""
+    reports_dir = os.path.dirname(report_path)
+    folder = assets_folder(report_path)
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as bundle:
+        bundle.write(report_path, os.path.basename(report_path))
+        directory = os.path.join(reports_dir, folder)
+        if os.path.isdir(directory):
+            for name in sorted(os.listdir(directory)):
+                bundle.write(os.path.join(directory, name), f"{folder}/{name}", zipfile.ZIP_STORED)
+        elif os.path.isfile(f"{directory}.zip"):
+            with zipfile.ZipFile(f"{directory}.zip") as archive:
+                for name in archive.namelist():
+                    bundle.writestr(f"{folder}/{name}", archive.read(name), zipfile.ZIP_STORED)
+    buffer.seek(0)
+    return buffer
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+RENDU PARALLÈLE DES GRAPHIQUES
+==============================
+Le rendu PNG matplotlib (backend Agg) des graphiques du rapport est la
+partie la plus coûteuse en CPU. Les générateurs ne dessinent plus
+directement : ils décrivent chaque graphique par un dictionnaire
+(séries déjà réduites, textes, titres, axes), puis render_graphs rend
+toutes les descriptions dans un pool de processus (--jobs). Les PNG sont
+ensuite intégrés au HTML ou écrits à part (voir graph_assets.py).
+
+- Les descriptions ne contiennent que des tableaux numpy réduits à la
+  largeur de la figure (enveloppe min/max ou LTTB, reduce_points) et des
+  types simples : l'envoi aux processus est léger
+- Les images sont produites (iter_graphs) DANS L'ORDRE des
+  descriptions (executor.map), quel que soit l'ordre de fin des rendus
+- Le rendu d'une description ne dépend que de son contenu : même entrée,
+  même PNG, en séquentiel comme en parallèle
+- Chaque processus (et chaque thread) garde ses figures Agg
+  (GraphRenderer) : la figure est créée une fois, pas une fois par signal
+- Les processus de rendu sont démarrés par 'forkserver' (ou 'spawn'),
+  jamais par fork direct : l'appelant peut être un thread de
+  l'application web (verrous de logging, matplotlib, Werkzeug tenus par
+  d'autres threads au moment du fork)
+
+Description d'un graphique :
+    {
+        'figsize': (10, 3),
+        'series': [{'x': ..., 'y': ..., 'style': {'color': 'b', ...}, 'fill': False}],
+        'texts': [{'x': 0.5, 'y': 0.5, 'text': '...', 'axes': False, 'style': {...}}],
+        'title': '...', 'title_style': {...},
+        'xlabel': '...', 'ylabel': '...', 'label_style': {...},
+        'grid': {...}, 'legend': False, 'xlim': (0, 1), 'ylim': (0, 1),
+        'axis_off': False, 'tight_layout': True,
+        'error_text': 'Erreur\\n{error}',
+    }
+"""
+
+import base64
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from pickle import PicklingError
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from matplotlib import rcParams
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from signal_downsampling import DEFAULT_DOWNSAMPLING, downsample
+
+DEFAULT_JOBS = 1
+PNG_DPI = 100
+
+# Démarrage des processus de rendu sans fork du processus appelant (multithread)
+START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+# Propriétés par défaut rétablies avant chaque graphique (figures réutilisées)
+LINE_DEFAULTS = {'color': 'C0', 'linestyle': '-', 'linewidth': rcParams['lines.linewidth'],
+                 'alpha': None, 'label': '_nolegend_'}
+SUBPLOT_DEFAULTS = {name: rcParams[f'figure.subplot.{name}']
+                    for name in ('left', 'right', 'bottom', 'top', 'wspace', 'hspace')}
+
+def png_data_uri(png: bytes) -> str:
+    return f"data:image/png;base64,{base64.b64encode(png).decode('utf-8')}"
+
+def resolve_jobs(jobs: Optional[int]) -> int:
+    """Nombre de processus de rendu (0 ou None : un par cœur)."""
+    if not jobs or jobs < 0:
+        return os.cpu_count() or 1
+    return jobs
+
+def plot_points(figsize) -> int:
+    """Points utiles d'une série : 2 par pixel de largeur de la figure."""
+    return 2 * int(figsize[0] * PNG_DPI)
+
+def reduce_points(timestamps, samples, figsize, method: str = DEFAULT_DOWNSAMPLING):
+    """Réduit une série à la résolution de la figure avant l'envoi au rendu (voir signal_downsampling.py)."""
+    return downsample(timestamps, samples, plot_points(figsize), method)
+
+def text_defaults() -> Dict:
+    return {'ha': 'left', 'va': 'baseline', 'fontsize': rcParams['font.size'],
+            'color': rcParams['text.color'], 'fontweight': 'normal'}
+
+def title_defaults() -> Dict:
+    color = rcParams['axes.titlecolor']
+    return {'color': rcParams['text.color'] if color == 'auto' else color}
+
+def grid_defaults() -> Dict:
+    return {'linestyle': rcParams['grid.linestyle'], 'alpha': rcParams['grid.alpha'],
+            'linewidth': rcParams['grid.linewidth'], 'color': rcParams['grid.color']}
+
+class GraphRenderer:
+    """
+    Figures Agg réutilisées : une Figure / FigureCanvasAgg par taille de
+    figure et par processus, créée au premier graphique.
+
+    Pour chaque description, seules les données des courbes, les textes,
+    titres, limites et la grille sont mis à jour ; les courbes et textes
+    sont puisés dans un réservoir d'artistes. Toutes les propriétés sont
+    remises à leur valeur par défaut avant application de la description :
+    le PNG ne dépend pas des graphiques rendus auparavant.
+    """
+
+    def __init__(self):
+        self.canvases: Dict[Tuple[float, float], Dict] = {}
+
+    def _canvas(self, figsize) -> Dict:
+        key = tuple(figsize)
+        state = self.canvases.get(key)
+        if state is None:
+            figure = Figure(figsize=key, dpi=PNG_DPI)
+            FigureCanvasAgg(figure)
+            state = {'figure': figure, 'ax': figure.add_subplot(), 'lines': [], 'texts': [], 'fills': []}
+            self.canvases[key] = state
+        return state
+
+    @staticmethod
+    def _pool(state: Dict, kind: str, count: int, create) -> List:
+        """Réservoir d'artistes : complété si besoin, les surplus sont masqués."""
+        pool = state[kind]
+        while len(pool) < count:
+            pool.append(create())
+        for artist in pool[count:]:
+            artist.set_visible(False)
+        return pool[:count]
+
+    def _draw(self, state: Dict, spec: Dict):
+        figure, ax = state['figure'], state['ax']
+        series_list = spec.get('series', [])
+        text_list = spec.get('texts', [])
+
+        # Courbes : mise à jour des données et du style
+        for index, series in enumerate(series_list):
+            if index < len(state['lines']):
+                line = state['lines'][index]
+                line.set_data(series['x'], series['y'])
+            else:
+                # Nouvelle courbe créée avec ses données (unités de l'axe)
+                line = ax.plot(series['x'], series['y'])[0]
+                state['lines'].append(line)
+            line.set(**{**LINE_DEFAULTS, **series.get('style', {})}, visible=True)
+        for line in state['lines'][len(series_list):]:
+            line.set_data([], [])
+            line.set(visible=False, label='_nolegend_')
+
+        # Limites : données visibles, puis remplissages (recréés, avec la ligne de base)
+        for fill in state['fills']:
+            fill.remove()
+        ax.relim(visible_only=True)
+        ax.set_autoscale_on(True)
+        state['fills'] = [ax.fill_between(series['x'], series['y'], alpha=0.1,
+                                          color=series.get('style', {}).get('color'))
+                          for series in series_list if series.get('fill')]
+        if spec.get('xlim') is not None:
+            ax.set_xlim(*spec['xlim'])
+        if spec.get('ylim') is not None:
+            ax.set_ylim(*spec['ylim'])
+        ax.autoscale_view()
+
+        # Textes
+        texts = self._pool(state, 'texts', len(text_list), lambda: ax.text(0, 0, ''))
+        for artist, text in zip(texts, text_list):
+            artist.set_bbox(None)
+            artist.set(**{**text_defaults(), **text.get('style', {})}, visible=True, text=text['text'],
+                       position=(text['x'], text['y']),
+                       transform=ax.transAxes if text.get('axes') else ax.transData)
+
+        # Titre, axes, grille, légende
+        ax.set_title(spec.get('title') or '', **{**title_defaults(), **spec.get('title_style', {})})
+        label_style = {'fontsize': rcParams['axes.labelsize'], **spec.get('label_style', {})}
+        ax.set_xlabel(spec.get('xlabel') or '', **label_style)
+        ax.set_ylabel(spec.get('ylabel') or '', **label_style)
+        ax.grid(False)
+        if spec.get('grid') is not None:
+            ax.grid(True, **{**grid_defaults(), **spec['grid']})
+        if ax.get_legend() is not None:
+            ax.get_legend().remove()
+        if spec.get('legend'):
+            ax.legend()
+        if spec.get('axis_off'):
+            ax.set_axis_off()
+        else:
+            ax.set_axis_on()
+
+        figure.subplots_adjust(**SUBPLOT_DEFAULTS)
+        if spec.get('tight_layout'):
+            figure.tight_layout()
+
+    def render(self, spec: Dict) -> bytes:
+        """Image PNG d'une description."""
+        figsize = spec.get('figsize', (10, 3))
+        state = self._canvas(figsize)
+        try:
+            self._draw(state, spec)
+            buffer = BytesIO()
+            state['figure'].savefig(buffer, format='png', dpi=PNG_DPI, bbox_inches='tight')
+        except Exception:
+            # Figure dans un état inconnu : recréée au prochain graphique
+            del self.canvases[tuple(figsize)]
+            raise
+        return buffer.getvalue()
+
+def _is_numeric(series: Dict) -> bool:
+    return all(np.asarray(series[axis]).dtype.kind in 'biuf' for axis in ('x', 'y'))
+
+# Figures réutilisées propres à chaque thread (analyses simultanées de l'application web)
+_local = threading.local()
+
+def _to_png(spec: Dict) -> bytes:
+    """Rendu avec la figure réutilisée du thread (figure neuve pour les séries non numériques)."""
+    if not all(_is_numeric(series) for series in spec.get('series', [])):
+        # Axe catégoriel (états texte) : unités propres à la figure
+        return GraphRenderer().render(spec)
+    renderer = getattr(_local, 'renderer', None)
+    if renderer is None:
+        renderer = _local.renderer = GraphRenderer()
+    return renderer.render(spec)
+
+def error_spec(spec: Dict, error: Exception) -> Dict:
+    """Description du graphique d'erreur remplaçant un rendu en échec."""
+    text = spec.get('error_text', 'Erreur génération\n{error}').replace('{error}', str(error)[:50])
+    return {
+        'figsize': spec.get('figsize', (10, 3)),
+        'texts': [{'x': 0.5, 'y': 0.5, 'text': text,
+                   'style': {'ha': 'center', 'va': 'center', 'fontsize': 10, 'color': 'red'}}],
+        'xlim': (0, 1), 'ylim': (0, 1), 'axis_off': True,
+    }
+
+def render_png(spec: Dict) -> bytes:
+    """Rend une description en image PNG (graphique d'erreur en cas d'échec)."""
+    try:
+        return _to_png(spec)
+    except Exception as e:
+        return _to_png(error_spec(spec, e))
+
+def render_graph(spec: Dict) -> str:
+    """Rend une description en image PNG base64 (data URI)."""
+    return png_data_uri(render_png(spec))
+
+def _render_context():
+    """Contexte multiprocessing des processus de rendu (matplotlib préchargé par le forkserver)."""
+    context = multiprocessing.get_context(START_METHOD)
+    if START_METHOD == 'forkserver':
+        context.set_forkserver_preload(['__main__', __name__])
+    return context
+
+def iter_graphs(specs: List[Dict], jobs: int = DEFAULT_JOBS) -> Iterator[bytes]:
+    """
+    PNG de toutes les descriptions, produits dans l'ordre des descriptions.
+
+    jobs = 1 : rendu dans le processus courant ; sinon pool de processus
+    (repli séquentiel si le pool ne peut pas être créé ou s'interrompt).
+    Les images sont produites au fil du rendu (écriture immédiate possible).
+    """
+    jobs = min(resolve_jobs(jobs), len(specs))
+    done = 0
+    if jobs > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=jobs, mp_context=_render_context()) as executor:
+                chunksize = max(1, len(specs) // (4 * jobs))
+                for png in executor.map(render_png, specs, chunksize=chunksize):
+                    done += 1
+                    yield png
+            return
+        except (OSError, BrokenProcessPool, PicklingError) as e:
+            print(f"⚠️ Rendu parallèle indisponible ({e}), rendu séquentiel")
+    for spec in specs[done:]:
+        yield render_png(spec)
+
+def render_graphs(specs: List[Dict], jobs: int = DEFAULT_JOBS) -> List[str]:
+    """Toutes les descriptions rendues en data URI, dans l'ordre des descriptions."""
+    return [png_data_uri(png) for png in iter_graphs(specs, jobs)]
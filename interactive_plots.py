@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+TRACÉS INTERACTIFS DES SIGNAUX (NAVIGATEUR)
+===========================================
+Mode --graphs interactive : aucun PNG n'est rendu côté serveur. Chaque
+graphique est intégré une seule fois au HTML sous forme compacte :
+
+- Séries déjà réduites (enveloppe min/max, voir signal_downsampling.py)
+- Tableaux en float32 little-endian encodés en base64 ; les instants
+  sont stockés en écart au premier instant (x0 en float64) pour garder la
+  précision des longues acquisitions
+- Signaux énumérés : rang de l'état + liste des libellés
+
+Le dessin est fait dans le navigateur par static/eva_plot.js (canvas,
+sans dépendance, intégré au rapport) : molette = zoom sur le temps,
+glisser = déplacement, double-clic = vue complète. Les pics courts
+restent visibles au zoom sans relancer le rapport.
+"""
+
+import base64
+import json
+import os
+from typing import Dict, Optional
+
+import numpy as np
+
+RENDERER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'eva_plot.js')
+
+# Couleurs matplotlib abrégées → CSS (les autres noms / #hex sont compris tels quels)
+COLOR_CODES = {
+    'b': '#0000ff', 'g': '#008000', 'r': '#ff0000', 'c': '#00bfbf', 'm': '#bf00bf',
+    'y': '#bfbf00', 'k': '#000000', 'w': '#ffffff',
+    'C0': '#1f77b4', 'C1': '#ff7f0e', 'C2': '#2ca02c', 'C3': '#d62728', 'C4': '#9467bd',
+    'C5': '#8c564b', 'C6': '#e377c2', 'C7': '#7f7f7f', 'C8': '#bcbd22', 'C9': '#17becf',
+}
+
+_renderer_source: Optional[str] = None
+
+def css_color(color, default: str = '#1f77b4') -> str:
+    if not color:
+        return default
+    return COLOR_CODES.get(color, color)
+
+def encode_array(values: np.ndarray) -> str:
+    """Tableau → float32 little-endian en base64."""
+    return base64.b64encode(np.ascontiguousarray(values, dtype='<f4').tobytes()).decode('ascii')
+
+def _label(value) -> str:
+    return value.decode('utf-8', 'replace') if isinstance(value, bytes) else str(value)
+
+def series_payload(series: Dict) -> Dict:
+    x = np.asarray(series['x'], dtype=np.float64)
+    y = np.asarray(series['y'])
+    style = series.get('style', {})
+    payload = {
+        'x0': float(x[0]) if len(x) else 0.0,
+        'color': css_color(style.get('color')),
+        'linewidth': float(style.get('linewidth', 1.5)),
+        'alpha': 1.0 if style.get('alpha') is None else float(style['alpha']),
+        'dash': style.get('linestyle', '-') in ('--', 'dashed'),
+        'label': style.get('label'),
+        'fill': bool(series.get('fill')),
+        'states': None,
+    }
+    if y.dtype.kind not in 'biuf':
+        # Énuméré : rang de l'état (ordre alphabétique, comme signal_edges.py)
+        states, y = np.unique(y, return_inverse=True)
+        payload['states'] = [_label(state) for state in states.tolist()]
+    payload['x'] = encode_array(x - payload['x0'])
+    payload['y'] = encode_array(y.reshape(-1))
+    return payload
+
+def text_payload(text: Dict) -> Dict:
+    style = text.get('style', {})
+    bbox = style.get('bbox')
+    return {
+        'x': float(text['x']), 'y': float(text['y']), 'axes': bool(text.get('axes')),
+        'text': str(text['text']),
+        'align': style.get('ha', 'left'), 'valign': style.get('va', 'baseline'),
+        'color': css_color(style.get('color'), '#000000'),
+        'fontsize': float(style.get('fontsize', 10)),
+        'box': css_color(bbox.get('facecolor'), '#ffffff') if bbox else None,
+    }
+
+def plot_payload(spec: Dict) -> Dict:
+    """Description de graphique (graph_rendering.py) → données du tracé navigateur."""
+    return {
+        'figsize': list(spec.get('figsize', (10, 3))),
+        'title': spec.get('title') or '',
+        'xlabel': spec.get('xlabel') or '',
+        'ylabel': spec.get('ylabel') or '',
+        'grid': spec.get('grid') is not None,
+        'legend': bool(spec.get('legend')),
+        'xlim': list(spec['xlim']) if spec.get('xlim') is not None else None,
+        'ylim': list(spec['ylim']) if spec.get('ylim') is not None else None,
+        'axis_off': bool(spec.get('axis_off')),
+        'series': [series_payload(series) for series in spec.get('series', []) if len(series['x'])],
+        'texts': [text_payload(text) for text in spec.get('texts', [])],
+    }
+
+def plot_json(spec: Dict) -> str:
+    """Données du tracé en JSON, sûres à l'intérieur d'une balise <script>."""
+    return json.dumps(plot_payload(spec), ensure_ascii=False, separators=(',', ':')).replace('</', '<\\/')
+
+def plot_element(data: str, attributes: str = '') -> str:
+    """Zone de tracé : canvas + données JSON lues par eva_plot.js."""
+    return (f'<div class="eva-plot"{attributes}><canvas></canvas>'
+            f'<script type="application/json">{data}</script></div>')
+
+def renderer_script() -> str:
+    """Moteur de tracé à intégrer une fois en fin de rapport."""
+    global _renderer_source
+    if _renderer_source is None:
+        with open(RENDERER_PATH, 'r', encoding='utf-8') as f:
+            _renderer_source = f.read()
+    return f"<script>\n{_renderer_source}\n</script>"
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+FILE D'ATTENTE DES ANALYSES (APPLICATION WEB)
+=============================================
+Une analyse complète d'un gros MDF dure plusieurs minutes : elle n'est
+plus exécutée dans la requête HTTP /upload. La requête enregistre le
+fichier, dépose un travail dans la file et répond aussitôt avec son
+identifiant ; l'état est ensuite consulté par /jobs/<id>.
+
+- Pool borné de threads de travail (workers) : au plus N analyses en
+  parallèle (chaque analyse a déjà son propre pool de rendu, --jobs)
+- Contre-pression : au-delà de max_pending travaux en attente, submit
+  lève QueueFull (l'application répond HTTP 429)
+- États : 'queued' → 'running' → 'done' / 'failed'
+- Les travaux terminés les plus anciens sont oubliés au-delà de keep
+- Un suivi de progression passé avec le travail (progress=..., voir
+  progress.py) est fermé une fois l'état final enregistré
+"""
+
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+DEFAULT_WORKERS = 1
+DEFAULT_MAX_PENDING = 4
+DEFAULT_KEEP = 200
+
+FINISHED_STATES = ('done', 'failed')
+
+class QueueFull(Exception):
+    """File d'attente pleine : le travail n'a pas été accepté."""
+
+class JobQueue:
+    """Travaux d'analyse exécutés en arrière-plan par un pool borné."""
+
+    def __init__(self, workers: int = DEFAULT_WORKERS,
+                 max_pending: int = DEFAULT_MAX_PENDING,
+                 keep: int = DEFAULT_KEEP):
+        self.workers = max(1, workers)
+        self.max_pending = max(0, max_pending)
+        self.keep = keep
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='eva-job')
+        self.jobs: 'OrderedDict[str, Dict]' = OrderedDict()
+        self.lock = threading.Lock()
+
+    def _count(self, state: str) -> int:
+        return sum(1 for job in self.jobs.values() if job['state'] == state)
+
+    def _full(self) -> bool:
+        return self._count('queued') + self._count('running') >= self.workers + self.max_pending
+
+    def is_full(self) -> bool:
+        """Plus de place pour un nouveau travail (tous les workers occupés et attente pleine)."""
+        with self.lock:
+            return self._full()
+
+    def submit(self, function: Callable[..., Dict], *args, **info) -> Dict:
+        """
+        Dépose un travail : function(*args) renvoie un dictionnaire, conservé
+        dans 'result'. info : champs affichés avec l'état (nom du
+        fichier...). Lève QueueFull si la file est pleine.
+        """
+        with self.lock:
+            if self._full():
+                raise QueueFull(f"{self.max_pending} analyses déjà en attente")
+            job = {
+                'id': uuid.uuid4().hex,
+                'state': 'queued',
+                'submitted': time.time(),
+                'started': None,
+                'finished': None,
+                'result': None,
+                'error': None,
+                **info,
+            }
+            self.jobs[job['id']] = job
+            self._forget_finished()
+        self.executor.submit(self._run, job, function, args)
+        return self.status(job['id'])
+
+    def _run(self, job: Dict, function: Callable[..., Dict], args):
+        with self.lock:
+            job['state'] = 'running'
+            job['started'] = time.time()
+        try:
+            result = function(*args)
+            with self.lock:
+                job['result'] = result
+                job['state'] = 'done'
+                job['finished'] = time.time()
+        except Exception as e:
+            print(f"❌ Travail {job['id']} en échec : {e}")
+            print(traceback.format_exc())
+            with self.lock:
+                job['error'] = str(e)
+                job['state'] = 'failed'
+                job['finished'] = time.time()
+        progress = job.get('progress')
+        if progress is not None:
+            progress.close()
+
+    def _forget_finished(self):
+        """Oublie les travaux terminés les plus anciens au-delà de keep (verrou tenu)."""
+        finished = [job_id for job_id, job in self.jobs.items() if job['state'] in FINISHED_STATES]
+        for job_id in finished[:max(0, len(self.jobs) - self.keep)]:
+            del self.jobs[job_id]
+
+    def status(self, job_id: str) -> Optional[Dict]:
+        """Copie de l'état d'un travail (position dans la file, durées), None si inconnu."""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            status = dict(job)
+            if job['state'] == 'queued':
+                queued = [other for other in self.jobs.values() if other['state'] == 'queued']
+                status['position'] = queued.index(job) + 1
+            now = job['finished'] or time.time()
+            status['waited_s'] = round((job['started'] or now) - job['submitted'], 3)
+            status['elapsed_s'] = round(now - job['started'], 3) if job['started'] else 0.0
+            return status
+
+    def stats(self) -> Dict:
+        with self.lock:
+            counts = {state: self._count(state) for state in ('queued', 'running', 'done', 'failed')}
+        return {'workers': self.workers, 'max_pending': self.max_pending, **counts}
+
+    def shutdown(self, wait: bool = True):
+        self.executor.shutdown(wait=wait)
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+RÉCEPTION DES MDF AU FIL DE L'ENVOI
+===================================
+Les données d'un envoi arrivent directement dans un IngestFile (flux de
+fichier fourni à l'analyseur multipart de l'application web), sans
+passer par un fichier temporaire intermédiaire :
+
+- Écriture sur disque par blocs fixes (INGEST_CHUNK) et empreinte
+  SHA-256 calculée au fil de l'eau
+- Bloc d'identification (64 octets) et bloc HD vérifiés dès les
+  premiers octets reçus : un fichier qui n'est pas un MDF est refusé
+  (InvalidMDF) sans attendre la fin de l'envoi
+- En fin de fichier : contrôle de troncature (bloc HD complet, premier
+  groupe de données à l'intérieur du fichier)
+
+Structure lue (spécification ASAM MDF) :
+    0   'MDF     ' ou 'UnFinMF ' (fichier non finalisé)
+    8   version texte ('4.10    ')
+    16  programme ayant écrit le fichier
+    24  ordre des octets (MDF 3 : 0 = little endian)
+    28  version numérique (uint16, ex. 410)
+    64  bloc HD : '##HD' (MDF 4) ou 'HD' (MDF 3), avec le lien vers le
+        premier groupe de données (DG)
+"""
+
+import hashlib
+import os
+import struct
+import uuid
+from typing import Dict, Optional
+
+MDF_IDENTIFIERS = (b'MDF     ', b'UnFinMF ')
+ID_BLOCK_SIZE = 64
+HEADER_SIZE = 128  # Bloc d'identification + début du bloc HD
+INGEST_CHUNK = 1024 * 1024  # 1 Mo
+DG_MIN_SIZE = {3: 28, 4: 24}  # Taille minimale d'un bloc DG
+
+class InvalidMDF(Exception):
+    """Fichier refusé : pas un MDF, version inconnue ou fichier tronqué."""
+
+def parse_header(head: bytes) -> Dict:
+    """Informations du bloc d'identification et du bloc HD (lève InvalidMDF)."""
+    if len(head) < ID_BLOCK_SIZE + 8:
+        raise InvalidMDF(f"Fichier tronqué : {len(head)} octets, en-tête MDF incomplet")
+    identifier = head[:8]
+    if identifier not in MDF_IDENTIFIERS:
+        raise InvalidMDF(f"Ce fichier n'est pas un MDF (identifiant {identifier!r})")
+
+    big_endian = struct.unpack_from('<H', head, 24)[0] != 0
+    version = struct.unpack_from('>H' if big_endian else '<H', head, 28)[0]
+    if not 200 <= version < 500:
+        raise InvalidMDF(f"Version MDF non prise en charge : {version}")
+    header = {
+        'version': version,
+        'version_text': head[8:16].decode('ascii', 'replace').strip(),
+        'program': head[16:24].decode('ascii', 'replace').strip('\x00 '),
+        'finalized': identifier == MDF_IDENTIFIERS[0],
+    }
+
+    if version >= 400:
+        if head[64:68] != b'##HD':
+            raise InvalidMDF("Bloc HD absent : fichier MDF corrompu")
+        header['hd_length'], = struct.unpack_from('<Q', head, 72)
+        header['first_dg'], = struct.unpack_from('<Q', head, 88) if len(head) >= 96 else (0,)
+    else:
+        if head[64:66] != b'HD':
+            raise InvalidMDF("Bloc HD absent : fichier MDF corrompu")
+        order = '>' if big_endian else '<'
+        header['hd_length'], header['first_dg'] = struct.unpack_from(f'{order}HI', head, 66)
+    return header
+
+def check_complete(header: Dict, size: int):
+    """Contrôle de troncature d'un fichier reçu en entier (lève InvalidMDF)."""
+    if size < ID_BLOCK_SIZE + header['hd_length']:
+        raise InvalidMDF(f"Fichier MDF tronqué : bloc HD incomplet ({size} octets)")
+    first_dg = header['first_dg']
+    if first_dg and first_dg + DG_MIN_SIZE[header['version'] // 100] > size:
+        raise InvalidMDF(f"Fichier MDF tronqué : données attendues à l'octet {first_dg}, "
+                         f"fichier de {size} octets")
+
+class IngestFile:
+    """
+    Flux d'un fichier envoyé : écrit dans <incoming>/<uuid>.part par blocs
+    fixes, haché et vérifié pendant la réception.
+
+    L'analyseur multipart appelle write() à chaque morceau reçu, puis
+    seek(0) en fin de fichier (contrôle de troncature). Le fichier .part
+    est supprimé à la fermeture s'il n'a pas été repris (detach).
+    """
+
+    def __init__(self, incoming_dir: str):
+        os.makedirs(incoming_dir, exist_ok=True)
+        self.path = os.path.join(incoming_dir, f"{uuid.uuid4().hex}.part")
+        self.file = open(self.path, 'w+b')
+        self.digest = hashlib.sha256()
+        self.buffer = bytearray()
+        self.size = 0
+        self.head = b''
+        self.header: Optional[Dict] = None
+        self.complete = False
+        self.detached = False
+
+    def _flush(self, everything: bool = False):
+        """Écrit les blocs complets du tampon (tout le tampon si everything)."""
+        end = len(self.buffer) if everything else len(self.buffer) - len(self.buffer) % INGEST_CHUNK
+        for start in range(0, end, INGEST_CHUNK):
+            chunk = bytes(self.buffer[start:min(start + INGEST_CHUNK, end)])
+            self.digest.update(chunk)
+            self.file.write(chunk)
+        del self.buffer[:end]
+
+    def _fail(self, error: InvalidMDF):
+        self.close()
+        raise error
+
+    def write(self, data: bytes) -> int:
+        if len(self.head) < HEADER_SIZE:
+            self.head += bytes(data[:HEADER_SIZE - len(self.head)])
+            if len(self.head) >= HEADER_SIZE:
+                # En-tête complet : refus immédiat d'un fichier non MDF
+                try:
+                    self.header = parse_header(self.head)
+                except InvalidMDF as e:
+                    self._fail(e)
+        self.buffer += data
+        self.size += len(data)
+        if len(self.buffer) >= INGEST_CHUNK:
+            self._flush()
+        return len(data)
+
+    def finish(self):
+        """Fin du fichier : derniers octets écrits, en-tête et troncature contrôlés."""
+        if self.complete:
+            return
+        self._flush(everything=True)
+        self.file.flush()
+        try:
+            if self.header is None:
+                self.header = parse_header(self.head)
+            check_complete(self.header, self.size)
+        except InvalidMDF as e:
+            self._fail(e)
+        self.complete = True
+
+    @property
+    def sha256(self) -> str:
+        return self.digest.hexdigest()
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        self.finish()
+        return self.file.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self.file.tell() if self.complete else self.size
+
+    def read(self, size: int = -1) -> bytes:
+        self.finish()
+        return self.file.read(size)
+
+    def readline(self, size: int = -1) -> bytes:
+        self.finish()
+        return self.file.readline(size)
+
+    def flush(self):
+        pass
+
+    def detach(self) -> Dict:
+        """Fichier reçu complet, repris par l'appelant (déplacé ou supprimé par lui)."""
+        self.finish()
+        self.file.close()
+        self.detached = True
+        return {'path': self.path, 'sha256': self.sha256, 'size': self.size, 'header': self.header}
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+        if not self.detached and os.path.exists(self.path):
+            os.remove(self.path)
+
+    @property
+    def closed(self) -> bool:
+        return self.file.closed
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+APERÇU RAPIDE D'UN MDF (MÉTADONNÉES SEULES)
+===========================================
+Avant de lancer un rapport complet, l'aperçu répond en quelques dizaines
+de millisecondes, même sur un MDF de plusieurs Go : aucune donnée de
+signal n'est lue.
+
+- Blocs lus : en-tête (version, date de début, commentaire), groupes de
+  canaux (nombre d'enregistrements, source d'acquisition, commentaire)
+  et noms des canaux
+- Plage temporelle de chaque groupe : premier et dernier enregistrement
+  du canal maître uniquement (lecture ciblée), fréquence moyenne déduite
+  du nombre d'enregistrements
+- VIN cherché dans les commentaires de l'en-tête et des groupes ; les
+  canaux pouvant le contenir sont listés (leur lecture demanderait les
+  données)
+- Signaux du rapport (DOCUMENT_SIGNALS_EXACT, stratégie du template
+  exact) et du registre du framework (stratégie framework) résolus comme
+  dans les générateurs, avec le cache des résolutions
+"""
+
+import json
+import os
+import re
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from asammdf import MDF
+
+from resolution_cache import FRAMEWORK_PATH, ResolutionCache, framework_version
+from signal_resolver import SignalResolver
+
+VIN_PATTERN = re.compile(r'VIN[:\s]*([A-HJ-NPR-Z0-9]{17})', re.IGNORECASE)
+VIN_SIGNALS = ['VIN', 'VehicleIdentificationNumber', 'Vehicle_ID']
+
+def load_registry(framework_path: str = FRAMEWORK_PATH) -> Tuple[Dict[str, str], Optional[Dict]]:
+    """Registre du framework : identifiant interne → nom canonique (vide sans framework)."""
+    try:
+        with open(framework_path, 'r', encoding='utf-8') as f:
+            framework_data = json.load(f)
+    except (OSError, ValueError):
+        return {}, None
+    registry = {internal_id: info.get('canonical_name', internal_id)
+                for internal_id, info in framework_data.get('signal_registry', {}).items()}
+    return registry, framework_data
+
+def _group_layout(mdf: MDF, index: int) -> Dict:
+    """Description d'un groupe : canaux, enregistrements, plage temporelle, fréquence."""
+    group = mdf.groups[index]
+    channel_group = group.channel_group
+    cycles = channel_group.cycles_nr
+    layout = {
+        'index': index,
+        'channels': [channel.name for channel in group.channels],
+        'records': cycles,
+        'source': getattr(channel_group, 'acq_name', '') or '',
+        'comment': channel_group.comment or '',
+        'start_s': None,
+        'end_s': None,
+        'sample_rate_hz': None,
+    }
+    if cycles:
+        # Premier et dernier instant seulement : pas de lecture du canal maître complet
+        first = mdf.get_master(index, record_offset=0, record_count=1)
+        last = mdf.get_master(index, record_offset=cycles - 1, record_count=1)
+        if len(first) and len(last):
+            layout['start_s'] = float(first[0])
+            layout['end_s'] = float(last[0])
+            span = layout['end_s'] - layout['start_s']
+            if cycles > 1 and span > 0:
+                layout['sample_rate_hz'] = round((cycles - 1) / span, 3)
+    return layout
+
+def _resolved(matches: Dict[str, Dict], names: Sequence[str]) -> Dict:
+    channel = next((matches[name]['channel'] for name in names if matches[name]['channel']), None)
+    tier = next((matches[name]['tier'] for name in names if matches[name]['channel']), None)
+    return {'channel': channel, 'tier': tier}
+
+def inspect_mdf(mdf_path: str, document_signals: Sequence[Tuple[str, str]],
+                framework_path: str = FRAMEWORK_PATH,
+                cache: Optional[ResolutionCache] = None) -> Dict:
+    """Métadonnées d'un MDF et signaux du rapport / du registre résolus (sans lire les données)."""
+    started = time.perf_counter()
+    cache = cache if cache is not None else ResolutionCache()
+    with MDF(mdf_path) as mdf:
+        header = mdf.header
+        start_time = getattr(header, 'start_time', None)
+        groups = [_group_layout(mdf, index) for index in range(len(mdf.groups))]
+        channels = list(mdf.channels_db.keys())
+        comments = [str(header.comment or '')] + [group['comment'] for group in groups]
+        version = str(mdf.version)
+
+    masters = [group['channels'][0] for group in groups if group['channels']]
+    starts = [group['start_s'] for group in groups if group['start_s'] is not None]
+    ends = [group['end_s'] for group in groups if group['end_s'] is not None]
+    vin = next((match.group(1) for match in map(VIN_PATTERN.search, comments) if match), None)
+    vin_channels = list(dict.fromkeys(channel for name in VIN_SIGNALS for channel in channels
+                                      if name.lower() in channel.lower()))
+
+    # Signaux du rapport (paire EVA / SWEET) : même résolution que le template exact
+    resolver = SignalResolver(channels, strategy='exact_template', cache=cache)
+    matches = resolver.resolve_batch(name for pair in document_signals for name in pair)
+    resolver.save_cache()
+    document = [{'eva': eva, 'sweet': sweet, **_resolved(matches, (eva, sweet))}
+                for eva, sweet in document_signals]
+
+    # Registre du framework UC : même résolution que le générateur framework
+    registry, framework_data = load_registry(framework_path)
+    resolver = SignalResolver(channels, strategy='framework', cache=cache,
+                              version=framework_version(framework_data, framework_path))
+    matches = resolver.resolve_batch(registry.values())
+    resolver.save_cache()
+    registry_resolved = {internal_id: {'name': name, **matches[name]}
+                         for internal_id, name in registry.items()}
+
+    return {
+        'file': os.path.basename(mdf_path),
+        'size_mb': round(os.path.getsize(mdf_path) / (1024 * 1024), 1),
+        'version': version,
+        'start_time': start_time.isoformat() if start_time else None,
+        'vin': vin,
+        'vin_channels': vin_channels,
+        'channel_count': sum(len(group['channels']) for group in groups) - len(masters),
+        'group_count': len(groups),
+        'groups': groups,
+        'start_s': min(starts) if starts else None,
+        'end_s': max(ends) if ends else None,
+        'duration_s': max(ends) - min(starts) if starts and ends else None,
+        'document_signals': document,
+        'document_resolved': sum(1 for signal in document if signal['channel']),
+        'registry_signals': registry_resolved,
+        'registry_resolved': sum(1 for signal in registry_resolved.values() if signal['channel']),
+        'tiers': SignalResolver.format_tier_counts(matches),
+        'inspect_ms': int(round((time.perf_counter() - started) * 1000)),
+    }
+
+def format_inspection(info: Dict) -> List[str]:
+    """Lignes console de l'aperçu."""
+    def seconds(value: Optional[float]) -> str:
+        return f"{value:.3f} s" if value is not None else '?'
+
+    lines = [
+        f"📁 {info['file']} ({info['size_mb']} Mo, MDF {info['version']}, début {info['start_time'] or '?'})",
+        f"🚗 VIN : {info['vin'] or 'non trouvé dans les métadonnées'}"
+        + (f" (canaux candidats : {', '.join(info['vin_channels'][:5])})" if not info['vin'] and info['vin_channels'] else ''),
+        f"📊 {info['channel_count']} canaux dans {info['group_count']} groupes, "
+        f"de {seconds(info['start_s'])} à {seconds(info['end_s'])} (durée {seconds(info['duration_s'])})",
+    ]
+    for group in info['groups']:
+        rate = f"{group['sample_rate_hz']:g} Hz" if group['sample_rate_hz'] else '?'
+        source = f" [{group['source']}]" if group['source'] else ''
+        lines.append(f"   Groupe {group['index']}{source} : {len(group['channels'])} canaux, "
+                     f"{group['records']} enregistrements, {rate}, "
+                     f"{seconds(group['start_s'])} → {seconds(group['end_s'])}")
+    lines.append(f"📋 Signaux du rapport : {info['document_resolved']}/{len(info['document_signals'])} résolus")
+    missing = [signal['eva'] for signal in info['document_signals'] if not signal['channel']]
+    if missing:
+        lines.append(f"   Non trouvés : {', '.join(missing)}")
+    lines.append(f"🗂️ Registre du framework : {info['registry_resolved']}/{len(info['registry_signals'])} résolus "
+                 f"({info['tiers']})")
+    lines.append(f"⏱️ Aperçu en {info['inspect_ms']} ms")
+    return lines
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+SUIVI DE PROGRESSION DES ANALYSES
+=================================
+En plus des messages console, les générateurs publient des événements
+de progression structurés :
+
+    {'seq': 12, 'stage': 'rendu', 'label': 'Rendu des graphiques',
+     'done': 7, 'total': 31, 'elapsed_ms': 8421, 'stage_ms': 1320,
+     'detail': 'HVBatterySOC', 'final': False}
+
+- stage(name, label, total) ouvre une étape (et ferme la précédente)
+- advance(detail) : un élément de plus dans l'étape (graphique, exigence...)
+- finish() ferme la dernière étape (événement final) ; close() signale
+  la fin du travail, même en échec (file d'attente de l'application web)
+- Lecture par numéro d'événement (events_after) : l'application web
+  les transmet en Server-Sent Events (/jobs/<id>/events) ; l'historique
+  gardé en mémoire est borné
+- Durée de chaque étape conservée (timings) : affichée en fin d'analyse
+  et ajoutée à eva_cache/stage_timings.jsonl pour l'analyse de performance
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+DEFAULT_MAX_EVENTS = 500
+TIMINGS_PATH = os.path.join('eva_cache', 'stage_timings.jsonl')
+
+_timings_lock = threading.Lock()
+
+class ProgressTracker:
+    """Étapes d'une analyse : avancement, temps écoulé et durées par étape."""
+
+    def __init__(self, max_events: int = DEFAULT_MAX_EVENTS):
+        self.started = time.perf_counter()
+        self.events = deque(maxlen=max_events)
+        self.seq = 0
+        self.timings: Dict[str, int] = {}  # étape → durée cumulée (ms)
+        self.current: Optional[Dict] = None
+        self.finished = False
+        self.closed = False  # Travail terminé (succès ou échec) : plus d'attente
+        self.condition = threading.Condition()
+
+    def _ms(self, since: float) -> int:
+        return int(round((time.perf_counter() - since) * 1000))
+
+    def _close_stage(self):
+        """Durée de l'étape en cours ajoutée aux timings (condition tenue)."""
+        if self.current is not None:
+            name = self.current['stage']
+            self.timings[name] = self.timings.get(name, 0) + self._ms(self.current['started'])
+            self.current = None
+
+    def _emit(self, detail: Optional[str] = None, final: bool = False):
+        """Publie l'état courant (condition tenue)."""
+        self.seq += 1
+        current = self.current or {}
+        self.events.append({
+            'seq': self.seq,
+            'stage': current.get('stage'),
+            'label': current.get('label'),
+            'done': current.get('done', 0),
+            'total': current.get('total'),
+            'elapsed_ms': self._ms(self.started),
+            'stage_ms': self._ms(current['started']) if current else 0,
+            'detail': detail,
+            'final': final,
+        })
+        self.condition.notify_all()
+
+    def stage(self, name: str, label: str = '', total: Optional[int] = None):
+        """Début d'une étape (total : nombre d'éléments, si connu)."""
+        with self.condition:
+            self._close_stage()
+            self.current = {'stage': name, 'label': label or name, 'done': 0, 'total': total,
+                            'started': time.perf_counter()}
+            self._emit()
+
+    def advance(self, detail: Optional[str] = None, step: int = 1):
+        """Un (ou step) élément(s) de plus dans l'étape en cours."""
+        with self.condition:
+            if self.current is None:
+                return
+            self.current['done'] += step
+            self._emit(detail)
+
+    def finish(self):
+        """Fin de l'analyse : dernière étape fermée, événement final."""
+        with self.condition:
+            if self.finished:
+                return
+            self._close_stage()
+            self.finished = True
+            self._emit(final=True)
+
+    def close(self):
+        """Le travail est terminé (même en échec) : réveille les lecteurs en attente."""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def last(self) -> Optional[Dict]:
+        with self.condition:
+            return dict(self.events[-1]) if self.events else None
+
+    def events_after(self, seq: int, timeout: Optional[float] = None) -> List[Dict]:
+        """Événements de numéro > seq ; attend au plus timeout s s'il n'y en a pas encore."""
+        with self.condition:
+            if self.seq <= seq and not self.closed:
+                self.condition.wait(timeout)
+            return [dict(event) for event in self.events if event['seq'] > seq]
+
+    def total_ms(self) -> int:
+        return self._ms(self.started)
+
+    def summary(self) -> str:
+        with self.condition:
+            stages = ' | '.join(f"{name} {ms / 1000:.2f} s" for name, ms in self.timings.items())
+        return f"Durées : {stages or 'aucune étape'} (total {self.total_ms() / 1000:.2f} s)"
+
+    def save(self, path: str = TIMINGS_PATH, **info):
+        """Ajoute les durées des étapes (et info : rapport, MDF...) au journal JSON lignes."""
+        with self.condition:
+            record = {'date': datetime.now().isoformat(timespec='seconds'), **info,
+                      'total_ms': self.total_ms(), 'stages_ms': dict(self.timings)}
+        try:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            with _timings_lock, open(path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        except OSError as e:
+            print(f"⚠️ Durées non enregistrées : {e}")
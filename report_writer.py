@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+ÉCRITURE DU RAPPORT HTML AU FIL DE L'EAU
+========================================
+Les générateurs n'assemblent plus le document complet en mémoire
+(html += ... répété : copies successives de tout le texte, et toutes les
+images base64 gardées jusqu'à la fin). Chaque section (en-tête, table
+UC, lignes de signaux, table DOORS, résumé) est écrite dans le fichier
+dès qu'elle est produite ; avec les graphiques rendus au fil de l'eau
+(GraphAssets.iter_render), une seule image est en mémoire à la fois.
+
+Le rapport est écrit dans <rapport>.part puis renommé à la fin : en cas
+d'erreur, aucun rapport tronqué n'est laissé dans le dossier des rapports.
+Deux rapports écrits en même temps (analyses simultanées de l'application
+web, processus d'une analyse par lots) ne prennent jamais le même nom :
+suffixe _2, _3... si besoin.
+
+    with ReportWriter(output_path) as report:
+        report.write(header)
+        for row in rows:
+            report.write(row)
+"""
+
+import os
+import threading
+from typing import Optional, Set, TextIO
+
+# Tampon d'écriture : quelques grosses écritures plutôt qu'une par ligne de tableau
+WRITE_BUFFER = 256 * 1024
+
+# Rapports en cours d'écriture dans ce processus
+_writing: Set[str] = set()
+_lock = threading.Lock()
+
+def _claim_path(path: str) -> str:
+    """
+    Réserve un nom de rapport libre (ni existant, ni en cours d'écriture) ;
+    le <nom>.part est créé en exclusif : la réservation vaut aussi entre
+    processus.
+    """
+    stem, extension = os.path.splitext(path)
+    candidate, index = path, 1
+    with _lock:
+        while True:
+            if candidate not in _writing and not os.path.exists(candidate):
+                try:
+                    os.close(os.open(f"{candidate}.part", os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                    break
+                except FileExistsError:
+                    pass
+            index += 1
+            candidate = f"{stem}_{index}{extension}"
+        _writing.add(candidate)
+    return candidate
+
+class ReportWriter:
+    """Fichier HTML du rapport, écrit section par section."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.part_path = f"{path}.part"
+        self.file: Optional[TextIO] = None
+        self.size = 0
+
+    def __enter__(self) -> 'ReportWriter':
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        # Nom définitif (self.path) fixé à l'ouverture
+        self.path = _claim_path(self.path)
+        self.part_path = f"{self.path}.part"
+        self.file = open(self.part_path, 'w', encoding='utf-8', buffering=WRITE_BUFFER)
+        return self
+
+    def write(self, text: str):
+        self.file.write(text)
+        self.size += len(text)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.file.close()
+        self.file = None
+        try:
+            if exc_type is None:
+                os.replace(self.part_path, self.path)
+            elif os.path.exists(self.part_path):
+                os.remove(self.part_path)
+        finally:
+            with _lock:
+                _writing.discard(self.path)
+        return False
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+CACHE PERSISTANT DES RÉSOLUTIONS DE SIGNAUX
+===========================================
+Les acquisitions d'une même configuration véhicule/logiciel partagent
+quasiment la même liste de canaux : les correspondances nom → canal MDF
+sont donc sauvegardées sur disque et réutilisées d'un fichier à l'autre.
+
+- Clé : empreinte SHA-256 de la liste des canaux DANS L'ORDRE DU MDF
+  (à plusieurs canaux possibles, le premier dans cet ordre l'emporte)
+  + version du framework JSON + stratégie de résolution
+- Éviction : les entrées les moins récemment utilisées sont supprimées
+  au-delà d'un nombre d'entrées ou d'une taille totale maximale
+- Compteurs succès/échecs cumulés, affichés en pied de rapport : une
+  ligne ajoutée atomiquement par recherche (O_APPEND), sans
+  lecture-modification-écriture, donc sans perte entre processus
+  (analyse par lots). Au-delà de STATS_LOG_MAX_BYTES, le journal est
+  reporté dans stats.json puis vidé sous verrou exclusif (flock) : sa
+  taille, et le coût du pied de rapport, restent bornés
+"""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Iterable, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows : journal jamais reporté (pas de verrou)
+    fcntl = None
+
+DEFAULT_CACHE_DIR = os.path.join('eva_cache', 'resolution')
+DEFAULT_MAX_ENTRIES = 64
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024  # 32 Mo
+
+# Version du format : à incrémenter si l'algorithme de résolution change
+CACHE_FORMAT_VERSION = 2
+
+FRAMEWORK_PATH = 'tina/uc_detection_framework.json'
+STATS_FILENAME = 'stats.json'  # Compteurs reportés depuis le journal
+STATS_LOG = 'stats.log'  # Une ligne par recherche : 'h' (succès) ou 'm' (échec)
+STATS_LOG_MAX_BYTES = 64 * 1024  # Au-delà, le journal est reporté dans stats.json
+
+_lock = threading.Lock()
+
+def framework_version(framework_data: Optional[Dict] = None, framework_path: str = FRAMEWORK_PATH) -> str:
+    """Version du framework JSON (version + date de génération)."""
+    if framework_data is None:
+        try:
+            with open(framework_path, 'r', encoding='utf-8') as f:
+                framework_data = json.load(f)
+        except Exception:
+            return 'sans-framework'
+    metadata = framework_data.get('metadata', {})
+    return f"{metadata.get('framework_version', '?')}|{metadata.get('generation_date', '?')}"
+
+def _flock(fd: int, exclusive: bool = False):
+    """Verrou de fichier entre processus (sans effet si indisponible)."""
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+
+def _read_all(fd: int) -> bytes:
+    os.lseek(fd, 0, os.SEEK_SET)
+    blocks = []
+    for block in iter(lambda: os.read(fd, STATS_LOG_MAX_BYTES), b''):
+        blocks.append(block)
+    return b''.join(blocks)
+
+class ResolutionCache:
+    """Cache disque des correspondances nom → canal, borné en taille (LRU)."""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR,
+                 max_entries: int = DEFAULT_MAX_ENTRIES,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        # Compteurs de la session
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.last_lookup = None  # 'hit' / 'miss'
+
+    @staticmethod
+    def fingerprint(channels: Iterable[str], strategy: str, version: str) -> str:
+        """
+        Empreinte de la liste ordonnée des canaux : la résolution garde le
+        premier canal trouvé, deux ordres différents n'ont pas la même clé.
+        """
+        digest = hashlib.sha256()
+        digest.update(f"v{CACHE_FORMAT_VERSION}|{strategy}|{version}\n".encode('utf-8'))
+        for channel in channels:
+            digest.update(channel.encode('utf-8', 'surrogatepass'))
+            digest.update(b'\n')
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def load(self, key: str) -> Optional[Dict[str, Dict]]:
+        """Renvoie les résolutions en cache pour cette empreinte, ou None."""
+        path = self._entry_path(key)
+        resolutions = None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                resolutions = json.load(f).get('resolutions')
+            os.utime(path)  # entrée récemment utilisée (LRU)
+        except (OSError, ValueError):
+            resolutions = None
+
+        if resolutions is None:
+            self.misses += 1
+            self.last_lookup = 'miss'
+        else:
+            self.hits += 1
+            self.last_lookup = 'hit'
+        self._update_stats(hit=resolutions is not None)
+        return resolutions
+
+    def store(self, key: str, resolutions: Dict[str, Dict]):
+        """Enregistre les résolutions puis applique la politique d'éviction."""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._entry_path(key)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'format': CACHE_FORMAT_VERSION, 'resolutions': resolutions}, f)
+            os.replace(tmp_path, path)
+            self.evict()
+        except OSError as e:
+            print(f"⚠️ Cache de résolution non écrit : {e}")
+
+    def evict(self):
+        """Supprime les entrées les moins récemment utilisées au-delà des limites."""
+        with _lock:
+            try:
+                entries = []
+                for filename in os.listdir(self.cache_dir):
+                    if filename.endswith('.json') and filename != STATS_FILENAME:
+                        stat = os.stat(os.path.join(self.cache_dir, filename))
+                        entries.append((stat.st_mtime, stat.st_size, filename))
+            except OSError:
+                return
+
+            entries.sort(reverse=True)  # plus récentes d'abord
+            total_bytes = 0
+            for rank, (_, size, filename) in enumerate(entries):
+                total_bytes += size
+                if rank >= self.max_entries or total_bytes > self.max_bytes:
+                    try:
+                        os.remove(os.path.join(self.cache_dir, filename))
+                        self.evictions += 1
+                    except OSError:
+                        pass
+
+    def _update_stats(self, hit: bool):
+        """Ajoute la recherche aux compteurs cumulés (une écriture atomique en fin de fichier)."""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd = os.open(os.path.join(self.cache_dir, STATS_LOG), os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644)
+            try:
+                # Verrou partagé : les ajouts restent concurrents, seul le report les suspend
+                _flock(fd)
+                os.write(fd, b'h\n' if hit else b'm\n')
+                if fcntl is not None and os.fstat(fd).st_size > STATS_LOG_MAX_BYTES:
+                    self._fold_stats(fd)
+            finally:
+                os.close(fd)  # libère le verrou
+        except OSError:
+            pass
+
+    def _fold_stats(self, fd: int):
+        """Reporte le journal dans stats.json puis le vide (verrou exclusif)."""
+        _flock(fd, exclusive=True)
+        lines = _read_all(fd)
+        if len(lines) <= STATS_LOG_MAX_BYTES:
+            return  # Déjà reporté par un autre processus
+        stats = self._read_totals()
+        stats['hits'] += lines.count(b'h')
+        stats['misses'] += lines.count(b'm')
+        path = os.path.join(self.cache_dir, STATS_FILENAME)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(stats, f)
+        os.replace(tmp_path, path)
+        os.ftruncate(fd, 0)
+
+    def _read_totals(self) -> Dict[str, int]:
+        try:
+            with open(os.path.join(self.cache_dir, STATS_FILENAME), 'r', encoding='utf-8') as f:
+                stats = json.load(f)
+            return {'hits': int(stats.get('hits', 0)), 'misses': int(stats.get('misses', 0))}
+        except (OSError, ValueError):
+            return {'hits': 0, 'misses': 0}
+
+    def read_stats(self) -> Dict[str, int]:
+        """Compteurs cumulés succès/échecs de toutes les exécutions."""
+        try:
+            fd = os.open(os.path.join(self.cache_dir, STATS_LOG), os.O_RDONLY)
+        except OSError:
+            return self._read_totals()
+        try:
+            # Verrou partagé : pas de report entre la lecture des totaux et celle du journal
+            _flock(fd)
+            stats = self._read_totals()
+            lines = _read_all(fd)
+        except OSError:
+            return self._read_totals()
+        finally:
+            os.close(fd)
+        stats['hits'] += lines.count(b'h')
+        stats['misses'] += lines.count(b'm')
+        return stats
+
+    def summary(self) -> str:
+        """Résumé pour le pied de rapport."""
+        stats = self.read_stats()
+        current = {'hit': 'succès', 'miss': 'échec'}.get(self.last_lookup, 'non utilisé')
+        return (f"Cache de résolution : {current} "
+                f"(cumul : {stats['hits']} succès / {stats['misses']} échecs)")
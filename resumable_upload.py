@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+ENVOI REPRIS PAR BLOCS DES GROS MDF
+===================================
+Les journaux d'endurance dépassent la taille maximale d'un envoi en une
+requête et arrivent souvent par des liaisons VPN instables. Ils sont
+envoyés par blocs, dans une session d'envoi qui survit aux coupures :
+
+    create(nom, taille)        → session (identifiant, taille des blocs)
+    put_chunk(id, n, flux, ck) → bloc n écrit à sa place, contrôlé
+    status(id)                 → blocs déjà reçus (reprise après coupure)
+    complete(id)               → fichier rangé par UploadStore.store
+
+- Session : uploads/.sessions/<id>/ avec data.part (fichier final, écrit
+  bloc par bloc à son emplacement : aucun réassemblage) et session.json
+  (blocs reçus et leur somme de contrôle) : reprise possible même après
+  un redémarrage de l'application
+- Somme de contrôle de chaque bloc vérifiée à la réception
+  ('sha256=<hex>' ou 'crc32=<hex>') : un bloc corrompu est refusé et
+  renvoyé par le client
+- En-tête MDF vérifié dès la réception du bloc 0 (mdf_ingest.py) et
+  troncature contrôlée à la fin ; empreinte SHA-256 du fichier avancée
+  au fil des blocs contigus reçus
+- Les sessions abandonnées sont supprimées au-delà de SESSION_TTL
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+import zlib
+from typing import BinaryIO, Dict, List, Optional
+
+from mdf_ingest import HEADER_SIZE, InvalidMDF, check_complete, parse_header
+from upload_store import UploadStore
+
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024  # 8 Mo
+MIN_CHUNK_SIZE = 64 * 1024
+MAX_CHUNK_SIZE = 64 * 1024 * 1024
+DEFAULT_MAX_SIZE = 100 * 1024 ** 3  # 100 Go
+SESSION_TTL = 24 * 3600  # s sans nouveau bloc avant suppression
+SESSIONS_DIR = '.sessions'
+DATA_FILE = 'data.part'
+STATE_FILE = 'session.json'
+CHECKSUM_ALGORITHMS = ('sha256', 'crc32')
+READ_BLOCK = 1024 * 1024
+
+# Champs de session enregistrés dans session.json
+PERSISTED = ('id', 'filename', 'size', 'chunk_size', 'total_chunks', 'received', 'created', 'updated')
+
+class UnknownUpload(Exception):
+    """Session d'envoi inconnue, expirée ou déjà terminée."""
+
+class UploadRejected(Exception):
+    """Paramètres d'envoi ou bloc refusés (taille, somme de contrôle...)."""
+
+class IncompleteUpload(Exception):
+    """Fin d'envoi demandée alors que des blocs manquent."""
+
+    def __init__(self, missing: List[int]):
+        super().__init__(f"{len(missing)} bloc(s) manquant(s)")
+        self.missing = missing
+
+def chunk_checksum(algorithm: str, data: bytes) -> str:
+    if algorithm == 'sha256':
+        return hashlib.sha256(data).hexdigest()
+    return f"{zlib.crc32(data):08x}"
+
+def parse_checksum(value: Optional[str]) -> tuple:
+    """'sha256=<hex>' → ('sha256', '<hex>') ; lève UploadRejected si absente ou inconnue."""
+    algorithm, _, expected = (value or '').partition('=')
+    algorithm = algorithm.strip().lower()
+    if algorithm not in CHECKSUM_ALGORITHMS or not expected:
+        raise UploadRejected(f"Somme de contrôle du bloc absente ou inconnue ({', '.join(CHECKSUM_ALGORITHMS)})")
+    return algorithm, expected.strip().lower()
+
+class ResumableUploads:
+    """Sessions d'envoi par blocs, rangées dans le stockage des MDF à la fin."""
+
+    def __init__(self, store: UploadStore, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 max_size: int = DEFAULT_MAX_SIZE, ttl: int = SESSION_TTL):
+        self.store = store
+        self.folder = os.path.join(store.folder, SESSIONS_DIR)
+        self.chunk_size = chunk_size
+        self.max_size = max_size
+        self.ttl = ttl
+        self.sessions: Dict[str, Dict] = {}  # Sessions ouvertes depuis le démarrage
+        self.lock = threading.Lock()
+
+    def _dir(self, upload_id: str) -> str:
+        return os.path.join(self.folder, upload_id)
+
+    def _save_state(self, session: Dict):
+        """session.json remplacé atomiquement (verrou de la session tenu)."""
+        session['updated'] = time.time()
+        path = os.path.join(self._dir(session['id']), STATE_FILE)
+        state = {key: session[key] for key in PERSISTED}
+        with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(f"{path}.tmp", path)
+
+    def _session(self, upload_id: str) -> Dict:
+        """Session en mémoire, rechargée depuis le disque après un redémarrage."""
+        if not re.fullmatch(r'[0-9a-f]{32}', upload_id or ''):
+            raise UnknownUpload(upload_id)
+        with self.lock:
+            session = self.sessions.get(upload_id)
+            if session is None:
+                try:
+                    with open(os.path.join(self._dir(upload_id), STATE_FILE), 'r', encoding='utf-8') as f:
+                        session = json.load(f)
+                except (OSError, ValueError):
+                    raise UnknownUpload(upload_id)
+                session['received'] = {int(index): checksum for index, checksum in session['received'].items()}
+                session.update({'lock': threading.Lock(), 'digest': hashlib.sha256(), 'hashed': 0,
+                                'header': None})
+                self.sessions[upload_id] = session
+            return session
+
+    def create(self, filename: str, size: int, chunk_size: Optional[int] = None) -> Dict:
+        """Ouvre une session d'envoi pour un fichier de size octets."""
+        if size <= 0 or size > self.max_size:
+            raise UploadRejected(f"Taille invalide : {size} octets (maximum {self.max_size // 1024 ** 3} Go)")
+        chunk_size = min(max(chunk_size or self.chunk_size, MIN_CHUNK_SIZE), MAX_CHUNK_SIZE)
+        self.purge_stale()
+        os.makedirs(self.folder, exist_ok=True)
+        if shutil.disk_usage(self.folder).free < size:
+            raise UploadRejected("Espace disque insuffisant pour ce fichier")
+
+        upload_id = uuid.uuid4().hex
+        os.makedirs(self._dir(upload_id))
+        with open(os.path.join(self._dir(upload_id), DATA_FILE), 'wb') as f:
+            f.truncate(size)  # Fichier creux : chaque bloc écrit à son emplacement
+        now = time.time()
+        session = {
+            'id': upload_id,
+            'filename': filename,
+            'size': size,
+            'chunk_size': chunk_size,
+            'total_chunks': -(-size // chunk_size),
+            'received': {},
+            'created': now,
+            'updated': now,
+            'lock': threading.Lock(),
+            'digest': hashlib.sha256(),
+            'hashed': 0,  # Blocs contigus déjà pris dans l'empreinte
+            'header': None,
+        }
+        with session['lock']:
+            self._save_state(session)
+        with self.lock:
+            self.sessions[upload_id] = session
+        print(f"📤 Envoi par blocs ouvert : {filename} ({size / (1024 * 1024):.1f} Mo, "
+              f"{session['total_chunks']} blocs)")
+        return self.status(upload_id)
+
+    def status(self, upload_id: str) -> Dict:
+        """État public d'une session : blocs reçus, octets reçus."""
+        session = self._session(upload_id)
+        with session['lock']:
+            received = sorted(session['received'])
+            received_bytes = sum(self._chunk_length(session, index) for index in received)
+            return {
+                'upload_id': session['id'],
+                'filename': session['filename'],
+                'size': session['size'],
+                'chunk_size': session['chunk_size'],
+                'total_chunks': session['total_chunks'],
+                'received': received,
+                'received_bytes': received_bytes,
+            }
+
+    @staticmethod
+    def _chunk_length(session: Dict, index: int) -> int:
+        return min(session['chunk_size'], session['size'] - index * session['chunk_size'])
+
+    def _advance_hash(self, session: Dict, f: BinaryIO, index: int = -1, data: bytes = b''):
+        """Empreinte avancée sur les blocs contigus reçus depuis le début (verrou tenu)."""
+        while session['hashed'] in session['received']:
+            current = session['hashed']
+            if current == index:
+                session['digest'].update(data)
+            else:
+                # Bloc reçu plus tôt (désordre ou reprise après redémarrage) : relu
+                f.seek(current * session['chunk_size'])
+                remaining = self._chunk_length(session, current)
+                while remaining:
+                    block = f.read(min(READ_BLOCK, remaining))
+                    if not block:
+                        raise UploadRejected(f"Bloc {current} illisible")
+                    session['digest'].update(block)
+                    remaining -= len(block)
+            session['hashed'] += 1
+
+    def put_chunk(self, upload_id: str, index: int, stream: BinaryIO, checksum: Optional[str]) -> Dict:
+        """Écrit le bloc index (lu dans stream) après contrôle de sa taille et de sa somme."""
+        session = self._session(upload_id)
+        algorithm, expected = parse_checksum(checksum)
+        if not 0 <= index < session['total_chunks']:
+            raise UploadRejected(f"Bloc {index} hors du fichier ({session['total_chunks']} blocs)")
+        length = self._chunk_length(session, index)
+        data = stream.read(length + 1)
+        while len(data) < length:
+            more = stream.read(length + 1 - len(data))
+            if not more:
+                break
+            data += more
+        if len(data) != length:
+            raise UploadRejected(f"Bloc {index} : {len(data)} octets reçus, {length} attendus")
+        if chunk_checksum(algorithm, data) != expected:
+            raise UploadRejected(f"Bloc {index} corrompu (somme {algorithm} différente)")
+
+        if index == 0 and len(data) >= HEADER_SIZE:
+            # Début du fichier : un fichier qui n'est pas un MDF arrête l'envoi
+            try:
+                session['header'] = parse_header(data[:HEADER_SIZE])
+            except InvalidMDF:
+                self.abort(upload_id)
+                raise
+
+        with session['lock']:
+            if upload_id not in self.sessions:
+                raise UnknownUpload(upload_id)
+            with open(os.path.join(self._dir(upload_id), DATA_FILE), 'r+b') as f:
+                f.seek(index * session['chunk_size'])
+                f.write(data)
+                session['received'][index] = f"{algorithm}={expected}"
+                self._advance_hash(session, f, index, data)
+            self._save_state(session)
+        return self.status(upload_id)
+
+    def complete(self, upload_id: str) -> Dict:
+        """
+        Tous les blocs reçus : contrôles MDF, puis fichier rangé par
+        UploadStore.store (renvoie son résultat, nom d'origine compris).
+        """
+        session = self._session(upload_id)
+        with session['lock']:
+            missing = [index for index in range(session['total_chunks']) if index not in session['received']]
+            if missing:
+                raise IncompleteUpload(missing)
+            data_path = os.path.join(self._dir(upload_id), DATA_FILE)
+            with open(data_path, 'rb') as f:
+                self._advance_hash(session, f)
+                if session['header'] is None:
+                    f.seek(0)
+                    head = f.read(HEADER_SIZE)
+            try:
+                header = session['header'] or parse_header(head)
+                check_complete(header, session['size'])
+            except InvalidMDF:
+                self._remove(upload_id)
+                raise
+            stored = self.store.store(data_path, session['filename'], session['digest'].hexdigest(),
+                                      session['size'])
+            self._remove(upload_id)
+        return stored
+
+    def _remove(self, upload_id: str):
+        with self.lock:
+            self.sessions.pop(upload_id, None)
+        shutil.rmtree(self._dir(upload_id), ignore_errors=True)
+
+    def abort(self, upload_id: str):
+        """Abandon d'un envoi : session et blocs reçus supprimés."""
+        self._session(upload_id)
+        self._remove(upload_id)
+
+    def purge_stale(self):
+        """Supprime les sessions sans nouveau bloc depuis plus de ttl secondes."""
+        if not os.path.isdir(self.folder):
+            return
+        limit = time.time() - self.ttl
+        for upload_id in os.listdir(self.folder):
+            state_path = os.path.join(self._dir(upload_id), STATE_FILE)
+            try:
+                stale = os.path.getmtime(state_path) < limit
+            except OSError:
+                stale = os.path.getmtime(self._dir(upload_id)) < limit
+            if stale:
+                print(f"🧹 Envoi abandonné supprimé : {upload_id}")
+                self._remove(upload_id)
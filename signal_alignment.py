@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+ALIGNEMENT TEMPOREL MULTI-SIGNAUX
+=================================
+Les signaux d'un UC viennent de trames CAN différentes (périodes et
+instants différents). Pour évaluer B_UC_DET instant par instant, ils sont
+ramenés sur une base de temps commune :
+
+- Mode 'edges' : union des instants de changement de tous les signaux
+  (base minimale exacte pour des états)
+- Mode 'raster' : grille régulière de pas fixe (secondes)
+
+Chaque signal est échantillonné par blocage d'ordre zéro (dernière valeur
+connue, np.searchsorted). Le résultat est UNE matrice 2-D contiguë
+(instants × signaux) et un masque de validité de même forme : une
+expression booléenne sur 17 signaux est alors une seule opération numpy.
+Les signaux énumérés (texte / octets) sont codés par le rang de leur état.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from signal_edges import change_indices
+
+ALIGNMENT_MODES = ('edges', 'raster')
+DEFAULT_RASTER = 0.1  # Pas de la grille régulière (s)
+
+def edge_times(timestamps: np.ndarray, samples: np.ndarray) -> np.ndarray:
+    """Premier instant et instants de changement d'un signal."""
+    if len(timestamps) == 0:
+        return np.array([], dtype=np.float64)
+    return np.concatenate((timestamps[:1], timestamps[change_indices(samples)]))
+
+def time_base(signals: Dict[str, Tuple[np.ndarray, np.ndarray]], mode: str = 'edges',
+              raster: Optional[float] = None) -> np.ndarray:
+    """Base de temps commune aux signaux (union des fronts ou grille régulière)."""
+    if mode not in ALIGNMENT_MODES:
+        raise ValueError(f"Mode d'alignement inconnu : {mode}")
+    spans = [(timestamps[0], timestamps[-1]) for timestamps, _ in signals.values() if len(timestamps)]
+    if not spans:
+        return np.array([], dtype=np.float64)
+
+    if mode == 'raster':
+        if not raster or raster <= 0:
+            raise ValueError("Le mode 'raster' demande un pas strictement positif")
+        t_start = min(span[0] for span in spans)
+        t_end = max(span[1] for span in spans)
+        return t_start + raster * np.arange(int(np.floor((t_end - t_start) / raster)) + 1)
+
+    times = [edge_times(np.asarray(timestamps, dtype=np.float64), np.asarray(samples))
+             for timestamps, samples in signals.values()]
+    # Fin d'acquisition de chaque signal : l'état final reste représenté
+    times.append(np.array([span[1] for span in spans], dtype=np.float64))
+    return np.unique(np.concatenate(times))
+
+def encode_states(samples: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """Valeurs numériques d'un signal ; un énuméré est codé par le rang de son état."""
+    samples = np.asarray(samples)
+    if samples.dtype.kind in 'biuf':
+        return samples.astype(np.float64, copy=False), None
+    states, codes = np.unique(samples, return_inverse=True)
+    return codes.reshape(-1).astype(np.float64), states
+
+def zero_order_hold(timestamps: np.ndarray, values: np.ndarray,
+                    base: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Valeur du signal à chaque instant de la base (dernière valeur connue).
+
+    Un instant est invalide avant le premier échantillon ou après le
+    dernier (pas d'extrapolation au-delà de l'acquisition du signal).
+    """
+    positions = np.searchsorted(timestamps, base, side='right') - 1
+    valid = (positions >= 0) & (base <= timestamps[-1])
+    return values[np.clip(positions, 0, len(values) - 1)], valid
+
+def align_signals(signals: Dict[str, Tuple[np.ndarray, np.ndarray]], mode: str = 'edges',
+                  raster: Optional[float] = None) -> Dict:
+    """
+    Aligne des signaux (nom → (timestamps, samples)) sur une base commune.
+
+    Renvoie :
+    - 'time'   : base de temps (n,)
+    - 'names'  : ordre des colonnes
+    - 'values' : matrice float64 contiguë (n, nb signaux), NaN si invalide
+    - 'valid'  : masque de validité (n, nb signaux)
+    - 'states' : nom → états d'un signal énuméré (valeur = rang dans ce tableau)
+    """
+    signals = {name: (np.asarray(timestamps, dtype=np.float64), samples)
+               for name, (timestamps, samples) in signals.items()
+               if len(timestamps) and np.asarray(samples).ndim == 1}
+    names = list(signals)
+    base = time_base(signals, mode, raster)
+
+    values = np.full((len(base), len(names)), np.nan, dtype=np.float64)
+    valid = np.zeros((len(base), len(names)), dtype=bool)
+    states = {}
+    for column, name in enumerate(names):
+        timestamps, samples = signals[name]
+        encoded, signal_states = encode_states(samples)
+        if signal_states is not None:
+            states[name] = signal_states
+        column_values, column_valid = zero_order_hold(timestamps, encoded, base)
+        values[:, column] = np.where(column_valid, column_values, np.nan)
+        valid[:, column] = column_valid
+
+    return {'time': base, 'names': names, 'values': values, 'valid': valid, 'states': states}
+
+def columns(aligned: Dict, names: Sequence[str]) -> List[int]:
+    """Indices de colonnes des signaux demandés (les absents sont ignorés)."""
+    positions = {name: column for column, name in enumerate(aligned['names'])}
+    return [positions[name] for name in names if name in positions]
+
+def all_valid(aligned: Dict, names: Sequence[str]) -> np.ndarray:
+    """ET logique, instant par instant, de la validité des signaux demandés."""
+    selected = columns(aligned, names)
+    if not selected:
+        return np.zeros(len(aligned['time']), dtype=bool)
+    return aligned['valid'][:, selected].all(axis=1)
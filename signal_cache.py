@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+CACHE MÉMOIRE DES DONNÉES DE SIGNAUX
+====================================
+Cache des tableaux lus dans le MDF, indexé par CANAL MDF RÉSOLU : deux
+noms (EVA/SWEET, alias) qui pointent vers le même canal partagent une
+seule entrée.
+
+- Taille comptée en octets (nbytes des tableaux numpy de l'entrée)
+- Éviction LRU au-delà du budget configurable
+- Compteurs succès/échecs/évictions
+"""
+
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import numpy as np
+
+DEFAULT_MAX_MB = 512
+
+def entry_nbytes(entry: Dict) -> int:
+    """Taille en octets des tableaux numpy d'une entrée."""
+    return sum(value.nbytes for value in entry.values() if isinstance(value, np.ndarray))
+
+class SignalCache:
+    """Cache LRU des données de signaux, borné en octets."""
+
+    def __init__(self, max_mb: float = DEFAULT_MAX_MB):
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.entries: 'OrderedDict[str, Dict]' = OrderedDict()
+        self.sizes: Dict[str, int] = {}
+        self.total_bytes = 0
+
+        # Compteurs
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, channel: str) -> bool:
+        return channel in self.entries
+
+    def get(self, channel: str) -> Optional[Dict]:
+        """Données du canal si présentes (l'entrée devient la plus récente)."""
+        entry = self.entries.get(channel)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(channel)
+        self.hits += 1
+        return entry
+
+    def put(self, channel: str, entry: Dict):
+        """Ajoute les données d'un canal puis évince les plus anciennes au-delà du budget."""
+        size = entry_nbytes(entry)
+        if channel in self.entries:
+            self._remove(channel)
+        if size > self.max_bytes:
+            # Plus gros que tout le budget : non mis en cache
+            return
+        self.entries[channel] = entry
+        self.sizes[channel] = size
+        self.total_bytes += size
+        while self.total_bytes > self.max_bytes:
+            oldest = next(iter(self.entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def clear(self):
+        self.entries.clear()
+        self.sizes.clear()
+        self.total_bytes = 0
+
+    def _remove(self, channel: str):
+        del self.entries[channel]
+        self.total_bytes -= self.sizes.pop(channel)
+
+    def summary(self) -> str:
+        """Résumé pour la fin d'exécution."""
+        return (f"Cache signaux : {self.hits} succès / {self.misses} échecs / "
+                f"{self.evictions} évictions ({len(self)} canaux, "
+                f"{self.total_bytes / (1024 * 1024):.1f} / {self.max_bytes / (1024 * 1024):.1f} Mo)")
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+RÉDUCTION DES SIGNAUX POUR L'AFFICHAGE
+======================================
+Un graphique de L pixels de large ne peut pas montrer plus de ~2 × L
+points utiles. Prendre un échantillon sur N (timestamps[::step]) fait
+disparaître les pics courts (glitch de relais, pic de courant), qui sont
+justement les défauts recherchés.
+
+Méthodes (une passe numpy, aucune boucle Python sur les échantillons) :
+- 'minmax' : le signal est découpé en paquets consécutifs (un par pixel) ;
+  de chaque paquet on garde le minimum et le maximum, dans leur ordre
+  temporel. Tout pic reste visible.
+- 'lttb'   : Largest-Triangle-Three-Buckets, un point par paquet choisi
+  pour préserver la forme visuelle (boucle sur les paquets seulement).
+
+Les signaux énumérés (texte / octets) ne sont pas réduits par valeur :
+on garde les instants de changement d'état (et l'état précédent), ce qui
+conserve exactement le tracé en escalier.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+from signal_edges import change_indices
+
+DOWNSAMPLING_METHODS = ('minmax', 'lttb')
+DEFAULT_DOWNSAMPLING = 'minmax'
+
+def _dedupe(indices: np.ndarray) -> np.ndarray:
+    """Indices triés sans doublons consécutifs."""
+    if len(indices) < 2:
+        return indices
+    return indices[np.concatenate(([True], np.diff(indices) != 0))]
+
+def state_changes(timestamps: np.ndarray, samples: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Points d'un signal énuméré : extrémités et changements d'état (escalier)."""
+    changes = change_indices(samples)
+    keep = np.sort(np.concatenate(([0], changes - 1, changes, [len(samples) - 1])))
+    keep = _dedupe(keep)
+    return timestamps[keep], samples[keep]
+
+def minmax_envelope(timestamps: np.ndarray, samples: np.ndarray, buckets: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Enveloppe min/max : au plus 2 points par paquet (+ extrémités).
+
+    Les paquets ont le même nombre d'échantillons (période d'acquisition
+    d'un canal quasi constante : un paquet ≈ un pixel).
+    """
+    n = len(samples)
+    if buckets < 1 or n <= 2 * buckets:
+        return timestamps, samples
+
+    size = -(-n // buckets)
+    buckets = -(-n // size)
+    padding = buckets * size - n
+    values = samples.astype(np.float64, copy=False)
+    nan = np.isnan(values)
+
+    # NaN ignorés : +inf pour le minimum, -inf pour le maximum
+    low = np.pad(np.where(nan, np.inf, values), (0, padding), mode='edge').reshape(buckets, size)
+    high = np.pad(np.where(nan, -np.inf, values), (0, padding), mode='edge').reshape(buckets, size)
+    offsets = np.arange(buckets) * size
+    i_min = np.minimum(low.argmin(axis=1) + offsets, n - 1)
+    i_max = np.minimum(high.argmax(axis=1) + offsets, n - 1)
+
+    # Min et max de chaque paquet dans leur ordre temporel
+    pairs = np.column_stack((np.minimum(i_min, i_max), np.maximum(i_min, i_max))).ravel()
+    keep = _dedupe(np.concatenate(([0], pairs, [n - 1])))
+    return timestamps[keep], samples[keep]
+
+def lttb(timestamps: np.ndarray, samples: np.ndarray, points: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Largest-Triangle-Three-Buckets : points représentatifs de la forme du signal."""
+    n = len(samples)
+    if points < 3 or n <= points:
+        return timestamps, samples
+
+    x = timestamps.astype(np.float64, copy=False)
+    y = np.nan_to_num(samples.astype(np.float64, copy=False))
+
+    # points - 2 paquets entre le premier et le dernier échantillon
+    edges = np.linspace(1, n - 1, points - 1).astype(np.int64)
+    sums_x = np.add.reduceat(x[:n - 1], edges[:-1])
+    sums_y = np.add.reduceat(y[:n - 1], edges[:-1])
+    counts = np.diff(edges)
+    # Centre de chaque paquet ; après le dernier paquet : dernier échantillon
+    centers_x = np.append(sums_x / counts, x[-1])
+    centers_y = np.append(sums_y / counts, y[-1])
+
+    selected = np.empty(points, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(points - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        # Aire du triangle (point retenu précédent, candidat, centre du paquet suivant)
+        areas = np.abs((x[previous] - centers_x[bucket + 1]) * (y[start:end] - y[previous])
+                       - (x[previous] - x[start:end]) * (centers_y[bucket + 1] - y[previous]))
+        previous = start + int(areas.argmax())
+        selected[bucket + 1] = previous
+    return timestamps[selected], samples[selected]
+
+def downsample(timestamps, samples, points: int,
+               method: str = DEFAULT_DOWNSAMPLING) -> Tuple[np.ndarray, np.ndarray]:
+    """Réduit un signal à ~points points pour l'affichage (voir méthodes ci-dessus)."""
+    if method not in DOWNSAMPLING_METHODS:
+        raise ValueError(f"Méthode de réduction inconnue : {method}")
+    timestamps = np.asarray(timestamps)
+    samples = np.asarray(samples)
+    if samples.ndim != 1 or len(samples) <= points:
+        return timestamps, samples
+    if samples.dtype.kind not in 'biuf':
+        return state_changes(timestamps, samples)
+    if method == 'lttb':
+        return lttb(timestamps, samples, points)
+    return minmax_envelope(timestamps, samples, points // 2)
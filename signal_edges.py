@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+DÉTECTION VECTORISÉE DES FRONTS
+===============================
+Changements d'état, fronts montants et descendants d'un signal calculés
+par numpy (comparaison des échantillons décalés d'un pas) au lieu d'une
+boucle Python échantillon par échantillon.
+
+Fonctionne pour les signaux :
+- Numériques et booléens (NaN consécutifs = pas de changement)
+- Énumérés texte ou octets (b'ON', 'Sleep'...) : le sens d'un front suit
+  l'ordre des états fourni (order), sinon l'ordre alphabétique des états
+"""
+
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+def _is_numeric(samples: np.ndarray) -> bool:
+    return samples.dtype.kind in 'biuf'
+
+def _state_codes(samples: np.ndarray, order: Optional[Sequence] = None) -> np.ndarray:
+    """Rang de chaque échantillon d'un signal énuméré (texte / octets)."""
+    states, codes = np.unique(samples, return_inverse=True)
+    codes = codes.reshape(-1)
+    if order is None:
+        return codes
+    ranks = {state: rank for rank, state in enumerate(order)}
+    # Rang des états DISTINCTS seulement, propagé aux échantillons par leurs codes
+    # (états inconnus : après tous les états connus)
+    state_ranks = np.array([ranks.get(state, len(ranks)) for state in states.tolist()], dtype=np.int64)
+    return state_ranks[codes]
+
+def change_indices(samples) -> np.ndarray:
+    """Indices i tels que samples[i] != samples[i-1]."""
+    samples = np.asarray(samples)
+    if len(samples) < 2:
+        return np.array([], dtype=np.int64)
+    previous, current = samples[:-1], samples[1:]
+    changed = current != previous
+    if samples.dtype.kind == 'f':
+        changed &= ~(np.isnan(current) & np.isnan(previous))
+    if changed.ndim > 1:
+        changed = changed.reshape(len(changed), -1).any(axis=1)
+    return np.flatnonzero(changed) + 1
+
+def detect_edges(samples, timestamps=None, order: Optional[Sequence] = None) -> Dict[str, np.ndarray]:
+    """
+    Changements d'état et fronts d'un signal.
+
+    Renvoie les indices ('changes', 'rising', 'falling') et, si les
+    timestamps sont fournis, les instants correspondants ('change_times',
+    'rising_times', 'falling_times'). Un front est montant quand la valeur
+    (ou le rang de l'état pour un signal énuméré) augmente.
+    """
+    samples = np.asarray(samples)
+    changes = change_indices(samples)
+
+    if samples.ndim > 1 or len(changes) == 0:
+        rising = falling = np.array([], dtype=np.int64)
+    else:
+        values = samples if _is_numeric(samples) and order is None else _state_codes(samples, order)
+        step = values[changes].astype(np.float64) - values[changes - 1].astype(np.float64)
+        rising = changes[step > 0]
+        falling = changes[step < 0]
+
+    edges = {'changes': changes, 'rising': rising, 'falling': falling}
+    if timestamps is not None:
+        timestamps = np.asarray(timestamps)
+        edges['change_times'] = timestamps[changes]
+        edges['rising_times'] = timestamps[rising]
+        edges['falling_times'] = timestamps[falling]
+    return edges
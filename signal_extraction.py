@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+EXTRACTION GROUPÉE DES SIGNAUX MDF
+==================================
+Au lieu d'appeler MDF.get() canal par canal (chaque appel relit le
+groupe de données du canal), tous les canaux nécessaires au rapport sont
+d'abord résolus puis lus en UNE passe MDF.select() : chaque bloc de
+données n'est décodé qu'une seule fois.
+"""
+
+from typing import Dict, Iterable, Optional, Tuple
+
+def locate_channel(mdf_data, channel: str) -> Optional[Tuple[str, int, int]]:
+    """Première occurrence (nom, groupe, index) d'un canal dans channels_db."""
+    occurrences = mdf_data.channels_db.get(channel)
+    if not occurrences:
+        return None
+    group, index = occurrences[0]
+    return channel, group, index
+
+def read_signal(mdf_data, channel: str):
+    """Lit un seul canal (première occurrence si le nom est ambigu)."""
+    location = locate_channel(mdf_data, channel)
+    if location is None:
+        return None
+    try:
+        if len(mdf_data.channels_db[channel]) > 1:
+            return mdf_data.get(channel, group=location[1], index=location[2])
+        return mdf_data.get(channel)
+    except Exception:
+        return None
+
+def extract_signals(mdf_data, channels: Iterable[str]) -> Dict[str, object]:
+    """Lit tous les canaux demandés en une seule passe groupée.
+
+    Renvoie un dictionnaire canal → Signal (les canaux absents sont ignorés).
+    """
+    requests = []
+    for channel in dict.fromkeys(channels):
+        location = locate_channel(mdf_data, channel) if channel else None
+        if location is not None:
+            requests.append(location)
+
+    if not requests:
+        return {}
+
+    try:
+        signals = mdf_data.select(requests)
+        return {request[0]: signal for request, signal in zip(requests, signals)}
+    except Exception as e:
+        # Repli : lecture canal par canal
+        print(f"⚠️ Extraction groupée impossible ({e}), lecture canal par canal")
+        extracted = {}
+        for channel, _, _ in requests:
+            signal = read_signal(mdf_data, channel)
+            if signal is not None:
+                extracted[channel] = signal
+        return extracted
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+ALGÈBRE D'INTERVALLES POUR LES OCCURRENCES UC
+=============================================
+Un ensemble d'intervalles est un tableau numpy (k, 2) de [début, fin)
+triés, disjoints et non vides (un intervalle vide [t, t) ne couvre
+aucun instant : toutes les opérations le suppriment). Toutes les
+opérations sont vectorisées (aucune boucle Python sur les échantillons
+ni sur les intervalles) :
+
+- from_mask : série booléenne → intervalles (O(n))
+- union / intersection / difference : balayage des bornes (O(k log k))
+- merge_gaps : fusion des intervalles séparés d'un trou court (anti-rebond)
+- min_duration : suppression des intervalles trop courts
+
+TSTART / TEND / Durée des occurrences en découlent directement.
+"""
+
+from typing import Iterable
+
+import numpy as np
+
+def empty() -> np.ndarray:
+    return np.empty((0, 2), dtype=np.float64)
+
+def as_intervals(intervals) -> np.ndarray:
+    """Tableau (k, 2) float64 à partir d'une liste de couples."""
+    array = np.asarray(intervals, dtype=np.float64)
+    return array.reshape(-1, 2) if array.size else empty()
+
+def from_mask(time: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """
+    Intervalles [début, fin) où la série booléenne est vraie.
+
+    La fin est l'instant du premier échantillon faux ; si la série finit
+    à vrai, c'est le dernier instant.
+    """
+    time = np.asarray(time, dtype=np.float64)
+    mask = np.asarray(mask, dtype=bool)
+    if not len(mask):
+        return empty()
+    padded = np.concatenate(([False], mask, [False])).astype(np.int8)
+    steps = np.diff(padded)
+    starts = np.flatnonzero(steps == 1)
+    ends = np.flatnonzero(steps == -1)
+    end_times = time[np.minimum(ends, len(time) - 1)]
+    # Vrai sur le seul dernier échantillon : intervalle vide, supprimé
+    keep = end_times > time[starts]
+    return np.column_stack((time[starts][keep], end_times[keep]))
+
+def to_mask(time: np.ndarray, intervals) -> np.ndarray:
+    """Série booléenne : instant contenu dans l'un des intervalles."""
+    intervals = normalize(intervals)
+    if not len(intervals):
+        return np.zeros(len(time), dtype=bool)
+    positions = np.searchsorted(intervals[:, 0], time, side='right') - 1
+    inside = positions >= 0
+    inside[inside] = time[inside] < intervals[positions[inside], 1]
+    return inside
+
+def normalize(intervals) -> np.ndarray:
+    """Supprime les intervalles vides, trie et fusionne ceux qui se chevauchent ou se touchent."""
+    intervals = as_intervals(intervals)
+    intervals = intervals[intervals[:, 1] > intervals[:, 0]]
+    if len(intervals) < 2:
+        return intervals
+    intervals = intervals[np.argsort(intervals[:, 0], kind='stable')]
+    reach = np.maximum.accumulate(intervals[:, 1])
+    # Nouveau groupe quand le début dépasse toutes les fins précédentes
+    new_group = np.concatenate(([True], intervals[1:, 0] > reach[:-1]))
+    group_starts = np.flatnonzero(new_group)
+    group_ends = np.append(group_starts[1:], len(intervals)) - 1
+    return np.column_stack((intervals[group_starts, 0], reach[group_ends]))
+
+def _sweep(sets: Iterable[np.ndarray], weights: Iterable[int], keep) -> np.ndarray:
+    """Balayage des bornes : garde les plages où la couverture pondérée vérifie keep."""
+    bounds, deltas = [], []
+    for intervals, weight in zip(sets, weights):
+        intervals = normalize(intervals)
+        bounds += [intervals[:, 0], intervals[:, 1]]
+        deltas += [np.full(len(intervals), weight), np.full(len(intervals), -weight)]
+    bounds = np.concatenate(bounds) if bounds else np.array([])
+    if not len(bounds):
+        return empty()
+    deltas = np.concatenate(deltas)
+
+    # Au même instant, les fins sont traitées avant les débuts ([début, fin))
+    order = np.lexsort((deltas > 0, bounds))
+    bounds, coverage = bounds[order], np.cumsum(deltas[order])
+    segments = np.column_stack((bounds[:-1], bounds[1:]))
+    return normalize(segments[keep(coverage[:-1])])
+
+def union(*sets) -> np.ndarray:
+    """Union de plusieurs ensembles d'intervalles."""
+    return normalize(np.concatenate([as_intervals(intervals) for intervals in sets])) if sets else empty()
+
+def intersection(first, second) -> np.ndarray:
+    """Intersection de deux ensembles d'intervalles."""
+    return _sweep((first, second), (1, 1), lambda coverage: coverage == 2)
+
+def difference(first, second) -> np.ndarray:
+    """Parties de first non couvertes par second."""
+    return _sweep((first, second), (1, 2), lambda coverage: coverage == 1)
+
+def merge_gaps(intervals, max_gap: float) -> np.ndarray:
+    """Fusionne les intervalles séparés d'au plus max_gap secondes (anti-rebond)."""
+    intervals = normalize(intervals)
+    if len(intervals) < 2 or max_gap <= 0:
+        return intervals
+    new_group = np.concatenate(([True], intervals[1:, 0] - intervals[:-1, 1] > max_gap))
+    group_starts = np.flatnonzero(new_group)
+    group_ends = np.append(group_starts[1:], len(intervals)) - 1
+    return np.column_stack((intervals[group_starts, 0], intervals[group_ends, 1]))
+
+def min_duration(intervals, duration: float) -> np.ndarray:
+    """Supprime les intervalles plus courts que duration secondes."""
+    intervals = normalize(intervals)
+    return intervals[durations(intervals) >= duration]
+
+def durations(intervals) -> np.ndarray:
+    intervals = as_intervals(intervals)
+    return intervals[:, 1] - intervals[:, 0]
+
+def occurrences(intervals, max_gap: float = 0.0, shortest: float = 0.0) -> np.ndarray:
+    """Occurrences finales : anti-rebond puis filtre de durée minimale."""
+    return min_duration(merge_gaps(intervals, max_gap), shortest)
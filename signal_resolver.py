@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+RÉSOLUTION DES NOMS DE SIGNAUX
+==============================
+Moteur unique de mapping nom demandé → canal MDF utilisé par les trois
+générateurs, selon l'algorithme de tina/README_UC_FRAMEWORK.md :
+Exacte → Normalisée → Alias → Partielle
+
+Chaque générateur garde son propre enchaînement de niveaux (stratégie)
+pour conserver exactement ses résultats historiques. Les recherches
+s'appuient sur un ChannelIndex construit une seule fois, et un lot de
+noms peut être résolu en un seul appel avec le niveau de correspondance
+de chaque nom (diagnostic).
+
+Avec un ResolutionCache, les résolutions d'une liste de canaux déjà vue
+sont rechargées depuis le disque : l'index n'est alors même pas construit.
+"""
+
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+from channel_index import ChannelIndex, normalize_signal_name
+from resolution_cache import ResolutionCache, framework_version
+
+# Mots clés importants pour la recherche partielle (générateur template exact)
+PARTIAL_KEYWORDS = ['voltage', 'current', 'speed', 'torque', 'power', 'temp',
+                    'soc', 'fault', 'relay', 'charge', 'battery', 'motor']
+
+# Alias connus (suffixes/préfixes BLMS/HEVC/CAN du README)
+ALIAS_SUFFIXES = ['_BLMS', '_HEVC', '_CAN', '_BMS', '_HV']
+ALIAS_PREFIXES = ['BMS_', 'HEVC_', 'CAN_', 'HV_']
+
+# Niveaux de recherche de chaque générateur, dans l'ordre de priorité
+STRATEGIES = {
+    'exact_template': ['exact', 'normalized', 'keyword', 'prefix'],
+    'real_data': ['exact', 'normalized', 'partial_both'],
+    'framework': ['exact', 'normalized', 'alias', 'partial'],
+}
+
+# Niveaux sans approximation (communs à toutes les stratégies, en tête)
+STRICT_TIERS = ('exact', 'normalized')
+
+# Libellés des niveaux pour les rapports
+TIER_LABELS = {
+    'exact': 'Exacte',
+    'normalized': 'Normalisée',
+    'keyword': 'Mot-clé',
+    'prefix': 'Similarité',
+    'alias': 'Alias',
+    'partial': 'Partielle',
+    None: 'Non trouvé',
+}
+
+class SignalResolver:
+    """Résout des noms de signaux vers les canaux MDF avec un index prébâti."""
+
+    def __init__(self, channels: Iterable[str], strategy: str = 'framework',
+                 cache: Optional[ResolutionCache] = None, version: Optional[str] = None):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Stratégie de résolution inconnue : {strategy}")
+        self.strategy = strategy
+        self.tiers = STRATEGIES[strategy]
+        self.channels: List[str] = list(channels)
+        self._index: Optional[ChannelIndex] = None
+
+        # Résultats déjà calculés : nom → {'channel', 'tier'}
+        self.resolutions: Dict[str, Dict] = {}
+        self._new_resolutions = 0
+
+        # Résolutions d'une liste de canaux identique déjà rencontrée
+        self.cache = cache
+        self.cache_key = None
+        if cache is not None:
+            self.cache_key = cache.fingerprint(self.channels, strategy, version or framework_version())
+            cached = cache.load(self.cache_key)
+            if cached:
+                self.resolutions.update(cached)
+
+    @property
+    def index(self) -> ChannelIndex:
+        """Index des canaux (construit à la première recherche réelle)."""
+        if self._index is None:
+            keywords = PARTIAL_KEYWORDS if 'keyword' in self.tiers else ()
+            self._index = ChannelIndex(self.channels, keywords)
+        return self._index
+
+    def save_cache(self):
+        """Enregistre les nouvelles résolutions dans le cache disque."""
+        if self.cache is not None and self._new_resolutions:
+            self.cache.store(self.cache_key, self.resolutions)
+            self._new_resolutions = 0
+
+    def resolve(self, name: str) -> Optional[str]:
+        """Renvoie le canal MDF correspondant au nom, ou None."""
+        return self.resolve_match(name)['channel']
+
+    def resolve_match(self, name: str) -> Dict:
+        """Renvoie {'channel', 'tier'} pour le nom (avec mémorisation)."""
+        match = self.resolutions.get(name)
+        if match is None:
+            match = self._search(name)
+            self.resolutions[name] = match
+            self._new_resolutions += 1
+        return match
+
+    def resolve_strict(self, name: str) -> Optional[str]:
+        """Canal MDF trouvé par correspondance exacte ou normalisée uniquement."""
+        match = self.resolve_match(name)
+        return match['channel'] if match['tier'] in STRICT_TIERS else None
+
+    def resolve_batch(self, names: Iterable[str]) -> Dict[str, Dict]:
+        """Résout un lot de noms en un appel : nom → {'channel', 'tier'}."""
+        return {name: self.resolve_match(name) for name in names}
+
+    @staticmethod
+    def tier_counts(matches: Dict[str, Dict]) -> Dict[Optional[str], int]:
+        """Nombre de correspondances par niveau (None = non trouvé)."""
+        return dict(Counter(match['tier'] for match in matches.values()))
+
+    @staticmethod
+    def format_tier_counts(matches: Dict[str, Dict]) -> str:
+        """Résumé lisible des niveaux de correspondance d'un lot."""
+        counts = SignalResolver.tier_counts(matches)
+        return ', '.join(f"{label}: {counts[tier]}" for tier, label in TIER_LABELS.items() if tier in counts)
+
+    def _search(self, name: str) -> Dict:
+        """Applique les niveaux de la stratégie dans l'ordre."""
+        if name and self.channels:
+            for tier in self.tiers:
+                channel = getattr(self, f'_tier_{tier}')(name)
+                if channel is not None:
+                    return {'channel': channel, 'tier': 'partial' if tier == 'partial_both' else tier}
+        return {'channel': None, 'tier': None}
+
+    def _channel(self, pos: Optional[int]) -> Optional[str]:
+        return self.channels[pos] if pos is not None else None
+
+    @staticmethod
+    def _first(*positions: Optional[int]) -> Optional[int]:
+        """Plus petite position trouvée (premier canal dans l'ordre du MDF)."""
+        found = [pos for pos in positions if pos is not None]
+        return min(found) if found else None
+
+    # ------------------------------------------------------------------
+    # Niveaux de recherche
+    # ------------------------------------------------------------------
+
+    def _tier_exact(self, name: str) -> Optional[str]:
+        return name if self.index.get_exact(name) is not None else None
+
+    def _tier_normalized(self, name: str) -> Optional[str]:
+        return self._channel(self.index.get_normalized(name))
+
+    def _tier_keyword(self, name: str) -> Optional[str]:
+        # Canaux contenant un mot clé du nom ET une autre partie du nom
+        name_lower = name.lower()
+        parts = name_lower.split('_')
+        for keyword in PARTIAL_KEYWORDS:
+            if keyword in name_lower:
+                pos = self.index.first_with_keyword_and_part(keyword, parts)
+                if pos is not None:
+                    return self.channels[pos]
+        return None
+
+    def _tier_prefix(self, name: str) -> Optional[str]:
+        # Au moins 50% du nom correspond, dans un sens ou dans l'autre
+        name_lower = name.lower()
+        return self._channel(self._first(
+            self.index.first_containing(name_lower[:len(name)//2]),
+            self.index.first_half_prefix_in(name_lower),
+        ))
+
+    def _tier_alias(self, name: str) -> Optional[str]:
+        candidates: List[str] = [name + suffix for suffix in ALIAS_SUFFIXES]
+        candidates += [prefix + name for prefix in ALIAS_PREFIXES]
+        for candidate in candidates:
+            if self.index.get_exact(candidate) is not None:
+                return candidate
+            channel = self._channel(self.index.get_normalized(candidate))
+            if channel is not None:
+                return channel
+        return None
+
+    def _tier_partial(self, name: str) -> Optional[str]:
+        # Nom normalisé inclus dans le nom normalisé du canal
+        return self._channel(self.index.first_containing_normalized(normalize_signal_name(name)))
+
+    def _tier_partial_both(self, name: str) -> Optional[str]:
+        # Inclusion en minuscules dans un sens ou dans l'autre
+        name_lower = name.lower()
+        return self._channel(self._first(
+            self.index.first_containing(name_lower),
+            self.index.first_contained_in(name_lower),
+        ))
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+CACHE SIDECAR DES SIGNAUX MDF
+=============================
+Relancer un rapport sur le même MDF (autre --sweet / --myfx) redécodait
+tous les canaux avec asammdf. Avec le sidecar, les canaux lus par le
+rapport sont enregistrés au format colonne numpy (un fichier .npy par
+tableau) dans un dossier propre au CONTENU du MDF :
+
+    eva_cache/sidecar/<sha256 du MDF>/manifest.json + *.npy
+
+Les exécutions suivantes ouvrent ces fichiers en memory-map
+(np.load(mmap_mode='r')) : aucun décodage MDF pour ces canaux.
+
+Invalidation :
+- Clé = SHA-256 du contenu du MDF : un fichier modifié a une autre clé
+- L'empreinte est mémorisée avec la taille et la date de modification du
+  fichier : elle n'est recalculée que si l'une des deux change
+- Un manifeste d'une autre version de format est ignoré et réécrit
+- Au-delà de DEFAULT_MAX_ENTRIES MDF, les sidecars les moins récemment
+  utilisés sont supprimés, ainsi que leurs entrées de l'index
+- Les tableaux sont écrits dans un fichier temporaire puis renommés : un
+  run interrompu ne laisse pas de .npy tronqué
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+from collections import namedtuple
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from signal_extraction import extract_signals
+
+DEFAULT_SIDECAR_DIR = os.path.join('eva_cache', 'sidecar')
+DEFAULT_MAX_ENTRIES = 16
+SIDECAR_FORMAT_VERSION = 1
+INDEX_FILENAME = 'index.json'
+MANIFEST_FILENAME = 'manifest.json'
+HASH_BLOCK_SIZE = 8 * 1024 * 1024
+
+# Signal relu depuis le sidecar (mêmes attributs utilisés que asammdf.Signal)
+SidecarSignal = namedtuple('SidecarSignal', ['name', 'samples', 'timestamps'])
+
+_lock = threading.Lock()
+
+def file_sha256(path: str) -> str:
+    """Empreinte SHA-256 du contenu d'un fichier (lu par blocs)."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+class SignalSidecar:
+    """Sidecar colonne (npy) des canaux d'un fichier MDF."""
+
+    def __init__(self, mdf_path: str, cache_dir: str = DEFAULT_SIDECAR_DIR,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.mdf_path = os.path.abspath(mdf_path)
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.key = self.content_key()
+        self.directory = os.path.join(cache_dir, self.key)
+        self.manifest = self._read_manifest()
+
+        # Compteurs de la session
+        self.loaded = 0
+        self.stored = 0
+
+    # ------------------------------------------------------------------
+    # Clé de contenu
+    # ------------------------------------------------------------------
+
+    def content_key(self) -> str:
+        """SHA-256 du MDF, recalculé seulement si taille ou date ont changé."""
+        stat = os.stat(self.mdf_path)
+        index = self._read_json(os.path.join(self.cache_dir, INDEX_FILENAME)) or {}
+        known = index.get(self.mdf_path)
+        if known and known.get('size') == stat.st_size and known.get('mtime_ns') == stat.st_mtime_ns:
+            return known['sha256']
+
+        print(f"🔐 Empreinte du MDF ({stat.st_size / (1024 * 1024):.0f} Mo)...")
+        sha256 = file_sha256(self.mdf_path)
+        with _lock:
+            index = self._read_json(os.path.join(self.cache_dir, INDEX_FILENAME)) or {}
+            index[self.mdf_path] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': sha256}
+            self._write_json(os.path.join(self.cache_dir, INDEX_FILENAME), index)
+        return sha256
+
+    # ------------------------------------------------------------------
+    # Lecture / écriture
+    # ------------------------------------------------------------------
+
+    @property
+    def channels(self) -> List[str]:
+        """Canaux disponibles dans le sidecar."""
+        return list(self.manifest['channels'])
+
+    def load(self, channels: Iterable[str]) -> Dict[str, SidecarSignal]:
+        """Canaux présents dans le sidecar, ouverts en memory-map."""
+        signals = {}
+        for channel in channels:
+            entry = self.manifest['channels'].get(channel)
+            if entry is None:
+                continue
+            try:
+                samples = np.load(os.path.join(self.directory, entry['samples']), mmap_mode='r')
+                timestamps = np.load(os.path.join(self.directory, entry['timestamps']), mmap_mode='r')
+            except (OSError, ValueError):
+                continue
+            signals[channel] = SidecarSignal(channel, samples, timestamps)
+        self.loaded += len(signals)
+        if signals:
+            os.utime(os.path.join(self.directory, MANIFEST_FILENAME))  # sidecar récemment utilisé (LRU)
+        return signals
+
+    def store(self, signals: Dict[str, object]):
+        """Ajoute des canaux au sidecar (les tableaux d'objets Python sont ignorés)."""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            for channel, signal in signals.items():
+                if channel in self.manifest['channels']:
+                    continue
+                samples = np.asarray(signal.samples)
+                timestamps = np.asarray(signal.timestamps)
+                if samples.dtype.hasobject or timestamps.dtype.hasobject:
+                    continue
+                stem = hashlib.sha1(channel.encode('utf-8', 'surrogatepass')).hexdigest()[:16]
+                self._save_array(os.path.join(self.directory, f"{stem}_samples.npy"), samples)
+                self._save_array(os.path.join(self.directory, f"{stem}_timestamps.npy"), timestamps)
+                self.manifest['channels'][channel] = {
+                    'samples': f"{stem}_samples.npy",
+                    'timestamps': f"{stem}_timestamps.npy",
+                }
+                self.stored += 1
+            self._write_json(os.path.join(self.directory, MANIFEST_FILENAME), self.manifest)
+            self.evict()
+        except OSError as e:
+            print(f"⚠️ Sidecar non écrit : {e}")
+
+    def extract(self, mdf_data, channels: Iterable[str]) -> Dict[str, object]:
+        """Canaux depuis le sidecar, les manquants extraits du MDF puis ajoutés."""
+        channels = [channel for channel in dict.fromkeys(channels) if channel]
+        signals = self.load(channels)
+        missing = [channel for channel in channels if channel not in signals]
+        if missing:
+            extracted = extract_signals(mdf_data, missing)
+            self.store(extracted)
+            signals.update(extracted)
+        return signals
+
+    def evict(self):
+        """
+        Supprime les sidecars les moins récemment utilisés au-delà de la
+        limite, puis retire de l'index les MDF supprimés et les empreintes
+        dont le sidecar n'existe plus.
+        """
+        with _lock:
+            try:
+                entries = []
+                for name in os.listdir(self.cache_dir):
+                    manifest = os.path.join(self.cache_dir, name, MANIFEST_FILENAME)
+                    if os.path.exists(manifest):
+                        entries.append((os.path.getmtime(manifest), name))
+            except OSError:
+                return
+            entries.sort(reverse=True)
+            kept = {name for _, name in entries[:self.max_entries]} | {self.key}
+            for _, name in entries[self.max_entries:]:
+                if name != self.key:
+                    shutil.rmtree(os.path.join(self.cache_dir, name), ignore_errors=True)
+
+            index_path = os.path.join(self.cache_dir, INDEX_FILENAME)
+            index = self._read_json(index_path) or {}
+            pruned = {path: known for path, known in index.items()
+                      if known.get('sha256') in kept and os.path.exists(path)}
+            if len(pruned) != len(index):
+                self._write_json(index_path, pruned)
+
+    def summary(self) -> str:
+        return (f"Sidecar {self.key[:12]} : {self.loaded} canaux relus, "
+                f"{self.stored} ajoutés ({len(self.manifest['channels'])} au total)")
+
+    # ------------------------------------------------------------------
+    # Utilitaires
+    # ------------------------------------------------------------------
+
+    def _read_manifest(self) -> Dict:
+        manifest = self._read_json(os.path.join(self.directory, MANIFEST_FILENAME))
+        if not manifest or manifest.get('format') != SIDECAR_FORMAT_VERSION:
+            manifest = {'format': SIDECAR_FORMAT_VERSION, 'mdf_sha256': self.key, 'channels': {}}
+        return manifest
+
+    @staticmethod
+    def _read_json(path: str) -> Optional[Dict]:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _save_array(path: str, array: np.ndarray):
+        # Fichier temporaire puis remplacement : jamais de .npy tronqué, et
+        # un autre processus qui l'a ouvert en memory-map garde l'ancien
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                np.save(f, array)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @staticmethod
+    def _write_json(path: str, data: Dict):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
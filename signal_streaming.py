@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+MODE STREAMING POUR LES TRÈS GROS MDF
+=====================================
+Les acquisitions d'endurance (4 à 10 Go) ne tiennent pas en mémoire si
+chaque signal est chargé en entier. En mode streaming, un signal est lu
+bloc par bloc (MDF.iter_get) et seules des données réduites sont gardées :
+- Min / max / moyenne / écart-type calculés au fil de l'eau
+- Enveloppe min/max de taille bornée pour le graphique
+- Premier et dernier changement de valeur (détection d'UC)
+- Plages exactes où un prédicat d'activité est vrai (occurrences d'UC),
+  suivies d'un bloc à l'autre : l'enveloppe réduite ne sert qu'au graphique
+
+Un plafond mémoire (RSS) est vérifié après chaque bloc : au-delà, une
+MemoryError est levée. Le pic RSS est rapporté en fin d'exécution.
+"""
+
+import os
+import sys
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+import signal_intervals
+from signal_edges import change_indices
+from signal_extraction import locate_channel
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_CHUNK_MB = 64           # Taille des blocs lus dans le MDF
+DEFAULT_ENVELOPE_POINTS = 2000  # Cases min/max gardées par signal
+
+def current_rss_bytes() -> Optional[int]:
+    """Mémoire résidente actuelle du processus (None si indisponible)."""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def peak_rss_bytes() -> Optional[int]:
+    """Pic de mémoire résidente du processus depuis son démarrage."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux : Ko, macOS : octets
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def format_bytes(size: Optional[int]) -> str:
+    """Taille lisible en Mo."""
+    return 'N/A' if size is None else f"{size / (1024 * 1024):.1f} Mo"
+
+def configure_streaming(mdf_data, chunk_mb: float = DEFAULT_CHUNK_MB):
+    """Règle la taille des blocs lus par MDF.iter_get."""
+    mdf_data.configure(read_fragment_size=int(chunk_mb * 1024 * 1024))
+
+class MemoryGuard:
+    """Plafond mémoire (RSS) vérifié entre deux blocs."""
+
+    def __init__(self, limit_mb: Optional[float] = None):
+        self.limit_bytes = int(limit_mb * 1024 * 1024) if limit_mb else None
+        self.peak_bytes = current_rss_bytes() or 0
+
+    def check(self, context: str = ''):
+        """Lève MemoryError si le RSS dépasse le plafond."""
+        rss = current_rss_bytes()
+        if rss is None:
+            return
+        self.peak_bytes = max(self.peak_bytes, rss)
+        if self.limit_bytes and rss > self.limit_bytes:
+            where = f" ({context})" if context else ''
+            raise MemoryError(f"Plafond mémoire dépassé{where} : "
+                              f"{format_bytes(rss)} > {format_bytes(self.limit_bytes)}")
+
+    def peak(self) -> Optional[int]:
+        """Pic RSS observé (vérifications et compteur du système)."""
+        peak = max(self.peak_bytes, peak_rss_bytes() or 0)
+        return peak or None
+
+    def summary(self) -> str:
+        """Résumé pour la fin d'exécution et le pied de rapport."""
+        limit = format_bytes(self.limit_bytes) if self.limit_bytes else 'aucun'
+        return f"Pic mémoire (RSS) : {format_bytes(self.peak())} (plafond : {limit})"
+
+class RunningStats:
+    """Min / max / moyenne / écart-type mis à jour bloc par bloc."""
+
+    def __init__(self):
+        self.count = 0
+        self.min = None
+        self.max = None
+        self.mean = 0.0
+        self._m2 = 0.0  # Somme des carrés des écarts
+
+    def update(self, values: np.ndarray):
+        if len(values) == 0:
+            return
+        values = np.asarray(values, dtype=np.float64)
+        chunk_min, chunk_max = float(np.min(values)), float(np.max(values))
+        self.min = chunk_min if self.min is None else min(self.min, chunk_min)
+        self.max = chunk_max if self.max is None else max(self.max, chunk_max)
+
+        # Combinaison des moyennes/variances de deux populations
+        count = len(values)
+        chunk_mean = float(np.mean(values))
+        chunk_m2 = float(np.sum((values - chunk_mean) ** 2))
+        total = self.count + count
+        delta = chunk_mean - self.mean
+        self.mean += delta * count / total
+        self._m2 += chunk_m2 + delta ** 2 * self.count * count / total
+        self.count = total
+
+    @property
+    def std(self) -> float:
+        return (self._m2 / self.count) ** 0.5 if self.count else 0.0
+
+class MinMaxEnvelope:
+    """
+    Enveloppe min/max de taille bornée, construite bloc par bloc.
+
+    Chaque case garde l'instant de début, le min et le max de ses
+    échantillons. Quand le nombre de cases dépasse la limite, les cases
+    voisines sont fusionnées deux à deux.
+    """
+
+    def __init__(self, max_points: int = DEFAULT_ENVELOPE_POINTS):
+        self.max_points = max(2, max_points)
+        self.bucket_size = 1  # Échantillons par case
+        self.times = np.array([], dtype=np.float64)
+        self.mins = np.array([], dtype=np.float64)
+        self.maxs = np.array([], dtype=np.float64)
+
+    def update(self, timestamps: np.ndarray, values: np.ndarray):
+        if len(values) == 0:
+            return
+        while len(values) > self.max_points * self.bucket_size:
+            self.bucket_size *= 2
+        starts = np.arange(0, len(values), self.bucket_size)
+        self.times = np.concatenate((self.times, timestamps[starts]))
+        self.mins = np.concatenate((self.mins, np.minimum.reduceat(values, starts)))
+        self.maxs = np.concatenate((self.maxs, np.maximum.reduceat(values, starts)))
+        while len(self.times) > self.max_points:
+            self._merge_pairs()
+
+    def _merge_pairs(self):
+        """Fusionne les cases voisines deux à deux."""
+        even = len(self.times) - len(self.times) % 2
+        times = self.times[0:even:2]
+        mins = np.minimum(self.mins[0:even:2], self.mins[1:even:2])
+        maxs = np.maximum(self.maxs[0:even:2], self.maxs[1:even:2])
+        if even < len(self.times):
+            times = np.append(times, self.times[-1])
+            mins = np.append(mins, self.mins[-1])
+            maxs = np.append(maxs, self.maxs[-1])
+        self.times, self.mins, self.maxs = times, mins, maxs
+        self.bucket_size *= 2
+
+    def plot_data(self):
+        """Points (temps, valeur) à tracer : un segment min → max par case."""
+        return np.repeat(self.times, 2), np.column_stack((self.mins, self.maxs)).ravel()
+
+class ChangeTracker:
+    """Instants du premier et du dernier changement de valeur."""
+
+    def __init__(self):
+        self.count = 0
+        self.first_change = None
+        self.last_change = None
+        self._last_value = None
+        self._started = False
+
+    def update(self, timestamps: np.ndarray, values: np.ndarray):
+        if len(values) == 0:
+            return
+        changed = change_indices(values)
+        if self._started and len(change_indices(np.array([self._last_value, values[0]]))):
+            changed = np.concatenate(([0], changed))
+        self.count += len(changed)
+        if len(changed):
+            if self.first_change is None:
+                self.first_change = float(timestamps[changed[0]])
+            self.last_change = float(timestamps[changed[-1]])
+        self._last_value = values[-1]
+        self._started = True
+
+class ActiveIntervalTracker:
+    """
+    Intervalles [début, fin) où le signal est actif, construits bloc par
+    bloc avec la même règle que signal_intervals.from_mask sur le signal
+    complet (une plage ouverte en fin de bloc continue dans le suivant).
+
+    activity : échantillons du bloc → masque booléen (par défaut : non nul).
+    """
+
+    def __init__(self, activity: Optional[Callable[[np.ndarray], np.ndarray]] = None):
+        self.activity = activity
+        self._intervals = []
+        self._open_start = None  # Début de la plage en cours (fin de bloc actif)
+        self._last_time = None
+
+    def update(self, timestamps: np.ndarray, values: np.ndarray):
+        if len(values) == 0:
+            return
+        if self.activity is not None:
+            active = np.asarray(self.activity(values), dtype=bool)
+        else:
+            active = np.nan_to_num(np.asarray(values, dtype=np.float64)) != 0
+        steps = np.diff(np.concatenate(([self._open_start is not None], active)).astype(np.int8))
+        starts = timestamps[np.flatnonzero(steps == 1)]
+        ends = timestamps[np.flatnonzero(steps == -1)]
+        if self._open_start is not None:
+            starts = np.concatenate(([self._open_start], starts))
+        self._open_start = None
+        if active[-1]:
+            self._open_start, starts = float(starts[-1]), starts[:-1]
+        if len(ends):
+            self._intervals.append(np.column_stack((starts, ends)))
+        self._last_time = float(timestamps[-1])
+
+    def intervals(self) -> np.ndarray:
+        """Intervalles actifs ; une plage encore ouverte finit au dernier instant lu."""
+        intervals = list(self._intervals)
+        if self._open_start is not None:
+            intervals.append(np.array([[self._open_start, self._last_time]]))
+        return signal_intervals.union(*intervals)
+
+def stream_signal(mdf_data, channel: str, guard: Optional[MemoryGuard] = None,
+                  max_points: int = DEFAULT_ENVELOPE_POINTS,
+                  activity: Optional[Callable[[np.ndarray], np.ndarray]] = None) -> Optional[Dict]:
+    """
+    Lit un canal bloc par bloc et ne garde que des données réduites.
+
+    Renvoie None si le canal est absent, sinon un dictionnaire au format de
+    get_signal_data ('timestamps'/'samples' = enveloppe min/max) complété
+    de 'count', 'std', 'numeric', 'changes', 'first_change', 'last_change'
+    et, si activity est fourni, 'active_intervals' (plages exactes où le
+    prédicat est vrai, voir ActiveIntervalTracker ; tout type de signal).
+    """
+    location = locate_channel(mdf_data, channel)
+    if location is None:
+        return None
+    _, group, index = location
+
+    stats = RunningStats()
+    envelope = MinMaxEnvelope(max_points)
+    changes = ChangeTracker()
+    active = ActiveIntervalTracker(activity) if activity is not None else None
+    numeric = None
+    samples_read = 0
+
+    for chunk in mdf_data.iter_get(channel, group=group, index=index):
+        samples = chunk.samples
+        if samples.ndim != 1:
+            return None
+        if numeric is None:
+            numeric = samples.dtype.kind in 'biuf'
+        changes.update(chunk.timestamps, samples)
+        if active is not None:
+            active.update(chunk.timestamps, samples)
+        if numeric:
+            stats.update(samples)
+            envelope.update(chunk.timestamps, samples.astype(np.float64, copy=False))
+        samples_read += len(samples)
+        del chunk, samples
+        if guard is not None:
+            guard.check(channel)
+
+    timestamps, samples = envelope.plot_data()
+    result = {
+        'found': samples_read > 0,
+        'channel': channel,
+        'timestamps': timestamps,
+        'samples': samples,
+        'numeric': bool(numeric),
+        'count': samples_read,
+        'min': stats.min,
+        'max': stats.max,
+        'mean': stats.mean,
+        'std': stats.std,
+        'changes': changes.count,
+        'first_change': changes.first_change,
+        'last_change': changes.last_change,
+    }
+    if active is not None:
+        result['active_intervals'] = active.intervals()
+    return result
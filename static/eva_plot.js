@@ -0,0 +1,346 @@
+/*
+ * EVA - tracés interactifs des signaux
+ * =====================================
+ * Dessine sur <canvas> les graphiques intégrés au rapport en mode
+ * --graphs interactive (voir interactive_plots.py). Sans dépendance.
+ *
+ * Chaque <div class="eva-plot"> contient un <canvas> et un
+ * <script type="application/json"> : séries en float32 base64 (instants en
+ * écart à x0), textes, titre, axes.
+ *
+ * Molette : zoom sur le temps autour du curseur
+ * Glisser : déplacement dans le temps
+ * Double-clic : vue complète
+ * L'axe Y s'ajuste aux points visibles (les pics restent lisibles au zoom).
+ */
+(function () {
+  'use strict';
+
+  var DPI = 100;
+  var FONT = 'Calibri, Arial, sans-serif';
+
+  function decode(b64) {
+    var binary = atob(b64);
+    var bytes = new Uint8Array(binary.length);
+    for (var i = 0; i < binary.length; i++) bytes[i] = binary.charCodeAt(i);
+    return new Float32Array(bytes.buffer);
+  }
+
+  function niceStep(span, count) {
+    var raw = span / Math.max(count, 1);
+    var power = Math.pow(10, Math.floor(Math.log10(raw)));
+    var steps = [1, 2, 2.5, 5, 10];
+    for (var i = 0; i < steps.length; i++) {
+      if (steps[i] * power >= raw) return steps[i] * power;
+    }
+    return 10 * power;
+  }
+
+  function ticks(min, max, count) {
+    if (!(max > min)) return [min];
+    var step = niceStep(max - min, count);
+    var values = [];
+    for (var v = Math.ceil(min / step) * step; v <= max + step * 1e-9; v += step) {
+      values.push(Math.abs(v) < step * 1e-9 ? 0 : v);
+    }
+    return values;
+  }
+
+  function formatTick(value, step) {
+    var digits = Math.max(0, -Math.floor(Math.log10(step)) + (step % 1 ? 1 : 0));
+    return value.toFixed(Math.min(digits, 6));
+  }
+
+  // Premier indice i tel que x[i] >= value (x trié)
+  function lowerBound(x, value) {
+    var lo = 0, hi = x.length;
+    while (lo < hi) {
+      var mid = (lo + hi) >> 1;
+      if (x[mid] < value) lo = mid + 1; else hi = mid;
+    }
+    return lo;
+  }
+
+  function Plot(container) {
+    this.container = container;
+    this.canvas = container.querySelector('canvas');
+    this.spec = JSON.parse(container.querySelector('script').textContent);
+    this.series = this.spec.series.map(function (s) {
+      var offsets = decode(s.x);
+      var x = new Float64Array(offsets.length);
+      for (var i = 0; i < offsets.length; i++) x[i] = s.x0 + offsets[i];
+      return { x: x, y: decode(s.y), style: s };
+    });
+    this.states = null;
+    for (var i = 0; i < this.series.length; i++) {
+      if (this.series[i].style.states) this.states = this.series[i].style.states;
+    }
+    this.full = this.dataRange();
+    this.view = this.full.slice();
+    this.resize();
+    this.bind();
+    this.draw();
+  }
+
+  Plot.prototype.dataRange = function () {
+    if (this.spec.xlim) return this.spec.xlim.slice();
+    var min = Infinity, max = -Infinity;
+    this.series.forEach(function (s) {
+      if (s.x.length) {
+        min = Math.min(min, s.x[0]);
+        max = Math.max(max, s.x[s.x.length - 1]);
+      }
+    });
+    if (!isFinite(min)) return [0, 1];
+    if (min === max) return [min - 0.5, max + 0.5];
+    return [min, max];
+  };
+
+  Plot.prototype.resize = function () {
+    var width = this.spec.figsize[0] * DPI;
+    var height = this.spec.figsize[1] * DPI;
+    var ratio = window.devicePixelRatio || 1;
+    this.canvas.style.width = '100%';
+    this.canvas.style.maxWidth = width + 'px';
+    this.canvas.style.aspectRatio = width + ' / ' + height;
+    this.canvas.width = width * ratio;
+    this.canvas.height = height * ratio;
+    this.width = width;
+    this.height = height;
+    this.ratio = ratio;
+  };
+
+  Plot.prototype.valueRange = function () {
+    if (this.spec.ylim) return this.spec.ylim.slice();
+    var min = Infinity, max = -Infinity, fill = false, view = this.view;
+    this.series.forEach(function (s) {
+      var start = Math.max(lowerBound(s.x, view[0]) - 1, 0);
+      var end = Math.min(lowerBound(s.x, view[1]) + 1, s.x.length);
+      for (var i = start; i < end; i++) {
+        var v = s.y[i];
+        if (isNaN(v)) continue;
+        if (v < min) min = v;
+        if (v > max) max = v;
+      }
+      fill = fill || s.style.fill;
+    });
+    if (!isFinite(min)) return [0, 1];
+    if (fill) { min = Math.min(min, 0); max = Math.max(max, 0); }
+    var pad = (max - min) * 0.05 || Math.abs(max) * 0.05 || 0.5;
+    return [min - pad, max + pad];
+  };
+
+  Plot.prototype.bind = function () {
+    var plot = this;
+    this.canvas.addEventListener('wheel', function (event) {
+      if (!plot.series.length) return;
+      event.preventDefault();
+      var rect = plot.canvas.getBoundingClientRect();
+      var area = plot.area;
+      var px = (event.clientX - rect.left) * plot.width / rect.width;
+      var fraction = Math.min(Math.max((px - area.left) / area.width, 0), 1);
+      var span = plot.view[1] - plot.view[0];
+      var factor = event.deltaY < 0 ? 0.8 : 1.25;
+      var newSpan = Math.min(span * factor, plot.full[1] - plot.full[0]);
+      var center = plot.view[0] + fraction * span;
+      plot.setView(center - fraction * newSpan, newSpan);
+    }, { passive: false });
+
+    var dragging = null;
+    this.canvas.addEventListener('mousedown', function (event) {
+      dragging = { x: event.clientX, view: plot.view.slice() };
+    });
+    window.addEventListener('mousemove', function (event) {
+      if (!dragging) return;
+      var rect = plot.canvas.getBoundingClientRect();
+      var dx = (event.clientX - dragging.x) * plot.width / rect.width;
+      var span = dragging.view[1] - dragging.view[0];
+      plot.setView(dragging.view[0] - dx / plot.area.width * span, span);
+    });
+    window.addEventListener('mouseup', function () { dragging = null; });
+    this.canvas.addEventListener('dblclick', function () {
+      plot.view = plot.full.slice();
+      plot.draw();
+    });
+  };
+
+  Plot.prototype.setView = function (start, span) {
+    start = Math.max(this.full[0], Math.min(start, this.full[1] - span));
+    this.view = [start, start + span];
+    this.draw();
+  };
+
+  Plot.prototype.draw = function () {
+    var spec = this.spec, ctx = this.canvas.getContext('2d');
+    ctx.setTransform(this.ratio, 0, 0, this.ratio, 0, 0);
+    ctx.clearRect(0, 0, this.width, this.height);
+    ctx.fillStyle = '#ffffff';
+    ctx.fillRect(0, 0, this.width, this.height);
+
+    var titleLines = spec.title ? spec.title.split('\n') : [];
+    var top = 12 + titleLines.length * 16;
+    var left = spec.axis_off ? 10 : (this.states ? 110 : 65);
+    var bottom = spec.axis_off ? 10 : (spec.xlabel ? 45 : 30);
+    var area = this.area = { left: left, top: top, width: this.width - left - 15, height: this.height - top - bottom };
+    var xRange = this.view, yRange = this.valueRange();
+    var sx = function (x) { return area.left + (x - xRange[0]) / (xRange[1] - xRange[0]) * area.width; };
+    var sy = function (y) { return area.top + area.height - (y - yRange[0]) / (yRange[1] - yRange[0]) * area.height; };
+
+    ctx.font = 'bold 13px ' + FONT;
+    ctx.fillStyle = '#000000';
+    ctx.textAlign = 'center';
+    ctx.textBaseline = 'top';
+    titleLines.forEach(function (line, i) { ctx.fillText(line, area.left + area.width / 2, 4 + i * 16); });
+
+    if (!spec.axis_off) this.drawAxes(ctx, area, xRange, yRange, sx, sy);
+
+    ctx.save();
+    ctx.beginPath();
+    ctx.rect(area.left, area.top, area.width, area.height);
+    ctx.clip();
+    this.series.forEach(function (s) {
+      var start = Math.max(lowerBound(s.x, xRange[0]) - 1, 0);
+      var end = Math.min(lowerBound(s.x, xRange[1]) + 1, s.x.length);
+      if (end - start < 1) return;
+      ctx.beginPath();
+      for (var i = start; i < end; i++) {
+        if (i === start) ctx.moveTo(sx(s.x[i]), sy(s.y[i])); else ctx.lineTo(sx(s.x[i]), sy(s.y[i]));
+      }
+      ctx.globalAlpha = s.style.alpha;
+      ctx.strokeStyle = s.style.color;
+      ctx.lineWidth = s.style.linewidth;
+      ctx.setLineDash(s.style.dash ? [6, 4] : []);
+      ctx.stroke();
+      if (s.style.fill) {
+        ctx.lineTo(sx(s.x[end - 1]), sy(0));
+        ctx.lineTo(sx(s.x[start]), sy(0));
+        ctx.closePath();
+        ctx.globalAlpha = 0.1;
+        ctx.fillStyle = s.style.color;
+        ctx.fill();
+      }
+      ctx.globalAlpha = 1;
+      ctx.setLineDash([]);
+    });
+    ctx.restore();
+
+    this.drawTexts(ctx, area, sx, sy);
+    if (spec.legend) this.drawLegend(ctx, area);
+  };
+
+  Plot.prototype.drawAxes = function (ctx, area, xRange, yRange, sx, sy) {
+    var spec = this.spec, states = this.states;
+    var xTicks = ticks(xRange[0], xRange[1], 8);
+    var xStep = xTicks.length > 1 ? xTicks[1] - xTicks[0] : 1;
+    var yTicks = states ? states.map(function (_, i) { return i; }).filter(function (i) { return i >= yRange[0] && i <= yRange[1]; })
+                        : ticks(yRange[0], yRange[1], 5);
+    var yStep = yTicks.length > 1 ? yTicks[1] - yTicks[0] : 1;
+
+    ctx.font = '11px ' + FONT;
+    ctx.fillStyle = '#000000';
+    ctx.strokeStyle = '#b0b0b0';
+    ctx.lineWidth = 0.8;
+    ctx.setLineDash(spec.grid ? [3, 3] : []);
+    ctx.textAlign = 'center';
+    ctx.textBaseline = 'top';
+    xTicks.forEach(function (v) {
+      var x = sx(v);
+      if (spec.grid) { ctx.beginPath(); ctx.moveTo(x, area.top); ctx.lineTo(x, area.top + area.height); ctx.stroke(); }
+      ctx.fillText(formatTick(v, xStep), x, area.top + area.height + 4);
+    });
+    ctx.textAlign = 'right';
+    ctx.textBaseline = 'middle';
+    yTicks.forEach(function (v) {
+      var y = sy(v);
+      if (spec.grid) { ctx.beginPath(); ctx.moveTo(area.left, y); ctx.lineTo(area.left + area.width, y); ctx.stroke(); }
+      ctx.fillText(states ? states[v] : formatTick(v, yStep), area.left - 4, y);
+    });
+    ctx.setLineDash([]);
+    ctx.strokeStyle = '#000000';
+    ctx.strokeRect(area.left, area.top, area.width, area.height);
+
+    ctx.font = '12px ' + FONT;
+    if (spec.xlabel) {
+      ctx.textAlign = 'center';
+      ctx.textBaseline = 'bottom';
+      ctx.fillText(spec.xlabel, area.left + area.width / 2, this.height - 2);
+    }
+    if (spec.ylabel && !states) {
+      ctx.save();
+      ctx.translate(12, area.top + area.height / 2);
+      ctx.rotate(-Math.PI / 2);
+      ctx.textAlign = 'center';
+      ctx.textBaseline = 'middle';
+      ctx.fillText(spec.ylabel, 0, 0);
+      ctx.restore();
+    }
+  };
+
+  Plot.prototype.drawTexts = function (ctx, area, sx, sy) {
+    var xlim = this.spec.xlim, ylim = this.spec.ylim;
+    this.spec.texts.forEach(function (t) {
+      var x, y;
+      if (t.axes) {
+        x = area.left + t.x * area.width;
+        y = area.top + (1 - t.y) * area.height;
+      } else if (xlim && ylim) {
+        x = area.left + (t.x - xlim[0]) / (xlim[1] - xlim[0]) * area.width;
+        y = area.top + (1 - (t.y - ylim[0]) / (ylim[1] - ylim[0])) * area.height;
+      } else {
+        x = sx(t.x);
+        y = sy(t.y);
+      }
+      var lines = t.text.split('\n');
+      var size = Math.round(t.fontsize * 1.3);
+      ctx.font = size + 'px ' + FONT;
+      var width = Math.max.apply(null, lines.map(function (line) { return ctx.measureText(line).width; }));
+      var height = lines.length * size * 1.2;
+      var x0 = t.align === 'center' ? x - width / 2 : (t.align === 'right' ? x - width : x);
+      var y0 = t.valign === 'center' ? y - height / 2 : (t.valign === 'top' ? y : y - height);
+      if (t.box) {
+        ctx.fillStyle = t.box;
+        ctx.globalAlpha = 0.8;
+        ctx.fillRect(x0 - 4, y0 - 3, width + 8, height + 6);
+        ctx.globalAlpha = 1;
+        ctx.strokeStyle = '#000000';
+        ctx.strokeRect(x0 - 4, y0 - 3, width + 8, height + 6);
+      }
+      ctx.fillStyle = t.color;
+      ctx.textAlign = 'left';
+      ctx.textBaseline = 'top';
+      lines.forEach(function (line, i) {
+        var offset = t.align === 'center' ? (width - ctx.measureText(line).width) / 2 : 0;
+        ctx.fillText(line, x0 + offset, y0 + i * size * 1.2);
+      });
+    });
+  };
+
+  Plot.prototype.drawLegend = function (ctx, area) {
+    var labelled = this.series.filter(function (s) { return s.style.label; });
+    ctx.font = '11px ' + FONT;
+    ctx.textAlign = 'left';
+    ctx.textBaseline = 'middle';
+    var width = Math.max.apply(null, labelled.map(function (s) { return ctx.measureText(s.style.label).width; }).concat([0]));
+    var x = area.left + area.width - width - 45, y = area.top + 8;
+    labelled.forEach(function (s, i) {
+      var row = y + i * 16;
+      ctx.strokeStyle = s.style.color;
+      ctx.lineWidth = s.style.linewidth;
+      ctx.setLineDash(s.style.dash ? [6, 4] : []);
+      ctx.beginPath(); ctx.moveTo(x, row); ctx.lineTo(x + 25, row); ctx.stroke();
+      ctx.setLineDash([]);
+      ctx.fillStyle = '#000000';
+      ctx.fillText(s.style.label, x + 30, row);
+    });
+  };
+
+  function init() {
+    var plots = document.querySelectorAll('.eva-plot');
+    for (var i = 0; i < plots.length; i++) {
+      try { new Plot(plots[i]); } catch (e) { console.error('eva-plot', e); }
+    }
+  }
+
+  if (document.readyState === 'loading') document.addEventListener('DOMContentLoaded', init);
+  else init();
+})();
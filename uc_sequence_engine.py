@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+MOTEUR DES RÈGLES DE SÉQUENCE UC
+================================
+Compile les sequence_rules de tina/uc_detection_framework.json
+(rule_type "state_transition", conditions from → to1 → to2) et les évalue
+sur les valeurs énumérées décodées des signaux MDF pour produire les
+occurrences réelles [TSTART, TEND] de chaque UC.
+
+Évaluation vectorisée, linéaire en nombre d'échantillons :
+1. Chaque signal est découpé une seule fois en plages d'état constant
+   (run-length encoding, voir signal_edges.py)
+2. Chaque état de la règle devient un masque sur ces plages
+3. La séquence from → to1 (→ to2) est un ET des masques décalés
+Les règles sont regroupées par signal : un signal utilisé par plusieurs
+UC n'est décodé et découpé qu'une fois, les six UC en une seule passe.
+
+Conditions reconnues :
+- Libellé d'état ("Closed", "Go to Sleep"...), comparé sans casse
+- "xxxxx" : n'importe quel état
+- "=!=Sleeping" : tout état sauf Sleeping
+- "> 10Kmph", "<= 5", "4% - 8%" : seuils numériques (condition de niveau)
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+import signal_intervals
+from signal_edges import change_indices
+
+WILDCARD_PATTERN = re.compile(r'^x+$', re.IGNORECASE)
+NEGATION_PREFIX = '=!='
+NUMBER = r'(-?\d+(?:[.,]\d+)?)'
+THRESHOLD_PATTERN = re.compile(r'^(>=|<=|>|<|=)\s*' + NUMBER)
+RANGE_PATTERN = re.compile(r'^' + NUMBER + r'\s*%?\s*-\s*' + NUMBER)
+
+def format_time(seconds: float) -> str:
+    """Formate les secondes en HH:MM:SS.mmm."""
+    hours = int(seconds // 3600)
+    minutes = int((seconds % 3600) // 60)
+    secs = seconds % 60
+    return f"{hours:02d}:{minutes:02d}:{secs:06.3f}"
+
+def normalize_state(label) -> str:
+    """Libellé d'état comparable : texte décodé, minuscules, espaces réduits."""
+    if isinstance(label, bytes):
+        label = label.decode('utf-8', 'replace')
+    return ' '.join(str(label).split()).lower()
+
+def _number(text: str) -> float:
+    return float(text.replace(',', '.'))
+
+def compile_condition(condition: str) -> Dict:
+    """Transforme une condition texte du framework en prédicat."""
+    text = ' '.join(str(condition).split())
+    if WILDCARD_PATTERN.match(text):
+        return {'kind': 'any', 'text': text}
+    if text.startswith(NEGATION_PREFIX):
+        return {'kind': 'ne', 'value': normalize_state(text[len(NEGATION_PREFIX):]), 'text': text}
+    match = THRESHOLD_PATTERN.match(text)
+    if match:
+        return {'kind': match.group(1), 'value': _number(match.group(2)), 'text': text}
+    match = RANGE_PATTERN.match(text)
+    if match:
+        low, high = sorted((_number(match.group(1)), _number(match.group(2))))
+        return {'kind': 'range', 'value': (low, high), 'text': text}
+    return {'kind': 'eq', 'value': normalize_state(text), 'text': text}
+
+def is_numeric_condition(predicate: Dict) -> bool:
+    return predicate['kind'] in ('>', '>=', '<', '<=', '=', 'range')
+
+def evaluate_condition(predicate: Dict, values: np.ndarray, labels: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Masque booléen du prédicat.
+
+    values : valeurs brutes (seuils numériques) ; labels : libellés
+    normalisés (conditions d'état). Pour un signal énuméré, ces tableaux
+    ne contiennent que les états DISTINCTS : le masque est ensuite
+    propagé aux plages par leurs codes.
+    """
+    kind = predicate['kind']
+    if kind == 'any':
+        return np.ones(len(values), dtype=bool)
+    if is_numeric_condition(predicate):
+        if values.dtype.kind not in 'biuf':
+            return np.zeros(len(values), dtype=bool)
+        if kind == 'range':
+            low, high = predicate['value']
+            return (values >= low) & (values <= high)
+        threshold = predicate['value']
+        return {'>': values > threshold, '>=': values >= threshold, '<': values < threshold,
+                '<=': values <= threshold, '=': values == threshold}[kind]
+    if labels is None:
+        labels = np.array([normalize_state(value) for value in values.tolist()], dtype=object)
+    if kind == 'ne':
+        return labels != predicate['value']
+    return labels == predicate['value']
+
+def evaluate_series(pattern: List[Dict], values: np.ndarray, states: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Masque, instant par instant, d'un signal aligné (signal_alignment.py)
+    qui se trouve dans l'un des états ou seuils de la règle.
+
+    values : colonne de la matrice alignée (NaN si invalide) ; states :
+    états d'un signal énuméré (values = rang dans ce tableau). Les
+    prédicats sont évalués sur les valeurs DISTINCTES puis propagés par
+    leurs codes, comme pour evaluate_signal.
+    """
+    valid = ~np.isnan(values)
+    codes = np.zeros(len(values), dtype=np.int64)
+    if states is None:
+        states, inverse = np.unique(values[valid], return_inverse=True)
+        codes[valid] = inverse.reshape(-1)
+    else:
+        codes[valid] = values[valid].astype(np.int64)
+    if not len(states):
+        return np.zeros(len(values), dtype=bool)
+    labels = None
+    if states.dtype.kind not in 'biuf':
+        labels = np.array([normalize_state(value) for value in states.tolist()], dtype=object)
+    distinct = np.zeros(len(states), dtype=bool)
+    for predicate in pattern:
+        distinct |= evaluate_condition(predicate, states, labels)
+    return distinct[codes] & valid
+
+def evaluate_samples(pattern: List[Dict], samples: np.ndarray) -> np.ndarray:
+    """
+    Masque, échantillon par échantillon, d'un signal brut de tout type
+    (numérique ou libellés décodés) dans l'un des états ou seuils de la
+    règle. Sert au suivi bloc par bloc du mode streaming.
+    """
+    states, codes = np.unique(np.asarray(samples), return_inverse=True)
+    return evaluate_series(pattern, codes.reshape(-1).astype(np.float64), states)
+
+def run_length_encode(timestamps: np.ndarray, samples: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Plages d'état constant : (valeur, instant de début, instant de fin)."""
+    starts = np.concatenate(([0], change_indices(samples)))
+    run_starts = timestamps[starts]
+    run_ends = np.append(timestamps[starts[1:]], timestamps[-1])
+    return samples[starts], run_starts, run_ends
+
+class SequenceRuleEngine:
+    """Règles de séquence compilées de tous les UC, regroupées par signal."""
+
+    def __init__(self, uc_definitions: Dict):
+        self.uc_rule_counts: Dict[str, int] = {}
+        self.rules_by_signal: Dict[str, List[Dict]] = {}
+        for uc_name, uc_def in uc_definitions.items():
+            rules = [rule for rule in uc_def.get('sequence_rules', [])
+                     if rule.get('rule_type') == 'state_transition' and rule.get('signal')]
+            self.uc_rule_counts[uc_name] = len(rules)
+            for index, rule in enumerate(rules):
+                compiled = self.compile_rule(uc_name, index, rule)
+                if compiled is not None:
+                    self.rules_by_signal.setdefault(rule['signal'], []).append(compiled)
+
+    @staticmethod
+    def compile_rule(uc_name: str, index: int, rule: Dict) -> Optional[Dict]:
+        """Compile les conditions from → to1 → to2 d'une règle."""
+        conditions = rule.get('conditions', {})
+        steps = [conditions[key] for key in ('from', 'to1', 'to2') if conditions.get(key)]
+        if not steps:
+            return None
+
+        # Un état répété (from == to1) ne forme qu'une plage après découpage
+        pattern = []
+        for step in steps:
+            predicate = compile_condition(step)
+            if not pattern or predicate != pattern[-1]:
+                pattern.append(predicate)
+
+        return {
+            'uc': uc_name,
+            'index': index,
+            'signal': rule['signal'],
+            'pattern': pattern,
+            # Une seule condition (ex. "> 10Kmph") : condition de niveau
+            'level': len(pattern) == 1,
+            'description': ' → '.join(str(step) for step in steps),
+        }
+
+    @property
+    def signals(self) -> List[str]:
+        """Signaux utilisés par au moins une règle."""
+        return list(self.rules_by_signal)
+
+    def evaluate_signal(self, rules: List[Dict], timestamps: np.ndarray,
+                        samples: np.ndarray) -> Dict[int, np.ndarray]:
+        """Intervalles de chaque règle d'un même signal (un seul découpage)."""
+        results = {}
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        samples = np.asarray(samples)
+        if samples.ndim != 1 or len(samples) == 0:
+            return results
+
+        # Découpage en plages et états distincts (calculés une fois pour le signal)
+        run_values, run_starts, run_ends = run_length_encode(timestamps, samples)
+        distinct, run_codes = np.unique(run_values, return_inverse=True)
+        run_codes = run_codes.reshape(-1)
+        labels = None
+        if distinct.dtype.kind not in 'biuf':
+            labels = np.array([normalize_state(value) for value in distinct.tolist()], dtype=object)
+
+        for rule_id, rule in enumerate(rules):
+            if rule['level'] and is_numeric_condition(rule['pattern'][0]):
+                # Seuil numérique : masque sur les échantillons
+                mask = evaluate_condition(rule['pattern'][0], samples)
+                results[rule_id] = signal_intervals.from_mask(timestamps, mask)
+                continue
+
+            masks = [evaluate_condition(predicate, distinct, labels)[run_codes] for predicate in rule['pattern']]
+            if rule['level']:
+                matched = np.flatnonzero(masks[0])
+                results[rule_id] = np.column_stack((run_starts[matched], run_ends[matched]))
+                continue
+
+            # Séquence : plage i = from, i+1 = to1, i+2 = to2
+            length = len(masks)
+            if len(run_codes) < length:
+                results[rule_id] = signal_intervals.empty()
+                continue
+            sequence = np.ones(len(run_codes) - length + 1, dtype=bool)
+            for offset, mask in enumerate(masks):
+                sequence &= mask[offset:offset + len(sequence)]
+            matched = np.flatnonzero(sequence)
+            # TSTART : sortie de l'état from ; TEND : sortie du dernier état (sa plage est couverte)
+            results[rule_id] = np.column_stack((run_starts[matched + 1], run_ends[matched + length - 1]))
+        return results
+
+    def evaluate(self, signals: Dict[str, Tuple[np.ndarray, np.ndarray]]) -> Dict[str, Dict]:
+        """
+        Évalue toutes les règles en une passe sur les signaux fournis.
+
+        signals : nom du signal (tel que dans les règles) → (timestamps, samples).
+        Renvoie pour chaque UC : 'occurrences' (tableau (k, 2) d'intervalles
+        fusionnés, voir signal_intervals.py),
+        'rules_matched', 'rules_evaluated', 'rules_total'.
+        """
+        results = {uc_name: {'occurrences': signal_intervals.empty(), 'rules_matched': 0, 'rules_evaluated': 0,
+                             'rules_total': count}
+                   for uc_name, count in self.uc_rule_counts.items()}
+        intervals_by_uc: Dict[str, List[np.ndarray]] = {uc_name: [] for uc_name in results}
+
+        for signal_name, rules in self.rules_by_signal.items():
+            if signal_name not in signals:
+                continue
+            timestamps, samples = signals[signal_name]
+            for rule_id, intervals in self.evaluate_signal(rules, timestamps, samples).items():
+                uc_name = rules[rule_id]['uc']
+                results[uc_name]['rules_evaluated'] += 1
+                # Intervalles vides (plage d'un seul échantillon en fin de fichier) écartés
+                intervals = signal_intervals.normalize(intervals)
+                if len(intervals):
+                    results[uc_name]['rules_matched'] += 1
+                    intervals_by_uc[uc_name].append(intervals)
+
+        for uc_name, intervals in intervals_by_uc.items():
+            results[uc_name]['occurrences'] = signal_intervals.union(*intervals)
+        return results
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+STOCKAGE DES MDF REÇUS ET CACHE DES RAPPORTS
+============================================
+Une même acquisition de banc est souvent envoyée par plusieurs
+personnes : elle n'est stockée qu'une fois et son rapport n'est
+généré qu'une fois.
+
+- Le fichier reçu est écrit par blocs (UPLOAD_CHUNK) et son empreinte
+  SHA-256 calculée au fil de l'écriture (aucune relecture)
+- Stockage adressé par contenu : uploads/objects/<ab>/<sha256>.mdf ;
+  un contenu déjà reçu n'est pas stocké une seconde fois
+- Le nom d'envoi (uploads/<horodatage>_<nom>.mdf) est un lien physique
+  vers l'objet (copie si le système de fichiers ne le permet pas) : le
+  générateur voit le nom d'origine (numéro de mulet, nom du fichier).
+  Il n'est créé (link) que pour lancer une analyse : un doublon dont le
+  rapport existe ou est en cours ne laisse aucun fichier de plus
+- Cache des rapports : clé = empreinte du contenu + nom du fichier +
+  générateur et paramètres + version du code → nom du rapport déjà
+  généré (eva_cache/reports/<clé>.json). Une entrée dont le rapport a
+  été supprimé est ignorée.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import shutil
+import threading
+import uuid
+from datetime import datetime
+from functools import lru_cache
+from typing import BinaryIO, Dict, Optional
+
+UPLOAD_CHUNK = 1024 * 1024  # 1 Mo
+DEFAULT_REPORT_CACHE_DIR = os.path.join('eva_cache', 'reports')
+OBJECTS_DIR = 'objects'
+INCOMING_DIR = '.incoming'
+
+# Fichiers dont dépend le contenu d'un rapport (version du code)
+CODE_DIR = os.path.dirname(os.path.abspath(__file__))
+CODE_PATTERNS = ('*.py', os.path.join('static', '*.js'), 'VERSION.txt')
+
+_lock = threading.Lock()
+
+@lru_cache(maxsize=1)
+def code_version() -> str:
+    """Empreinte courte du code des générateurs (invalide le cache des rapports à chaque modification)."""
+    digest = hashlib.sha256()
+    for pattern in CODE_PATTERNS:
+        for path in sorted(glob.glob(os.path.join(CODE_DIR, pattern))):
+            digest.update(os.path.relpath(path, CODE_DIR).encode('utf-8'))
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+def _link_or_copy(source: str, target: str):
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
+
+class UploadStore:
+    """Fichiers MDF reçus, stockés une seule fois par contenu."""
+
+    def __init__(self, upload_folder: str):
+        self.folder = upload_folder
+        self.objects = os.path.join(upload_folder, OBJECTS_DIR)
+        self.incoming = os.path.join(upload_folder, INCOMING_DIR)
+
+    def object_path(self, sha256: str) -> str:
+        return os.path.join(self.objects, sha256[:2], f"{sha256}.mdf")
+
+    def save(self, stream: BinaryIO, filename: str) -> Dict:
+        """
+        Écrit le flux reçu en calculant son empreinte et le range dans le
+        stockage par contenu.
+        """
+        os.makedirs(self.incoming, exist_ok=True)
+        part_path = os.path.join(self.incoming, f"{uuid.uuid4().hex}.part")
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with open(part_path, 'wb') as f:
+                while True:
+                    chunk = stream.read(UPLOAD_CHUNK)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+        except BaseException:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            raise
+        return self.store(part_path, filename, digest.hexdigest(), size)
+
+    def store(self, part_path: str, filename: str, sha256: str, size: int) -> Dict:
+        """Range un fichier reçu complet (empreinte connue) dans le stockage par contenu."""
+        object_path = self.object_path(sha256)
+        with _lock:
+            duplicate = os.path.exists(object_path)
+            if duplicate:
+                os.remove(part_path)
+            else:
+                os.makedirs(os.path.dirname(object_path), exist_ok=True)
+                os.replace(part_path, object_path)
+        return {'object_path': object_path, 'filename': filename, 'sha256': sha256,
+                'size': size, 'duplicate': duplicate}
+
+    def link(self, stored: Dict) -> str:
+        """Crée le nom de l'envoi (lien vers l'objet, suffixe _2, _3... si déjà pris) ; renvoie son chemin."""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        stem, extension = os.path.splitext(f"{timestamp}_{stored['filename']}")
+        with _lock:
+            path, index = os.path.join(self.folder, stem + extension), 1
+            while os.path.exists(path):
+                index += 1
+                path = os.path.join(self.folder, f"{stem}_{index}{extension}")
+            _link_or_copy(stored['object_path'], path)
+        return path
+
+    def stats(self) -> Dict:
+        """Nombre et taille des contenus stockés."""
+        count = size = 0
+        for path in glob.glob(os.path.join(self.objects, '*', '*.mdf')):
+            count += 1
+            size += os.path.getsize(path)
+        return {'stored_mdf': count, 'stored_mb': round(size / (1024 * 1024), 1)}
+
+class ReportCache:
+    """Rapports déjà générés, par contenu du MDF et paramètres de génération."""
+
+    def __init__(self, cache_dir: str = DEFAULT_REPORT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(**fields) -> str:
+        """Clé d'un rapport : empreinte de tous les paramètres (version du code incluse)."""
+        fields = {**fields, 'code': code_version()}
+        return hashlib.sha256(json.dumps(fields, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str, reports_dir: str) -> Optional[str]:
+        """Nom du rapport déjà généré pour cette clé (None si absent ou supprimé)."""
+        try:
+            with open(self._entry_path(key), 'r', encoding='utf-8') as f:
+                report_filename = json.load(f)['report_filename']
+        except (OSError, ValueError, KeyError):
+            report_filename = None
+        if report_filename and not os.path.isfile(os.path.join(reports_dir, report_filename)):
+            report_filename = None
+
+        if report_filename is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return report_filename
+
+    def put(self, key: str, report_filename: str, **info):
+        """Enregistre le rapport généré pour cette clé (info : empreinte, nom d'origine...)."""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._entry_path(key)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'report_filename': report_filename, **info,
+                           'date': datetime.now().isoformat(timespec='seconds')}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️ Cache des rapports non écrit : {e}")